@@ -1,44 +1,209 @@
-from flask import Blueprint, jsonify, request
-from db import SessionLocal
+import base64
+import json
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, jsonify, request
+from sqlalchemy import and_, func, or_
 from models.recognition_logs import RecognitionLog
-from models.aircraft_types import AircraftType  # якщо така модель є
+from services.log_export import EXPORT_FORMATS, check_format, iter_export
+from services.db_session import get_db
+from services.reference_cache import reference_cache
+from services.users_service import get_current_user
 
 logs_bp = Blueprint("logs", __name__)
 
+# AircraftName з довідника -> текст (ID беруться з таблиці AircraftTypes)
+AIRCRAFT_NAMES = {"drone": "Дрон", "helicopter": "Вертоліт", "airplane": "Літак"}
+
+# SourceType -> текст
+SOURCE_NAMES = {"file": "файл", "realtime": "реальний час", "batch": "пакет"}
+
+# Розмір сторінки історії
+LOGS_PAGE_SIZE = 50
+LOGS_MAX_PAGE_SIZE = 500
+
+
+class LogQueryError(ValueError):
+    pass
+
+
+def encode_cursor(created_at, log_id):
+    """Opaque cursor = position of the last row of a page in (CreatedAt, LogID) order."""
+    raw = json.dumps([created_at.isoformat(), log_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, log_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(log_id)
+    except (ValueError, TypeError):
+        raise LogQueryError("Invalid cursor")
+
+
+def aircraft_type_label(type_id):
+    aircraft = reference_cache.aircraft_type(type_id)
+    name = aircraft["name"] if aircraft else None
+    return AIRCRAFT_NAMES.get(name.lower(), name) if name else "Невідомо"
+
+
+def resolve_aircraft_type(value):
+    """?type= як AircraftTypeID, назва з довідника ("drone") або підпис ("Дрон")."""
+    if value.isdigit():
+        return int(value)
+    names = {label: name for name, label in AIRCRAFT_NAMES.items()}
+    return reference_cache.aircraft_type_id(names.get(value, value))
+
+
+def parse_time(value):
+    """ISO date or datetime from a query string; a bare date means its whole day for ?to=."""
+    try:
+        return datetime.fromisoformat(value), len(value) == 10
+    except ValueError:
+        raise LogQueryError(f"Invalid date: {value}")
+
+
+def log_filters(args):
+    """WHERE conditions of the optional filters type / source / from / to; raises LogQueryError on bad input."""
+    conditions = []
+    if args.get("type"):
+        type_id = resolve_aircraft_type(args["type"])
+        if type_id is None:
+            raise LogQueryError(f"Unknown aircraft type: {args['type']}")
+        conditions.append(RecognitionLog.AircraftTypeID == type_id)
+    if args.get("source"):
+        conditions.append(RecognitionLog.SourceType == args["source"])
+    if args.get("from"):
+        start, _ = parse_time(args["from"])
+        conditions.append(RecognitionLog.CreatedAt >= start)
+    if args.get("to"):
+        end, whole_day = parse_time(args["to"])
+        if whole_day:
+            conditions.append(RecognitionLog.CreatedAt < end + timedelta(days=1))
+        else:
+            conditions.append(RecognitionLog.CreatedAt <= end)
+    return conditions
+
+
 @logs_bp.route("/api/logs", methods=["GET"])
 def get_user_logs():
+    """
+    Історія розпізнавань користувача сторінками, новіші першими.
+    ?limit=N, ?cursor=<nextCursor попередньої сторінки>, фільтри ?type= ?source= ?from= ?to=.
+    Сторінка — seek по індексу (UserID, CreatedAt, LogID), а не OFFSET, тож
+    її час не залежить від того, наскільки глибоко в історії вона лежить.
+    """
     user_id = request.args.get("user_id", type=int)
     if not user_id:
         return jsonify({"error": "Missing user_id"}), 400
+    limit = min(max(request.args.get("limit", LOGS_PAGE_SIZE, type=int), 1), LOGS_MAX_PAGE_SIZE)
 
-    db = SessionLocal()
     try:
-        logs = (
-            db.query(RecognitionLog)
-            .filter(RecognitionLog.UserID == user_id)
-            .order_by(RecognitionLog.CreatedAt.desc())
+        conditions = [RecognitionLog.UserID == user_id] + log_filters(request.args)
+        cursor = request.args.get("cursor")
+        if cursor:
+            created_at, log_id = decode_cursor(cursor)
+            conditions.append(or_(
+                RecognitionLog.CreatedAt < created_at,
+                and_(RecognitionLog.CreatedAt == created_at, RecognitionLog.LogID < log_id),
+            ))
+    except LogQueryError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # довідник типів (для підписів) — до того, як запит візьме з'єднання:
+    # завантаження довідника бере власне, і з пулом на одне це був би дедлок
+    reference_cache.table("aircraft_types")
+    db = get_db()
+    # кортежі замість ORM-об'єктів; limit + 1 — щоб знати, чи є наступна сторінка
+    rows = (
+        db.query(
+            RecognitionLog.LogID,
+            RecognitionLog.CreatedAt,
+            RecognitionLog.AircraftTypeID,
+            RecognitionLog.Confidence,
+            RecognitionLog.ProcessingTimeMs,
+            RecognitionLog.SourceType,
+        )
+        .filter(*conditions)
+        .order_by(RecognitionLog.CreatedAt.desc(), RecognitionLog.LogID.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # перша сторінка несе й лічильники по типах (для карток статистики) —
+    # GROUP BY по тому ж індексу, без вибірки рядків
+    counts = None
+    if not cursor:
+        counts = (
+            db.query(RecognitionLog.AircraftTypeID, func.count())
+            .filter(*conditions)
+            .group_by(RecognitionLog.AircraftTypeID)
             .all()
         )
 
-        result = []
-        for log in logs:
-            # маппінг ID → текст
-            type_map = {
-                1: "Дрон",
-                2: "Вертоліт",
-                3: "Літак"
-            }
-
-            result.append({
-                "id": log.LogID,
-                "type": type_map.get(log.AircraftTypeID, "Невідомо"),
-                "time": log.CreatedAt.strftime("%d.%m.%Y %H:%M:%S"),
-                "confidence": log.Confidence,
-                "accuracy": log.Confidence,  
-                "duration": log.ProcessingTimeMs,
-                "source": "файл" if log.SourceType == "file" else "реальний час"
-            })
-
-        return jsonify(result)
-    finally:
-        db.close()
\ No newline at end of file
+    result = []
+    for log_id, created_at, type_id, confidence, duration, source in rows:
+        result.append({
+            "id": log_id,
+            "type": aircraft_type_label(type_id),
+            "time": created_at.strftime("%d.%m.%Y %H:%M:%S"),
+            "confidence": confidence,
+            "accuracy": confidence,
+            "duration": duration,
+            "source": SOURCE_NAMES.get(source, "реальний час")
+        })
+
+    response = {
+        "items": result,
+        "nextCursor": encode_cursor(rows[-1][1], rows[-1][0]) if has_more else None,
+    }
+    if counts is not None:
+        response["counts"] = {aircraft_type_label(type_id): n for type_id, n in counts}
+        response["total"] = sum(n for _, n in counts)
+
+    return jsonify(response)
+
+
+@logs_bp.route("/api/logs/export", methods=["GET"])
+def export_logs():
+    """
+    Вивантаження Recognition_Logs (з іменами користувачів і типів) потоком:
+    ?format=csv|parquet, фільтри ?user_id= ?type= ?source= ?from= ?to=.
+    Рядки читаються з БД частинами й одразу пишуться у відповідь — пам'ять
+    не залежить від кількості рядків. Потрібен токен: адміністратор вивантажує
+    всі логи (або ?user_id=), користувач — лише власні.
+    """
+    user = get_current_user()
+    if user is None:
+        return jsonify({"error": "Unauthorized"}), 401
+    user_id = request.args.get("user_id", type=int)
+    if user.RoleID != 1:
+        if user_id and user_id != user.UserID:
+            return jsonify({"error": "Forbidden"}), 403
+        user_id = user.UserID
+
+    fmt = request.args.get("format", "csv")
+    try:
+        check_format(fmt)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 501
+
+    try:
+        conditions = log_filters(request.args)
+    except LogQueryError as e:
+        return jsonify({"error": str(e)}), 400
+    if user_id:
+        conditions.append(RecognitionLog.UserID == user_id)
+
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    filename = f"recognition_logs_{datetime.now():%Y%m%d_%H%M%S}.{extension}"
+    return Response(
+        iter_export(fmt, conditions),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
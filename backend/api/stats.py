@@ -1,80 +1,156 @@
-from flask import Blueprint, jsonify
-from db import SessionLocal
+from datetime import datetime, timedelta
+
+from flask import Blueprint, jsonify, request
 from models.users import User
-from models.recognition_logs import RecognitionLog
+from models.recognition_rollups import RecognitionLogHourly
 from sqlalchemy import func
-from models.recognition_logs import RecognitionLog
-from models.aircraft_types import AircraftType
+from services.db_session import get_db
+from services.reference_cache import reference_cache
+from services.rollups import rollup_bounds, rollup_query
 
 stats_bp = Blueprint("stats", __name__)
 
+
+def time_range():
+    """
+    [start, end) з ?from=&to= (ISO) або ?hours=N / ?days=N (останні N годин/днів).
+    Без параметрів — уся історія. ValueError на некоректних значеннях.
+    """
+    start = request.args.get("from")
+    end = request.args.get("to")
+    start = datetime.fromisoformat(start) if start else None
+    end = datetime.fromisoformat(end) if end else None
+
+    hours = request.args.get("hours", type=float) or 24 * (request.args.get("days", type=float) or 0)
+    if hours:
+        start = datetime.now() - timedelta(hours=hours)
+    if start and end and start >= end:
+        raise ValueError("from must be before to")
+    return start, end
+
+
+def range_info(start, end):
+    """
+    Статистика рахується з погодинних rollup-ів, тож з точністю до години:
+    береться кожна година, що перетинається з [from, to). У відповіді —
+    фактичні межі (вирівняні по годинах), а не запитані.
+    """
+    start, end = rollup_bounds(start, end)
+    return {"from": start.isoformat() if start else None, "to": end.isoformat() if end else None,
+            "granularity": "hour"}
+
+
+# Агрегати читаються з погодинних rollup-ів (Recognition_Logs_Hourly), а не
+# з сирих логів, тож час відповіді не росте разом з кількістю розпізнавань.
 @stats_bp.route("/stats", methods=["GET"])
 def get_stats():
-    session = SessionLocal()
     try:
-        total_detections = session.query(func.count(RecognitionLog.LogID)).scalar()
-        active_users = session.query(func.count(User.UserID)).scalar()
-        avg_processing_time = session.query(func.avg(RecognitionLog.ProcessingTimeMs)).scalar() or 0
-
-        # Топ-5 користувачів
-        top_users_query = (
-            session.query(
-                User.Username.label("username"),
-                func.count(RecognitionLog.LogID).label("detectionsCount")
-            )
-            .join(RecognitionLog, RecognitionLog.UserID == User.UserID)
-            .group_by(User.UserID, User.Username)  # <-- додали Username
-            .order_by(func.count(RecognitionLog.LogID).desc())
-            .limit(5)
-            .all()
-        )
-        top_users = [{"username": u.username, "detectionsCount": u.detectionsCount} for u in top_users_query]
-
-        res = jsonify({
-            "totalDetections": total_detections,
-            "activeUsers": active_users,
-            "avgProcessingTime": avg_processing_time,
-            "topUsers": top_users
-        })
-
-        print(f"RESULT:{res}")
-
-        return res
-    finally:
-        session.close()
+        start, end = time_range()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    session = get_db()
+    detections, ms_sum = rollup_query(
+        session,
+        [func.sum(RecognitionLogHourly.Detections), func.sum(RecognitionLogHourly.ProcessingTimeMsSum)],
+        start, end,
+    ).one()
+    total_detections = int(detections or 0)
+    active_users = session.query(func.count(User.UserID)).scalar()
+    avg_processing_time = float(ms_sum) / total_detections if total_detections else 0
+
+    # Топ-5 користувачів
+    detections_sum = func.sum(RecognitionLogHourly.Detections)
+    top_users_query = (
+        rollup_query(session, [User.Username.label("username"), detections_sum.label("detectionsCount")],
+                     start, end)
+        .join(User, User.UserID == RecognitionLogHourly.UserID)
+        .group_by(User.UserID, User.Username)
+        .order_by(detections_sum.desc())
+        .limit(5)
+        .all()
+    )
+    top_users = [{"username": u.username, "detectionsCount": int(u.detectionsCount)} for u in top_users_query]
+
+    return jsonify({
+        "totalDetections": total_detections,
+        "activeUsers": active_users,
+        "avgProcessingTime": avg_processing_time,
+        "topUsers": top_users,
+        "range": range_info(start, end)
+    })
 
 @stats_bp.route("/statistics", methods=["GET"])
 def get_statistics():
-    session = SessionLocal()
     try:
-        # --- Статистика по типах апаратів ---
-        aircraft_counts = (
-            session.query(AircraftType.AircraftName, func.count(RecognitionLog.LogID))
-            .join(RecognitionLog, RecognitionLog.AircraftTypeID == AircraftType.AircraftTypeID)
-            .group_by(AircraftType.AircraftName)
-            .all()
-        )
-        aircraft_type_data = []
-        for name, count in aircraft_counts:
-            # Можна додати кольори за типом
-            color = "#8884d8"  # базовий
-            if name.lower() == "дрон": color = "#ef4444"
-            elif name.lower() == "літак": color = "#3b82f6"
-            elif name.lower() == "вертоліт": color = "#22c55e"
-            else: color = "#94a3b8"
-            aircraft_type_data.append({"name": name, "value": count, "color": color})
-
-        # --- Статистика по джерелах ---
-        source_counts = (
-            session.query(RecognitionLog.SourceType, func.count(RecognitionLog.LogID))
-            .group_by(RecognitionLog.SourceType)
-            .all()
-        )
-        source_data = [{"name": src, "value": count} for src, count in source_counts]
-
-        return jsonify({
-            "aircraftTypeData": aircraft_type_data,
-            "sourceData": source_data
-        })
-    finally:
-        session.close()
\ No newline at end of file
+        start, end = time_range()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # довідник типів — до з'єднання запиту (див. api/logs.py)
+    reference_cache.table("aircraft_types")
+    session = get_db()
+    detections_sum = func.sum(RecognitionLogHourly.Detections)
+
+    # --- Статистика по типах апаратів ---
+    aircraft_counts = (
+        rollup_query(session, [RecognitionLogHourly.AircraftTypeID, detections_sum], start, end)
+        .group_by(RecognitionLogHourly.AircraftTypeID)
+        .all()
+    )
+    # --- Статистика по джерелах ---
+    source_counts = (
+        rollup_query(session, [RecognitionLogHourly.SourceType, detections_sum], start, end)
+        .group_by(RecognitionLogHourly.SourceType)
+        .all()
+    )
+    source_data = [{"name": src, "value": int(count)} for src, count in source_counts]
+
+    # назви типів — з довідника
+    aircraft_type_data = []
+    for type_id, count in aircraft_counts:
+        aircraft = reference_cache.aircraft_type(type_id)
+        name = aircraft["name"] if aircraft else str(type_id)
+        # Можна додати кольори за типом
+        color = "#8884d8"  # базовий
+        if name.lower() == "дрон": color = "#ef4444"
+        elif name.lower() == "літак": color = "#3b82f6"
+        elif name.lower() == "вертоліт": color = "#22c55e"
+        else: color = "#94a3b8"
+        aircraft_type_data.append({"name": name, "value": int(count), "color": color})
+
+    return jsonify({
+        "aircraftTypeData": aircraft_type_data,
+        "sourceData": source_data,
+        "range": range_info(start, end)
+    })
+
+
+@stats_bp.route("/statistics/timeline", methods=["GET"])
+def get_statistics_timeline():
+    """Розпізнавання по годинах (або ?bucket=day — по днях) за обраний проміжок, для графіка."""
+    try:
+        start, end = time_range()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    by_day = request.args.get("bucket") == "day"
+
+    session = get_db()
+    rows = (
+        rollup_query(session, [RecognitionLogHourly.HourStart, RecognitionLogHourly.SourceType,
+                               func.sum(RecognitionLogHourly.Detections)], start, end)
+        .group_by(RecognitionLogHourly.HourStart, RecognitionLogHourly.SourceType)
+        .all()
+    )
+    points = {}
+    for hour, source, count in rows:
+        bucket = hour.replace(hour=0) if by_day else hour
+        point = points.setdefault(bucket, {"time": bucket.isoformat(), "total": 0})
+        point[source] = point.get(source, 0) + int(count)
+        point["total"] += int(count)
+
+    return jsonify({
+        "bucket": "day" if by_day else "hour",
+        "points": [points[b] for b in sorted(points)],
+        "range": range_info(start, end)
+    })
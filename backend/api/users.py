@@ -1,46 +1,40 @@
 from flask import Blueprint, jsonify
-from db import SessionLocal
+from services.db_session import get_db
+from services.users_service import user_cache
 from models.users import User
 
 users_bp = Blueprint("users", __name__)
 
 @users_bp.route("/api/users", methods=["GET"])
 def get_users():
-    db = SessionLocal()
-    try:
-        users = db.query(User).all()
+    db = get_db()
+    users = db.query(User).all()
 
-        result = []
-        for u in users:
-            result.append({
-                "id": u.UserID,
-                "username": u.Username,
-                "role": u.role.RoleName,   # <-- ПРАЦЮЄ через relationship
-                "createdAt": u.CreatedAt.strftime("%d.%m.%Y %H:%M:%S") if u.CreatedAt else "—",
-                "lastLogin": u.LastLogin.strftime("%d.%m.%Y %H:%M:%S") if u.LastLogin else "—"
-            })
+    result = []
+    for u in users:
+        result.append({
+            "id": u.UserID,
+            "username": u.Username,
+            "role": u.role.RoleName,   # <-- ПРАЦЮЄ через relationship
+            "createdAt": u.CreatedAt.strftime("%d.%m.%Y %H:%M:%S") if u.CreatedAt else "—",
+            "lastLogin": u.LastLogin.strftime("%d.%m.%Y %H:%M:%S") if u.LastLogin else "—"
+        })
 
-        return jsonify(result)
-
-    finally:
-        db.close()
+    return jsonify(result)
 
 @users_bp.route("/api/users/delete/<int:user_id>", methods=["DELETE"])
 def delete_user(user_id):
-    db = SessionLocal()
-    try:
-        user = db.query(User).filter(User.UserID == user_id).first()
+    db = get_db()
+    user = db.query(User).filter(User.UserID == user_id).first()
 
-        print(f"USER:{user}")
-        if not user:
-            return jsonify({"error": "User not found"}), 404
+    if not user:
+        return jsonify({"error": "User not found"}), 404
 
-        if user.Username == "admin":
-            return jsonify({"error": "Cannot delete admin"}), 400
+    if user.Username == "admin":
+        return jsonify({"error": "Cannot delete admin"}), 400
 
-        db.delete(user)
-        db.commit()
+    db.delete(user)
+    db.commit()
+    user_cache.invalidate(user_id)
 
-        return jsonify({"success": True})
-    finally:
-        db.close()
\ No newline at end of file
+    return jsonify({"success": True})
\ No newline at end of file
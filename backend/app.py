@@ -1,20 +1,33 @@
 from flask import Flask, request, jsonify, g
 from flask_cors import CORS
-import tensorflow as tf
 import numpy as np
-import librosa
 import os
-import tempfile
-from werkzeug.utils import secure_filename
-from pydub import AudioSegment
 import logging
+import tempfile
+import threading
 from db import Base, engine
 import models
 import time
 from routes.system import system_bp, register_request, register_request_time
 from services.files_service import save_uploaded_file
-from services.logging_service import save_recognition_log
-from db import SessionLocal  # припускаю, що db.SessionLocal доступний
+from services.logging_service import queue_recognition_log, save_recognition_log
+from services.batching import QueueFullError
+from utils.audio_io import AudioDecodeError
+from services.feature_pool import clip_features as pool_clip_features, feature_pool
+from services.result_cache import result_cache
+from services.async_jobs import ASYNC_SPOOL_DIR, async_jobs
+from services.tracing import processing_ms, span, traced
+from services.resource_sampler import resource_sampler
+from services.reference_cache import reference_cache
+from services.users_service import authenticated_user_id, get_current_user
+from services.long_recording import analyze_long_recording, check_window
+from services.model_service import (
+    CLASS_LABELS, MODEL_FILES, get_active_model_keys, get_scheduler, invalidate_active_models, model_fingerprint,
+    predict, readiness, schedulers, start_preload, unload_model
+)
+from services.ensemble import FUSION_METHODS, fuse, predict_all
+from db import pool_stats
+from services import db_session
 from models.users import User
 from models.audio_files import AudioFile
 from models.recognition_logs import RecognitionLog
@@ -26,6 +39,9 @@ from datetime import datetime
 # ======================== DB INIT ==========================
 def create_db():
     Base.metadata.create_all(bind=engine)
+    # create_all не додає індекси до вже наявних таблиць
+    for index in RecognitionLog.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
 
 create_db()
 
@@ -33,18 +49,17 @@ logging.basicConfig(level=logging.INFO)
 
 app = Flask(__name__)
 CORS(app)
+# одна сесія БД на запит (db_session.get_db), закривається в teardown за будь-якого виходу
+db_session.init_app(app)
 
 
-from db import SessionLocal
 from sqlalchemy import text
 
 @app.route("/test_db")
 def test_db():
     try:
-        session = SessionLocal()
-        result = session.execute(text("SELECT 1")).fetchone()
-        session.close()
-        return {"db_status": "ok", "result": result[0]}
+        result = db_session.get_db().execute(text("SELECT 1")).fetchone()
+        return {"db_status": "ok", "result": result[0], "pool": pool_stats()}
     except Exception as e:
         return {"db_status": "failed", "error": str(e)}
 
@@ -60,21 +75,15 @@ from api.users import users_bp
 app.register_blueprint(users_bp)
 from api.stats import stats_bp
 app.register_blueprint(stats_bp, url_prefix="/api")
+from routes.stream import stream_bp
+app.register_blueprint(stream_bp, url_prefix="/api/stream")
+from routes.jobs import jobs_bp
+app.register_blueprint(jobs_bp, url_prefix="/api/jobs")
 
 
 def get_current_user_from_header():
-    from db import SessionLocal
-    from models.users import User
-
-    user_id = request.headers.get("X-User-ID")
-    if not user_id:
-        return None
-
-    db = SessionLocal()
-    try:
-        return db.query(User).filter(User.UserID == int(user_id)).first()
-    finally:
-        db.close()
+    # Bearer-токен (або X-User-ID) → користувач із кешу, без запиту до БД на кожен виклик
+    return get_current_user()
 
 # ======================== PATHS ==========================
 BASE_DIR = os.path.dirname(__file__)
@@ -82,63 +91,191 @@ UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 
-# ----- MODEL PATHS -----
-MODEL_FILES = {
-    "4": "model.h5",
-    "6": "yamnet.h5",
-    "5": "crnn.h5",
-}
+# ================== FEATURE PARAMETERS =====================
+SAMPLE_RATE = 22050
+CLIP_DURATION = 5.0
+N_MFCC = 40
+
+
+def clip_features(data: bytes):
+    """
+    Декодує кліп з пам'яті та рахує ознаки (1, N_MFCC, 1) — у пулі процесів,
+    якщо FEATURE_POOL_WORKERS > 0. Помилки — винятками, щоб їх не кешувати.
+    """
+    return pool_clip_features(data, sr=SAMPLE_RATE, duration=CLIP_DURATION, n_mfcc=N_MFCC)
 
-loaded_models = {}  # Cache storage
 
-# ================== MODEL LOADING =========================
-def get_model(model_key: str):
-    """Load model dynamically and cache it."""
-    if model_key not in MODEL_FILES:
-        raise ValueError(f"Unknown model key: {model_key}")
+def get_aircraft_type_id(label):
+    # довідник AircraftTypes у пам'яті — без запиту до БД на кожен /analyze
+    with span("db_lookup"):
+        try:
+            return reference_cache.aircraft_type_id(label)
+        except Exception:
+            logging.exception("AircraftTypes are not available:")
+            return None
 
-    if model_key in loaded_models:
-        return loaded_models[model_key]
 
-    model_path = os.path.join(BASE_DIR, MODEL_FILES[model_key])
-    if not os.path.exists(model_path):
-        raise FileNotFoundError(f"Model file not found: {model_path}")
+def analyze_long(stream, model_key, window_seconds, hop_seconds):
+    """/analyze з mode=long: таймлайн по перекритих вікнах + загальний вердикт. Повертає (body, status)."""
+    try:
+        # потік читається блоками — весь запис у пам'ять не потрапляє;
+        # декодування, ознаки й predict тут чергуються, тому це один етап
+        with span("long_recording"):
+            result = analyze_long_recording(
+                stream, lambda features: predict(model_key, features), CLASS_LABELS,
+                sr=SAMPLE_RATE, n_mfcc=N_MFCC,
+                window_seconds=window_seconds, hop_seconds=hop_seconds,
+            )
+    except AudioDecodeError:
+        logging.exception("Long recording decoding failed:")
+        return {"error": "Не вдалося конвертувати аудіо"}, 500
+    except QueueFullError as e:
+        return {"error": str(e)}, 503
+    except Exception as e:
+        logging.exception("Long analyze error:")
+        return {"error": str(e)}, 500
 
-    logging.info(f"Loading model: {model_path}")
-    model = tf.keras.models.load_model(model_path)
-    loaded_models[model_key] = model
-    logging.info(f"Model '{model_key}' loaded successfully.")
+    if result is None:
+        return {"error": "Порожній аудіофайл"}, 400
 
-    return model
+    result["model"] = model_key
+    result["aircraftTypeID"] = get_aircraft_type_id(result["result"])
+    return result, 200
 
-# ================== CLASS LABELS ==========================
-CLASS_LABELS = ["drone", "airplane", "helicopter"]
 
-# ================== FEATURE EXTRACTION =====================
-def extract_features(audio_file_path, sr=22050, n_mfcc=40, duration=5.0):
+def analyze_ensemble(features, fusion):
+    """Декодування й ознаки — один раз, далі всі активні моделі паралельно + злиття."""
     try:
-        y, sr = librosa.load(audio_file_path, sr=sr, duration=duration, mono=True)
-        mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=n_mfcc)
-        mfccs_mean = np.mean(mfccs, axis=1)
-        return np.expand_dims(mfccs_mean, axis=(0, -1))
+        model_keys = get_active_model_keys()
+    except Exception as e:
+        logging.exception("Cannot read active models:")
+        return {"error": str(e)}, 500
+
+    with span("predict"):
+        probs, errors = predict_all(features, model_keys, get_scheduler)
+    if not probs:
+        return {"error": "Жодна модель ансамблю недоступна", "errors": errors}, 500
+
+    weights = {key: MODEL_FILES[key].get("weight", 1.0) for key in probs}
+    idx, confidence, fused, votes = fuse(probs, fusion, weights)
+    label = CLASS_LABELS[idx]
+
+    return {
+        "model": "ensemble",
+        "fusion": fusion,
+        "result": label,
+        "confidence": round(confidence * 100, 2),
+        "aircraftTypeID": get_aircraft_type_id(label),
+        "probabilities": {CLASS_LABELS[i]: round(float(p) * 100, 2) for i, p in enumerate(fused)},
+        "votes": {CLASS_LABELS[i]: int(v) for i, v in enumerate(votes)},
+        "models": {
+            key: {
+                "result": CLASS_LABELS[int(np.argmax(p))],
+                "confidence": round(float(np.max(p)) * 100, 2),
+                "weight": weights[key],
+            }
+            for key, p in probs.items()
+        },
+        "errors": errors,
+    }, 200
+
+
+def analyze_clip(data, model_key, fusion=None):
+    """Перші CLIP_DURATION секунд файлу: одна модель або ансамбль (model_key == "ensemble")."""
+    # Той самий файл з тими самими параметрами ознак -> той самий ключ
+    cache_key = result_cache.make_key(data, sr=SAMPLE_RATE, duration=CLIP_DURATION, n_mfcc=N_MFCC)
+
+    try:
+        # Декодуємо прямо з пам'яті — без тимчасових файлів
+        features = result_cache.get_or_compute(f"features:{cache_key}", lambda: clip_features(data))
+    except AudioDecodeError:
+        logging.exception("Audio decoding failed:")
+        return {"error": "Не вдалося конвертувати аудіо"}, 500
     except Exception:
         logging.exception("Feature extraction error:")
-        return None
+        return {"error": "Помилка при обробці аудіо"}, 500
+
+    if model_key == "ensemble":
+        return analyze_ensemble(features, fusion)
+
+    def predict_traced():
+        with span("predict"):
+            return predict(model_key, features)
 
-# ================== CONVERT TO WAV =========================
-def convert_to_wav(in_path):
-    wav_tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-    wav_tmp.close()
-    wav_path = wav_tmp.name
     try:
-        sound = AudioSegment.from_file(in_path)
-        sound.export(wav_path, format="wav")
-        return wav_path
+        # ключ включає backend і відбиток ваг: інша модель під тим самим ключем — інший запис
+        preds = result_cache.get_or_compute(f"preds:{model_key}:{model_fingerprint(model_key)}:{cache_key}",
+                                            predict_traced)
+        idx = int(np.argmax(preds))
+        confidence = float(np.max(preds))
+        label = CLASS_LABELS[idx]
+        aircraft_id = get_aircraft_type_id(label)
+
+        return {
+            "model": model_key,
+            "result": label,
+            "confidence": round(confidence * 100, 2),
+            "aircraftTypeID": aircraft_id
+        }, 200
+
+    except QueueFullError as e:
+        return {"error": str(e)}, 503
+    except Exception as e:
+        logging.exception("Analyze error:")
+        return {"error": str(e)}, 500
+
+
+def log_recognition(body, user_id, source_type):
+    """
+    Сервер сам пише Recognition_Logs (через чергу з відкладеним записом) — без окремого /api/log.
+    user_id — лише з перевіреного токена (authenticated_user_id), як і в /api/log: анонімний
+    запит аналізується, але не логується.
+    """
+    if user_id is None or body.get("aircraftTypeID") is None:
+        return
+    try:
+        queue_recognition_log(user_id, body["aircraftTypeID"], body["confidence"],
+                              body["processingTimeMs"], source_type)
+        body["logged"] = True
     except Exception:
-        logging.exception("Conversion to WAV failed:")
-        if os.path.exists(wav_path):
-            os.remove(wav_path)
-        return None
+        logging.exception("Queueing recognition log failed:")
+
+
+def analyze_spooled(path, model_key, fusion, long_params, user_id=None):
+    """Фонова задача async /analyze: той самий аналіз над збереженим на диск завантаженням."""
+    with traced("analyze_async") as trace:
+        with open(path, "rb") as f:
+            if long_params is not None:
+                body, status = analyze_long(f, model_key, *long_params)
+            else:
+                with span("upload"):
+                    data = f.read()
+                body, status = analyze_clip(data, model_key, fusion)
+    if status == 200:
+        body.update(trace.to_dict())
+        log_recognition(body, user_id, "file")
+    return body, status
+
+
+def submit_async(file, model_key, fusion, long_params, user_id=None):
+    """Зберігає завантаження у spool-файл і ставить аналіз у фонову чергу -> 202 + jobId."""
+    fd, path = tempfile.mkstemp(prefix="analyze_", dir=ASYNC_SPOOL_DIR)
+    os.close(fd)
+    with span("upload"):
+        file.save(path)
+
+    def cleanup():
+        os.remove(path)
+
+    try:
+        job = async_jobs.submit(analyze_spooled, path, model_key, fusion, long_params, user_id, cleanup=cleanup)
+    except QueueFullError as e:
+        cleanup()
+        return jsonify({"error": str(e)}), 503
+
+    response = jsonify(job.to_dict())
+    response.headers["Location"] = f"/analyze/jobs/{job.job_id}"
+    return response, 202
 
 
 # ======================= /analyze ==========================
@@ -149,68 +286,109 @@ def analyze_audio():
 
     # Read selected model (frontend sends: formData.append("model", selectedModel))
     model_key = request.form.get("model", "custom")
-    print(f"Model: {model_key}")
+    logging.debug(f"Model: {model_key}")
 
-    try:
-        model = get_model(model_key)
-    except Exception as e:
-        return jsonify({"error": f"Помилка завантаження моделі: {str(e)}"}), 500
+    # model=ensemble — усі активні моделі на одних і тих самих ознаках
+    ensemble = model_key == "ensemble"
+    fusion = request.form.get("fusion", "mean")
+    if ensemble and fusion not in FUSION_METHODS:
+        return jsonify({"error": f"Невідомий метод злиття: {fusion}"}), 400
+
+    if not ensemble:
+        try:
+            get_scheduler(model_key)
+        except Exception as e:
+            return jsonify({"error": f"Помилка завантаження моделі: {str(e)}"}), 500
+
+    # Довгий запис: ковзне вікно по всьому файлу замість перших 5 секунд
+    long_params = None
+    if request.form.get("mode") == "long":
+        if ensemble:
+            return jsonify({"error": "mode=long не підтримує ансамбль"}), 400
+        try:
+            window_seconds = float(request.form.get("window", CLIP_DURATION))
+            hop_seconds = float(request.form.get("hop", window_seconds / 2))
+        except ValueError:
+            return jsonify({"error": "Некоректні window/hop"}), 400
+        try:
+            check_window(window_seconds, hop_seconds, sr=SAMPLE_RATE)
+        except ValueError as e:
+            return jsonify({"error": f"Некоректні window/hop: {e}"}), 400
+        long_params = (window_seconds, hop_seconds)
 
     file = request.files["file"]
-    filename = secure_filename(file.filename)
-    tmp_in = tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1] or ".wav")
 
-    try:
-        file.save(tmp_in.name)
-        tmp_in.close()
-
-        ext = os.path.splitext(filename)[1].lower()
-        if ext != ".wav":
-            wav_path = convert_to_wav(tmp_in.name)
-            os.remove(tmp_in.name)
-            if not wav_path:
-                return jsonify({"error": "Не вдалося конвертувати аудіо"}), 500
-            target_path = wav_path
+    # async=1 (або Prefer: respond-async): 202 + jobId, результат — GET /analyze/jobs/<id>
+    if request.form.get("async") in ("1", "true") or "respond-async" in request.headers.get("Prefer", ""):
+        return submit_async(file, model_key, fusion, long_params, authenticated_user_id())
+
+    # етапи (upload, decode, features, predict, db_lookup) міряє сервер;
+    # processingTimeMs/traceId у відповіді — авторитетний час обробки
+    with traced("analyze") as trace:
+        if long_params is not None:
+            body, status = analyze_long(file.stream, model_key, *long_params)
         else:
-            target_path = tmp_in.name
+            with span("upload"):
+                data = file.read()
+            body, status = analyze_clip(data, model_key, fusion)
+    if status == 200:
+        body.update(trace.to_dict())
+        log_recognition(body, authenticated_user_id(), "file")
+    return jsonify(body), status
+
+
+# ============= ASYNC /analyze: статус задачі =================
+ASYNC_MAX_WAIT_SECONDS = 30
+
+
+@app.route("/analyze/jobs/<job_id>", methods=["GET"])
+def get_analyze_job(job_id):
+    # ?wait=N — long-poll: відповідь, щойно задача завершиться, але не пізніше N секунд
+    wait = min(max(request.args.get("wait", 0, type=float), 0), ASYNC_MAX_WAIT_SECONDS)
+    job = async_jobs.wait(job_id, wait)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200 if job.done.is_set() else 202
+
 
-        features = extract_features(target_path)
+@app.route("/analyze/jobs", methods=["GET"])
+def get_analyze_jobs_stats():
+    return jsonify(async_jobs.stats())
 
-        if os.path.exists(target_path):
-            os.remove(target_path)
 
-        if features is None:
-            return jsonify({"error": "Помилка при обробці аудіо"}), 500
+def analyze_stream_chunk(audio_file, model_key):
+    with span("upload"):
+        data = audio_file.read()
 
-        preds = model.predict(features)
+    try:
+        # WAV декодується в процесі, webm від MediaRecorder — через ffmpeg pipe
+        features = clip_features(data)
+    except AudioDecodeError:
+        logging.exception("Stream decoding failed:")
+        return {"error": "Помилка декодування аудіо"}, 500
+    except Exception:
+        logging.exception("Stream feature extraction failed:")
+        return {"error": "Помилка екстракції ознак"}, 500
+
+    try:
+        with span("predict"):
+            preds = predict(model_key, features)
         idx = int(np.argmax(preds))
         confidence = float(np.max(preds))
         label = CLASS_LABELS[idx]
-        aircraft = label
-
-        db = SessionLocal()
-        aircraft_obj = db.query(AircraftType).filter(AircraftType.AircraftName == aircraft.lower()).first()
-        aircraft_id = aircraft_obj.AircraftTypeID
-        print(aircraft_id)
-
-        db.close()
 
-        return jsonify({
+        return {
             "model": model_key,
             "result": label,
             "confidence": round(confidence * 100, 2),
-            "aircraftTypeID": aircraft_id
-        })
+            "aircraftTypeID": get_aircraft_type_id(label)
+        }, 200
 
-    except Exception as e:
-        logging.exception("Analyze error:")
-        return jsonify({"error": str(e)}), 500
-    finally:
-        try:
-            if os.path.exists(tmp_in.name):
-                os.remove(tmp_in.name)
-        except:
-            pass
+    except QueueFullError as e:
+        return {"error": str(e)}, 503
+    except Exception:
+        logging.exception("Stream processing error:")
+        return {"error": "Помилка обробки"}, 500
 
 
 # ======================= /analyze_stream ==========================
@@ -222,42 +400,18 @@ def analyze_stream():
     model_key = request.form.get("model", "custom")
 
     try:
-        model = get_model(model_key)
+        get_scheduler(model_key)
     except Exception as e:
         return jsonify({"error": f"Помилка завантаження моделі: {str(e)}"}), 500
 
     audio_file = request.files["audio"]
+    with traced("analyze_stream") as trace:
+        body, status = analyze_stream_chunk(audio_file, model_key)
+    if status == 200:
+        body.update(trace.to_dict())
+        log_recognition(body, authenticated_user_id(), "realtime")
+    return jsonify(body), status
 
-    # Ми тепер очікуємо WAV, тому зберігаємо як .wav без конвертації
-    tmp_in = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-    audio_file.save(tmp_in.name)
-    tmp_in.close()
-
-    try:
-        # WAV приходить уже коректний — одразу читаємо його
-        features = extract_features(tmp_in.name)
-
-        if features is None:
-            return jsonify({"error": "Помилка екстракції ознак"}), 500
-
-        preds = model.predict(features)
-        idx = int(np.argmax(preds))
-        confidence = float(np.max(preds))
-        label = CLASS_LABELS[idx]
-
-        return jsonify({
-            "model": model_key,
-            "result": label,
-            "confidence": round(confidence * 100, 2)
-        })
-
-    except Exception:
-        logging.exception("Stream processing error:")
-        return jsonify({"error": "Помилка обробки"}), 500
-
-    finally:
-        if os.path.exists(tmp_in.name):
-            os.remove(tmp_in.name)
 
 @app.before_request
 def before():
@@ -331,54 +485,47 @@ def analyze_file():
 """
 from flask import request, jsonify
 from models import RecognitionLog
-from db import SessionLocal
 
 @app.route("/api/log", methods=["POST"])
 def create_log():
-    session = SessionLocal()
+    # /analyze з токеном пише лог сам; цей маршрут — для клієнтів, що логують окремо.
+    # Чий це лог — лише з токена, UserID з тіла запиту ігнорується
+    user_id = authenticated_user_id()
+    if user_id is None:
+        return jsonify({"success": False, "error": "Unauthorized"}), 401
     try:
         data = request.json
-        print(f"DATA:{data}")
-        log = RecognitionLog(
-            UserID=data["UserID"],
-            AircraftTypeID=data["AircraftTypeID"],
-            Confidence=data["Confidence"],
-            SourceType=data["SourceType"],
-            ProcessingTimeMs=data["ProcessingTimeMs"]
+        # якщо клієнт передав TraceID з /analyze — час обробки беремо виміряний сервером
+        server_ms = processing_ms(data["TraceID"]) if data.get("TraceID") else None
+        queue_recognition_log(
+            user_id, data["AircraftTypeID"], data["Confidence"],
+            server_ms if server_ms is not None else data["ProcessingTimeMs"], data["SourceType"]
         )
-        print(f"USERID:{data["UserID"]}")
-        session.add(log)
-        session.commit()
-        return jsonify({"success": True, "LogID": log.LogID})
+        # рядок з'явиться в Recognition_Logs з наступним скиданням черги, LogID ще немає
+        return jsonify({"success": True, "queued": True})
     except Exception as e:
-        session.rollback()
         return jsonify({"success": False, "error": str(e)})
-    finally:
-        session.close()
 
 @app.route("/api/models/active", methods=["GET"])
 def get_active_models():
-    session = SessionLocal()
     try:
-        models = session.query(Model).filter(Model.IsActive == 1).all()
+        models = reference_cache.models(active_only=True)
 
         return jsonify([
             {
-                "id": m.ModelID,
-                "name": m.ModelName,
-                "description": m.Description
+                "id": model_id,
+                "name": m["name"],
+                "description": m["description"]
             }
-            for m in models
+            for model_id, m in models.items()
         ])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        session.close()
 
 # ============= TOGGLE MODEL (приховати/показати) =================
 @app.route("/api/models/toggle/<int:model_id>", methods=["PUT"])
 def toggle_model(model_id):
-    session = SessionLocal()
+    session = db_session.get_db()
     try:
         model = session.query(Model).filter(Model.ModelID == model_id).first()
         if not model:
@@ -388,6 +535,11 @@ def toggle_model(model_id):
         model.IsActive = 0 if model.IsActive == 1 else 1
         session.commit()
 
+        # кеш Models перечитується, вимкнена модель одразу звільняє пам'ять
+        invalidate_active_models()
+        if model.IsActive == 0:
+            unload_model(str(model.ModelID))
+
         return jsonify({
             "success": True,
             "id": model.ModelID,
@@ -396,25 +548,40 @@ def toggle_model(model_id):
     except Exception as e:
         session.rollback()
         return jsonify({"error": str(e)}), 500
-    finally:
-        session.close()
 
 @app.route("/api/models", methods=["GET"])
 def get_all_models():
-    session = SessionLocal()
-    try:
-        models = session.query(Model).all()
-        return jsonify([
-            {
-                "id": m.ModelID,
-                "name": m.ModelName,
-                "description": m.Description,
-                "isActive": m.IsActive
-            }
-            for m in models
-        ])
-    finally:
-        session.close()
+    models = reference_cache.models()
+    return jsonify([
+        {
+            "id": model_id,
+            "name": m["name"],
+            "description": m["description"],
+            "isActive": 1 if m["is_active"] else 0
+        }
+        for model_id, m in models.items()
+    ])
+
+@app.route("/api/models/batching", methods=["GET"])
+def get_batching_stats():
+    return jsonify([s.stats() for s in list(schedulers.values())])
+
+# ============= READINESS (для балансувальника) =================
+@app.route("/ready", methods=["GET"])
+def ready():
+    is_ready, states = readiness()
+    return jsonify({"ready": is_ready, "models": states}), 200 if is_ready else 503
+
+# Reference tables (AircraftTypes, Models, System_Settings) before the
+# preload, which reads the active models from them
+reference_cache.load()
+# Load and warm up active models in the background so the first requests
+# after a deploy do not pay for it
+start_preload()
+# CPU/RAM/GPU history for the admin panel is sampled from startup on
+resource_sampler.start()
+if feature_pool is not None:
+    threading.Thread(target=feature_pool.warmup, name="feature-pool-warmup", daemon=True).start()
 
 # ======================= MAIN ==========================
 if __name__ == "__main__":
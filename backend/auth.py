@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify
-from db import SessionLocal
+from services.auth_tokens import AUTH_TOKEN_TTL, issue_token
+from services.db_session import get_db
+from services.users_service import authenticated_user_id, user_cache
 from werkzeug.security import generate_password_hash, check_password_hash
 from models.users import User
 from sqlalchemy import text
@@ -19,7 +21,7 @@ def login():
     if not username or not password:
         return jsonify({"success": False, "error": "missing_data"}), 400
 
-    session = SessionLocal()
+    session = get_db()
 
     user = session.query(User).filter(User.Username == username).first()
     if not user:
@@ -32,11 +34,15 @@ def login():
     user.LastLogin = datetime.now()
     session.commit()
 
+    role = "admin" if user.RoleID == 1 else "user"
     return jsonify({
         "success": True,
         "UserID": user.UserID,  # <-- ДОДАНО !!!
         "username": user.Username,
-        "role": "admin" if user.RoleID == 1 else "user"
+        "role": role,
+        # підписаний токен: Authorization: Bearer <token> у наступних запитах
+        "token": issue_token(user.UserID, role),
+        "expiresIn": AUTH_TOKEN_TTL
     }), 200
 
 # -------------------------
@@ -48,7 +54,7 @@ def register():
     username = data.get("username")
     password = data.get("password")
 
-    session = SessionLocal()
+    session = get_db()
 
     # Чи зайнятий логін?
     exists = session.query(User).filter(User.Username == username).first()
@@ -69,23 +75,30 @@ def register():
     session.add(new_user)
     session.commit()
 
+    role = "admin" if role_id == 1 else "user"
     return jsonify({
     "success": True,
-    "UserID": new_user.UserID
+    "UserID": new_user.UserID,
+    "role": role,
+    "token": issue_token(new_user.UserID, role),
+    "expiresIn": AUTH_TOKEN_TTL
     })
 
 @auth_bp.route("/api/change_password", methods=["POST"])
 def change_password():
-    session = SessionLocal()
+    # чий пароль — лише з токена, user_id з тіла запиту ігнорується
+    user_id = authenticated_user_id()
+    if user_id is None:
+        return jsonify({"error": "Unauthorized"}), 401
 
     data = request.json
-    user_id = data.get("user_id")
     old_password = data.get("old_password")
     new_password = data.get("new_password")
 
-    if not user_id or not old_password or not new_password:
+    if not old_password or not new_password:
         return jsonify({"error": "Missing data"}), 400
 
+    session = get_db()
     user = session.query(User).filter(User.UserID == user_id).first()
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -98,20 +111,18 @@ def change_password():
     user.PasswordHash = generate_password_hash(new_password)
 
     session.commit()
-    session.close()
+    user_cache.invalidate(user.UserID)
 
     return jsonify({"success": True})
 
 @auth_bp.route("/api/delete_account", methods=["DELETE"])
 def delete_account():
-    session = SessionLocal()
-
-    data = request.json
-    user_id = data.get("user_id")
-
-    if not user_id:
-        return jsonify({"error": "Missing user_id"}), 400
+    # видалити можна лише власний акаунт — той, що в токені
+    user_id = authenticated_user_id()
+    if user_id is None:
+        return jsonify({"error": "Unauthorized"}), 401
 
+    session = get_db()
     user = session.query(User).filter(User.UserID == user_id).first()
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -119,6 +130,6 @@ def delete_account():
     # Видаляємо юзера
     session.delete(user)
     session.commit()
-    session.close()
+    user_cache.invalidate(user_id)
 
     return jsonify({"success": True})
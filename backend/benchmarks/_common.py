@@ -0,0 +1,80 @@
+"""Shared helpers for the benchmark scripts: synthetic audio and timing."""
+import io
+import statistics
+import subprocess
+import time
+
+import numpy as np
+import soundfile as sf
+
+from utils.audio_io import FFMPEG_BINARY
+
+
+def synth_audio(seconds=5.0, sr=22050, seed=0):
+    """Engine-like harmonic hum plus noise, float32 mono in [-1, 1]."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = rng.uniform(80, 300)
+    y = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+    y = y * (0.6 + 0.4 * np.sin(2 * np.pi * 0.5 * t)) + 0.1 * rng.standard_normal(t.size)
+    return (0.3 * y / np.max(np.abs(y))).astype(np.float32)
+
+
+def encode(y, sr, fmt):
+    """Encode a waveform to wav/flac in-process or mp3/webm through ffmpeg."""
+    if fmt in ("wav", "flac"):
+        buf = io.BytesIO()
+        sf.write(buf, y, sr, format=fmt.upper(), subtype="PCM_16")
+        return buf.getvalue()
+
+    codec = {"mp3": ["-f", "mp3"], "webm": ["-c:a", "libopus", "-f", "webm"]}[fmt]
+    proc = subprocess.run(
+        [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error",
+         "-f", "f32le", "-ar", str(sr), "-ac", "1", "-i", "pipe:0"] + codec + ["pipe:1"],
+        input=y.astype("<f4").tobytes(), capture_output=True, check=True,
+    )
+    return proc.stdout
+
+
+def make_corpus(formats=("wav", "flac", "mp3", "webm"), durations=(5.0,), sample_rates=(22050, 44100), count=3):
+    """List of (name, bytes, fmt) covering every format x duration x sample rate."""
+    corpus = []
+    for fmt in formats:
+        for seconds in durations:
+            for sr in sample_rates:
+                for i in range(count):
+                    name = f"{fmt}_{seconds:g}s_{sr}_{i}"
+                    corpus.append((name, encode(synth_audio(seconds, sr, seed=i), sr, fmt), fmt))
+    return corpus
+
+
+def timed(fn, *args, **kwargs):
+    """(result, elapsed_ms)"""
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def summarize(samples_ms):
+    samples = sorted(samples_ms)
+    if not samples:
+        return {"n": 0}
+    return {
+        "n": len(samples),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+    }
+
+
+def stand_in_model(input_shape, n_classes=3, seed=0):
+    """Tiny untrained Keras model with a real model's input/output shape, for timing without weights."""
+    import tensorflow as tf
+
+    tf.keras.utils.set_random_seed(seed)
+    return tf.keras.Sequential([
+        tf.keras.Input(input_shape),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(64, activation="relu"),
+        tf.keras.layers.Dense(n_classes, activation="softmax"),
+    ])
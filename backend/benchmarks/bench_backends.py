@@ -0,0 +1,126 @@
+"""
+Accuracy / latency / memory of the inference backends per model.
+
+    cd backend && python -m benchmarks.bench_backends [--models 4] [--eval-dir DIR] [--json out.json]
+
+Every (model, backend) pair is loaded in a fresh process so the reported RSS
+is what serving that backend costs (TensorFlow itself included for keras).
+Accuracy is agreement of the top-1 class and max probability difference
+against the Keras model; with --eval-dir laid out as DIR/<label>/*.wav
+accuracy against the labels is reported too. Run python -m
+tools.convert_tflite first to produce the TFLite artifacts.
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from benchmarks._common import summarize, synth_audio, timed
+from services.inference_backends import BACKENDS, tflite_path
+from services.model_service import CLASS_LABELS, MODEL_DIR, MODEL_FILES
+from utils.audio_io import decode_audio
+from utils.audio_processing import extract_features_batch
+
+SR = 22050
+DURATION = 5.0
+N_MFCC = 40
+BATCH_SIZES = (1, 16)
+
+
+def eval_set(eval_dir=None, clips=64):
+    """(features, labels or None)"""
+    if not eval_dir:
+        y = [synth_audio(DURATION, SR, seed=1000 + i) for i in range(clips)]
+        return extract_features_batch(y, sr=SR, n_mfcc=N_MFCC), None
+
+    y, labels = [], []
+    for idx, label in enumerate(CLASS_LABELS):
+        folder = os.path.join(eval_dir, label)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            with open(os.path.join(folder, name), "rb") as f:
+                y.append(decode_audio(f.read(), sr=SR, duration=DURATION))
+            labels.append(idx)
+    return extract_features_batch(y, sr=SR, n_mfcc=N_MFCC), np.array(labels)
+
+
+def _measure(model_path, backend, features, repeats):
+    """Runs in a fresh process: load, warm up, time, predict the eval set."""
+    import psutil
+
+    from services.inference_backends import load_backend
+
+    proc = psutil.Process()
+    rss_before = proc.memory_info().rss
+    model, load_ms = timed(load_backend, model_path, backend)
+    for batch_size in BATCH_SIZES:
+        model.predict(features[:batch_size])
+
+    latency = {}
+    for batch_size in BATCH_SIZES:
+        batch = features[:batch_size]
+        latency[f"batch_{batch_size}"] = summarize([timed(model.predict, batch)[1] for _ in range(repeats)])
+
+    preds = np.concatenate([model.predict(features[i:i + 16]) for i in range(0, len(features), 16)])
+    return {
+        "load_ms": round(load_ms, 1),
+        "rss_mb": round(proc.memory_info().rss / 2 ** 20, 1),
+        "rss_delta_mb": round((proc.memory_info().rss - rss_before) / 2 ** 20, 1),
+        "model_bytes": model.memory_bytes(),
+        "latency": latency,
+    }, preds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="*", default=list(MODEL_FILES))
+    parser.add_argument("--eval-dir", help="labelled audio: DIR/<label>/<file>")
+    parser.add_argument("--clips", type=int, default=64, help="synthetic clips without --eval-dir")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    features, labels = eval_set(args.eval_dir, args.clips)
+    report = {"clips": len(features), "labelled": labels is not None, "models": {}}
+    ctx = get_context("spawn")
+
+    for key in args.models:
+        model_path = os.path.join(MODEL_DIR, MODEL_FILES[key]["file"])
+        if not os.path.exists(model_path):
+            print(f"[{key}] {model_path} not found, skipped")
+            continue
+
+        results, reference = {}, None
+        for backend in BACKENDS:
+            if backend != "keras" and not os.path.exists(tflite_path(model_path, backend.split("_", 1)[1])):
+                continue
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+                row, preds = executor.submit(_measure, model_path, backend, features, args.repeats).result()
+
+            if reference is None:
+                reference = preds
+            row["top1_agreement"] = round(float(np.mean(preds.argmax(1) == reference.argmax(1))), 4)
+            row["max_prob_diff"] = round(float(np.abs(preds - reference).max()), 5)
+            if labels is not None:
+                row["accuracy"] = round(float(np.mean(preds.argmax(1) == labels)), 4)
+            results[backend] = row
+
+            lat = row["latency"]
+            print(f"[{key}] {backend:12s} rss {row['rss_mb']:7.1f} MB (+{row['rss_delta_mb']:.1f})  "
+                  f"size {row['model_bytes'] / 1024:8.1f} KB  "
+                  f"b1 {lat['batch_1']['p50_ms']:7.3f} ms  b16 {lat['batch_16']['p50_ms']:7.3f} ms  "
+                  f"agree {row['top1_agreement']:.3f}  max diff {row['max_prob_diff']:.4f}"
+                  + (f"  acc {row['accuracy']:.3f}" if labels is not None else ""))
+        report["models"][key] = results
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Request throughput of the database-bound endpoints per storage backend and pool size.
+
+    cd backend && python -m benchmarks.bench_db [--pool-sizes 1 4 16] [--threads 16] [--seconds 10]
+    cd backend && python -m benchmarks.bench_db --url mssql="mssql+pyodbc://..." --url pg=postgresql://...
+
+Backends: sqlite-wal (the local/edge default) and sqlite-delete (rollback
+journal, for comparison) in a temp directory, plus every --url NAME=URL. Each
+(backend, pool size) runs in a fresh process with DATABASE_URL/DB_POOL_SIZE
+set, DB_MAX_OVERFLOW=0, so the pool size is the hard connection limit. The
+database is seeded once with --rows logs.
+
+The workload is a mix of real request handlers called through Flask's test
+client from --threads threads:
+  logs   GET /api/logs?user_id=N (first page, keyset query)
+  stats  GET /api/stats?days=7 (rollup aggregates)
+  write  save_recognition_log (INSERT + rollup increment + commit)
+
+The results include the pool monitor's checkout wait percentiles and leaks.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from benchmarks._common import summarize
+
+POOL_SIZES = (1, 4, 16)
+MIX = (("logs", 0.6), ("stats", 0.2), ("write", 0.2))
+USERS = 20
+
+
+def _seed(rows):
+    """Users, aircraft types and rows logs spread over the last 30 days, once per database."""
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import insert
+
+    from db import SessionLocal
+    from models import AircraftType, RecognitionLog, Role, User
+    from services.rollups import rebuild_rollups
+
+    db = SessionLocal()
+    try:
+        if db.query(User).count():
+            return
+        db.add(Role(RoleID=1, RoleName="user"))
+        db.add_all(User(UserID=u, Username=f"bench{u}", PasswordHash="-", RoleID=1) for u in range(1, USERS + 1))
+        db.add_all(AircraftType(AircraftTypeID=i, AircraftName=name)
+                   for i, name in enumerate(("drone", "helicopter", "airplane"), start=1))
+        db.commit()
+
+        rng = random.Random(0)
+        now = datetime.now()
+        for start in range(0, rows, 10_000):
+            db.execute(insert(RecognitionLog), [{
+                "UserID": rng.randint(1, USERS),
+                "AircraftTypeID": rng.randint(1, 3),
+                "Confidence": rng.uniform(50, 100),
+                "ProcessingTimeMs": rng.randint(5, 500),
+                "SourceType": rng.choice(("file", "realtime", "batch")),
+                "CreatedAt": now - timedelta(seconds=rng.uniform(0, 30 * 86400)),
+            } for _ in range(min(10_000, rows - start))])
+            db.commit()
+        rebuild_rollups(db)
+    finally:
+        db.close()
+
+
+def _run(url, pool_size, threads, seconds, rows):
+    """Runs in a fresh process so db.py builds its engine from these settings."""
+    os.environ.update(DATABASE_URL=url, DB_POOL_SIZE=str(pool_size), DB_MAX_OVERFLOW="0", DB_ECHO="0")
+    if url.startswith("sqlite") and url.endswith("-delete.db"):
+        os.environ["SQLITE_JOURNAL_MODE"] = "DELETE"
+
+    from flask import Flask
+
+    import models  # noqa: F401  (registers every table)
+    from api.logs import logs_bp
+    from api.stats import stats_bp
+    from db import Base, engine, pool_stats
+    from services import db_session
+    from services.logging_service import save_recognition_log
+
+    Base.metadata.create_all(bind=engine)
+    _seed(rows)
+
+    app = Flask("bench_db")
+    db_session.init_app(app)
+    app.register_blueprint(logs_bp)
+    app.register_blueprint(stats_bp, url_prefix="/api")
+
+    names = [name for name, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        local = {name: [] for name in names}
+        failed = {name: 0 for name in names}
+        while time.perf_counter() < deadline:
+            op = rng.choices(names, weights)[0]
+            user_id = rng.randint(1, USERS)
+            started = time.perf_counter()
+            try:
+                if op == "logs":
+                    ok = client.get(f"/api/logs?user_id={user_id}").status_code == 200
+                elif op == "stats":
+                    ok = client.get("/api/stats?days=7").status_code == 200
+                else:
+                    save_recognition_log(user_id, rng.randint(1, 3), rng.uniform(50, 100), rng.randint(5, 500), "file")
+                    ok = True
+            except Exception:
+                ok = False
+            if ok:
+                local[op].append((time.perf_counter() - started) * 1000)
+            else:
+                failed[op] += 1
+        with lock:
+            for name in names:
+                latencies[name].extend(local[name])
+                errors[name] += failed[name]
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    db_pool = pool_stats()
+    engine.dispose()
+
+    total = sum(len(v) for v in latencies.values())
+    return {
+        "requests_per_second": round(total / elapsed, 1),
+        "errors": sum(errors.values()),
+        "pool": db_pool,
+        "ops": {name: dict(summarize(latencies[name]), errors=errors[name]) for name in names},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", action="append", default=[], metavar="NAME=URL", help="extra backend to compare")
+    parser.add_argument("--no-sqlite", action="store_true", help="only the --url backends")
+    parser.add_argument("--pool-sizes", nargs="*", type=int, default=list(POOL_SIZES))
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rows", type=int, default=200_000, help="logs to seed an empty database with")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_db_")
+    backends = {}
+    if not args.no_sqlite:
+        backends["sqlite-wal"] = f"sqlite:///{os.path.join(tmp, 'bench-wal.db')}"
+        backends["sqlite-delete"] = f"sqlite:///{os.path.join(tmp, 'bench-delete.db')}"
+    for item in args.url:
+        name, _, url = item.partition("=")
+        backends[name] = url
+
+    ctx = get_context("spawn")
+    report = {"threads": args.threads, "seconds": args.seconds, "rows": args.rows, "results": {}}
+    for name, url in backends.items():
+        report["results"][name] = {}
+        for pool_size in args.pool_sizes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+                row = executor.submit(_run, url, pool_size, args.threads, args.seconds, args.rows).result()
+            report["results"][name][str(pool_size)] = row
+            ops = row["ops"]
+            print(f"{name:14s} pool {pool_size:3d}  {row['requests_per_second']:8.1f} req/s  errors {row['errors']:4d}  "
+                  + "  ".join(f"{op} p50 {s.get('p50_ms', 0):7.2f} p95 {s.get('p95_ms', 0):8.2f} ms"
+                              for op, s in ops.items())
+                  + f"  checkout wait p95 {row['pool'].get('wait_ms', {}).get('p95', 0):7.2f} ms", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Throughput of the decode + MFCC stage versus process-pool size.
+
+    cd backend && python -m benchmarks.bench_feature_pool [--clips 48] [--max-workers N] [--json out.json]
+
+Each configuration is driven by 2 x workers request threads (so the pool is
+never idle); "inline" is the old request-thread path with the same threads,
+which the GIL limits to roughly one core.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._common import make_corpus
+from services.feature_pool import FeaturePool, clip_features as inline_clip_features
+
+SR = 22050
+DURATION = 5.0
+
+
+def run(fn, corpus, threads):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda item: fn(item[1]), corpus))
+    return round(len(corpus) / (time.perf_counter() - started), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", type=int, default=48)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    corpus = make_corpus(formats=("wav",), sample_rates=(44100,), count=args.clips)
+    worker_counts = sorted({1, 2, 4, 8, args.max_workers} & set(range(1, args.max_workers + 1)))
+
+    results = {"cpu_count": os.cpu_count(), "clips": len(corpus), "clips_per_second": {}}
+    inline = lambda data: inline_clip_features(data, sr=SR, duration=DURATION)
+    inline(corpus[0][1])
+    results["clips_per_second"]["inline"] = run(inline, corpus, threads=2 * args.max_workers)
+
+    for workers in worker_counts:
+        pool = FeaturePool(workers)
+        pool.warmup()
+        fn = lambda data: pool.clip_features(data, sr=SR, duration=DURATION)
+        fn(corpus[0][1])
+        results["clips_per_second"][f"pool_{workers}"] = run(fn, corpus, threads=2 * workers)
+        pool.shutdown()
+
+    base = results["clips_per_second"]["inline"]
+    print(f"cpu_count={results['cpu_count']} clips={len(corpus)}")
+    for name, value in results["clips_per_second"].items():
+        print(f"{name:<10} {value:>8.1f} clips/s  x{value / base:.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+MFCC feature engine: parity with librosa.feature.mfcc and throughput.
+
+    cd backend && python -m benchmarks.bench_features [--clips 64] [--tolerance 1e-2] [--json out.json]
+
+Parity: max |engine - librosa| of the mean MFCC vector over clips of
+different lengths; the script exits with code 1 above --tolerance.
+Throughput: clips/second for librosa per call, the engine per clip and the
+engine on whole batches.
+"""
+import argparse
+import json
+import sys
+import time
+
+import librosa
+import numpy as np
+
+from benchmarks._common import synth_audio
+from utils.features import get_engine
+
+SR = 22050
+N_MFCC = 40
+
+
+def librosa_mfcc_mean(y):
+    return np.mean(librosa.feature.mfcc(y=y, sr=SR, n_mfcc=N_MFCC), axis=1)
+
+
+def clips_per_second(fn, clips, repeat):
+    fn(clips[:2])  # warm caches
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(clips)
+    return round(len(clips) * repeat / (time.perf_counter() - started), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-2)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    engine = get_engine(sr=SR, n_mfcc=N_MFCC)
+
+    # ---- parity (includes very short and odd-length clips) ----
+    parity_clips = [synth_audio(s, SR, seed=i) for i, s in enumerate([5.0, 5.0, 3.3, 1.0, 0.05, 2.71])]
+    reference = np.stack([librosa_mfcc_mean(y) for y in parity_clips])
+    batch = engine.mfcc_mean_batch(parity_clips)
+    single = np.stack([engine.mfcc_mean(y) for y in parity_clips])
+    max_err = float(max(np.abs(reference - batch).max(), np.abs(reference - single).max()))
+
+    # ---- throughput on 5 s clips ----
+    clips = [synth_audio(5.0, SR, seed=i) for i in range(args.clips)]
+    results = {
+        "parity_max_abs_error": max_err,
+        "parity_tolerance": args.tolerance,
+        "clips_per_second": {
+            "librosa": clips_per_second(lambda cs: [librosa_mfcc_mean(y) for y in cs], clips, args.repeat),
+            "engine_per_clip": clips_per_second(lambda cs: [engine.mfcc_mean(y) for y in cs], clips, args.repeat),
+            "engine_batch": clips_per_second(engine.mfcc_mean_batch, clips, args.repeat),
+        },
+    }
+
+    print(f"parity: max abs error {max_err:.3g} (tolerance {args.tolerance:g})")
+    for name, value in results["clips_per_second"].items():
+        print(f"{name:<16} {value:>10.1f} clips/s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if max_err > args.tolerance:
+        print("PARITY FAILED", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Порівняння старого шляху інжесту (temp-файл -> pydub -> WAV temp-файл ->
+librosa.load) з декодуванням у пам'яті (utils.audio_io.decode_audio).
+
+    cd backend && python -m benchmarks.bench_ingestion [--repeat 5] [--json out.json]
+
+Для кожного формату виводить затримку та кількість дискових операцій
+(write/read syscalls і байти з psutil io_counters) на один запит.
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import librosa
+import psutil
+
+from benchmarks._common import make_corpus, summarize, timed
+from utils.audio_io import decode_audio
+
+SR = 22050
+DURATION = 5.0
+
+
+def legacy_ingest(data, fmt):
+    """Те, що робив /analyze до переходу на in-memory декодування."""
+    from pydub import AudioSegment
+
+    tmp_in = tempfile.NamedTemporaryFile(delete=False, suffix="." + fmt)
+    tmp_in.write(data)
+    tmp_in.close()
+    paths = [tmp_in.name]
+    try:
+        target = tmp_in.name
+        if fmt != "wav":
+            wav_tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
+            wav_tmp.close()
+            paths.append(wav_tmp.name)
+            AudioSegment.from_file(tmp_in.name).export(wav_tmp.name, format="wav")
+            target = wav_tmp.name
+        y, _ = librosa.load(target, sr=SR, duration=DURATION, mono=True)
+        return y
+    finally:
+        for p in paths:
+            if os.path.exists(p):
+                os.remove(p)
+
+
+def in_memory_ingest(data, fmt):
+    return decode_audio(data, sr=SR, duration=DURATION)
+
+
+def measure(fn, corpus, repeat):
+    proc = psutil.Process()
+    latencies = []
+    io_before = proc.io_counters()
+    for _ in range(repeat):
+        for _, data, fmt in corpus:
+            _, ms = timed(fn, data, fmt)
+            latencies.append(ms)
+    io_after = proc.io_counters()
+    n = len(latencies)
+    result = summarize(latencies)
+    result.update({
+        "write_ops_per_req": round((io_after.write_count - io_before.write_count) / n, 2),
+        "read_ops_per_req": round((io_after.read_count - io_before.read_count) / n, 2),
+        "write_kb_per_req": round((io_after.write_chars - io_before.write_chars) / n / 1024, 1),
+    })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for fmt in ("wav", "flac", "mp3", "webm"):
+        corpus = make_corpus(formats=(fmt,), count=2)
+        # one untimed pass so imports / codec init do not skew the numbers
+        legacy_ingest(corpus[0][1], fmt)
+        in_memory_ingest(corpus[0][1], fmt)
+        results[fmt] = {
+            "legacy": measure(legacy_ingest, corpus, args.repeat),
+            "in_memory": measure(in_memory_ingest, corpus, args.repeat),
+        }
+
+    print(f"{'format':<6} {'path':<10} {'mean ms':>9} {'p95 ms':>9} {'writes':>7} {'reads':>7} {'KB written':>11}")
+    for fmt, paths in results.items():
+        for path, r in paths.items():
+            print(f"{fmt:<6} {path:<10} {r['mean_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+                  f"{r['write_ops_per_req']:>7} {r['read_ops_per_req']:>7} {r['write_kb_per_req']:>11}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Per-stage latency of the /analyze pipeline and end-to-end throughput, with
+regression checks against a saved baseline.
+
+    cd backend && python -m benchmarks.bench_pipeline [--json results.json]
+    cd backend && python -m benchmarks.bench_pipeline --baseline results.json [--threshold 0.25] [--stage-threshold mfcc=0.1]
+
+Stages, timed separately for every corpus entry (format x duration x sample rate):
+  decode   bytes -> mono PCM at the file's own rate (libsndfile or ffmpeg)
+  convert  resampling to the model rate (what convert_to_wav used to do)
+  mfcc     feature extraction, (1, 40, 1)
+  predict  one forward pass per model key (stand-in Keras model with the
+           input shape of the real model if its weights are present)
+End to end: decode + features + batched predict through a BatchScheduler at
+several concurrency levels, clips/s and latency percentiles.
+
+With --baseline the script exits 1 when a stage p50 got slower, or a
+throughput got lower, by more than the threshold (fraction; per stage with
+--stage-threshold). Formats ffmpeg can not encode here are skipped.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import soundfile as sf
+import soxr
+
+from benchmarks._common import encode, stand_in_model, summarize, synth_audio, timed
+from services.batching import BatchScheduler
+from services.model_service import CLASS_LABELS, MODEL_DIR, MODEL_FILES
+from utils.audio_io import decode_audio
+from utils.audio_processing import extract_features_batch
+
+SR = 22050
+N_MFCC = 40
+FORMATS = ("wav", "mp3", "webm")
+DURATIONS = (2.0, 5.0, 30.0)
+SAMPLE_RATES = (16000, 44100)
+CONCURRENCY = (1, 4, 16)
+
+
+def build_corpus(formats, durations, sample_rates):
+    corpus, skipped = [], []
+    for fmt in formats:
+        try:
+            encode(synth_audio(0.5, SR), SR, fmt)  # is there an encoder for it here?
+        except Exception as e:
+            skipped.append(f"{fmt}: {e}")
+            continue
+        for seconds in durations:
+            for sr in sample_rates:
+                data = encode(synth_audio(seconds, sr), sr, fmt)
+                corpus.append({"name": f"{fmt}_{seconds:g}s_{sr}", "fmt": fmt, "sr": sr, "data": data})
+    return corpus, skipped
+
+
+def model_input_shape(model_key):
+    """Input shape of the real model when its weights are here, else the MFCC shape /analyze feeds."""
+    path = os.path.join(MODEL_DIR, MODEL_FILES[model_key]["file"])
+    if os.path.exists(path):
+        import tensorflow as tf
+        return tuple(tf.keras.models.load_model(path).input_shape[1:])
+    return (N_MFCC, 1)
+
+
+def bench_stages(corpus, models, repeats):
+    results = {"decode": {}, "convert": {}, "mfcc": {}, "predict": {}}
+    for item in corpus:
+        decode, convert, mfcc = [], [], []
+        y = soxr.resample(decode_audio(item["data"], sr=item["sr"]), item["sr"], SR)  # warm-up, untimed
+        extract_features_batch([y], sr=SR, n_mfcc=N_MFCC)
+        for _ in range(repeats):
+            y, ms = timed(decode_audio, item["data"], sr=item["sr"])
+            decode.append(ms)
+            y, ms = timed(soxr.resample, y, item["sr"], SR, quality="HQ")
+            convert.append(ms)
+            _, ms = timed(extract_features_batch, [y[:int(5.0 * SR)]], sr=SR, n_mfcc=N_MFCC)
+            mfcc.append(ms)
+        results["decode"][item["name"]] = summarize(decode)
+        results["convert"][item["name"]] = summarize(convert)
+        results["mfcc"][item["name"]] = summarize(mfcc)
+
+    for key, model in models.items():
+        x = np.random.default_rng(0).standard_normal((1,) + model.input_shape[1:]).astype(np.float32)
+        model.predict_on_batch(x)
+        results["predict"][key] = summarize([timed(model.predict_on_batch, x)[1] for _ in range(repeats * 5)])
+    return results
+
+
+def bench_e2e(corpus, models, concurrency_levels, requests):
+    items = [item for item in corpus if item["fmt"] == "wav"] or corpus
+    results = {}
+    for key, model in models.items():
+        cfg = MODEL_FILES[key]
+        scheduler = BatchScheduler(key, model.predict_on_batch, max_batch_size=cfg.get("max_batch_size", 16),
+                                   max_wait_ms=cfg.get("max_wait_ms", 10), max_queue_size=10_000)
+        shape = model.input_shape[1:]
+
+        def handle(i):
+            started = time.perf_counter()
+            item = items[i % len(items)]
+            y = decode_audio(item["data"], sr=SR, duration=5.0)
+            features = extract_features_batch([y], sr=SR, n_mfcc=N_MFCC)
+            if features.shape[1:] != shape:
+                features = np.resize(features, (1,) + shape)  # stand-in with a different input shape
+            preds = scheduler.predict(features)
+            assert preds.shape == (1, len(CLASS_LABELS))
+            return (time.perf_counter() - started) * 1000
+
+        results[key] = {}
+        for threads in concurrency_levels:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                latencies = list(executor.map(handle, range(requests)))
+            elapsed = time.perf_counter() - started
+            results[key][str(threads)] = dict(summarize(latencies), clips_per_second=round(requests / elapsed, 2))
+        scheduler.stop()
+    return results
+
+
+def check_regressions(results, baseline, threshold, stage_thresholds):
+    """List of human-readable regressions of results against baseline."""
+    regressions = []
+    for stage, entries in results["stages"].items():
+        limit = stage_thresholds.get(stage, threshold)
+        for name, current in entries.items():
+            before = baseline.get("stages", {}).get(stage, {}).get(name)
+            if not before or not before.get("p50_ms"):
+                continue
+            change = current["p50_ms"] / before["p50_ms"] - 1
+            if change > limit:
+                regressions.append(f"{stage}/{name}: p50 {before['p50_ms']} -> {current['p50_ms']} ms (+{change:.0%})")
+
+    limit = stage_thresholds.get("e2e", threshold)
+    for key, levels in results["e2e"].items():
+        for threads, current in levels.items():
+            before = baseline.get("e2e", {}).get(key, {}).get(threads)
+            if not before or not before.get("clips_per_second"):
+                continue
+            change = 1 - current["clips_per_second"] / before["clips_per_second"]
+            if change > limit:
+                regressions.append(f"e2e/{key}@{threads}: {before['clips_per_second']} -> "
+                                   f"{current['clips_per_second']} clips/s (-{change:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--formats", nargs="*", default=list(FORMATS))
+    parser.add_argument("--durations", nargs="*", type=float, default=list(DURATIONS))
+    parser.add_argument("--sample-rates", nargs="*", type=int, default=list(SAMPLE_RATES))
+    parser.add_argument("--models", nargs="*", default=list(MODEL_FILES))
+    parser.add_argument("--concurrency", nargs="*", type=int, default=list(CONCURRENCY))
+    parser.add_argument("--repeats", type=int, default=10, help="timed runs per stage and corpus entry")
+    parser.add_argument("--requests", type=int, default=64, help="end-to-end requests per concurrency level")
+    parser.add_argument("--json", help="write results to this file (usable as a later --baseline)")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, fraction")
+    parser.add_argument("--stage-threshold", action="append", default=[], metavar="STAGE=FRACTION",
+                        help="per-stage override (decode, convert, mfcc, predict, e2e)")
+    args = parser.parse_args()
+
+    stage_thresholds = {}
+    for item in args.stage_threshold:
+        stage, _, value = item.partition("=")
+        stage_thresholds[stage] = float(value)
+
+    corpus, skipped = build_corpus(args.formats, args.durations, args.sample_rates)
+    for reason in skipped:
+        print(f"skipped {reason}")
+    models = {key: stand_in_model(model_input_shape(key), len(CLASS_LABELS)) for key in args.models}
+
+    results = {
+        "env": {"python": platform.python_version(), "machine": platform.machine(),
+                "cpu_count": os.cpu_count(), "soundfile": sf.__version__},
+        "stages": bench_stages(corpus, models, args.repeats),
+        "e2e": bench_e2e(corpus, models, args.concurrency, args.requests),
+        "skipped": skipped,
+    }
+
+    for stage, entries in results["stages"].items():
+        for name, s in entries.items():
+            print(f"{stage:8s} {name:22s} p50 {s['p50_ms']:9.3f} ms  p95 {s['p95_ms']:9.3f} ms")
+    for key, levels in results["e2e"].items():
+        for threads, s in levels.items():
+            print(f"e2e      model {key} x{threads:<3s}       {s['clips_per_second']:8.1f} clips/s  "
+                  f"p50 {s['p50_ms']:8.2f} ms  p95 {s['p95_ms']:8.2f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = check_regressions(results, baseline, args.threshold, stage_thresholds)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
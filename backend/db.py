@@ -1,28 +1,208 @@
+import logging
 import os
+import threading
+import time
+import traceback
+from collections import deque
 from urllib.parse import quote_plus
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, StaticPool
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # -------------------------
 # Конфігурація сервера
 # -------------------------
-DB_SERVER = r"DESKTOP-7N0DQQ2"   # твій сервер
-DB_NAME = "AcousticRecognitionDB"
+# DB_BACKEND: mssql (за замовчуванням) або sqlite; DATABASE_URL — будь-який
+# SQLAlchemy URL, має пріоритет над усім іншим
+DB_BACKEND = os.environ.get("DB_BACKEND", "mssql")
+DATABASE_URL = os.environ.get("DATABASE_URL") or None
+
+DB_SERVER = os.environ.get("DB_SERVER", r"DESKTOP-7N0DQQ2")   # твій сервер
+DB_NAME = os.environ.get("DB_NAME", "AcousticRecognitionDB")
+DB_DRIVER = os.environ.get("DB_DRIVER", "ODBC Driver 17 for SQL Server")
+# без DB_USER — Windows Authentication (Trusted_Connection)
+DB_USER = os.environ.get("DB_USER") or None
+DB_PASSWORD = os.environ.get("DB_PASSWORD", "")
+
+# Локальна / edge-база: один файл, WAL — читачі не блокують записувача
+SQLITE_PATH = os.environ.get("SQLITE_PATH", os.path.join(BASE_DIR, "acoustic_recognition.db"))
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")  # у WAL це безпечно й значно швидше за FULL
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_MB = int(os.environ.get("SQLITE_CACHE_MB", "64"))
+SQLITE_MMAP_MB = int(os.environ.get("SQLITE_MMAP_MB", "256"))
+
+# Пул з'єднань: розмір, скільки понад нього, скільки чекати вільного з'єднання,
+# через скільки секунд перевідкривати і чи перевіряти з'єднання перед видачею
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "1") == "1"
+# лог кожного SQL-запиту — лише на запит (DB_ECHO=1)
+DB_ECHO = os.environ.get("DB_ECHO", "0") == "1"
+# Останні очікування з'єднання для перцентилів; DB_LEAK_TRACE=1 запам'ятовує
+# стек кожного checkout, щоб у попередженні про витік було видно, хто його взяв
+DB_WAIT_WINDOW = int(os.environ.get("DB_WAIT_WINDOW", "2048"))
+DB_LEAK_TRACE = os.environ.get("DB_LEAK_TRACE", "0") == "1"
+
+
+def database_url(backend=DB_BACKEND):
+    if DATABASE_URL:
+        return DATABASE_URL
+    if backend == "sqlite":
+        return f"sqlite:///{SQLITE_PATH}"
+    if backend == "mssql":
+        # Windows Authentication + TrustServerCertificate
+        odbc_str = (
+            f"DRIVER={{{DB_DRIVER}}};"
+            f"SERVER={DB_SERVER};"
+            f"DATABASE={DB_NAME};"
+            + (f"UID={DB_USER};PWD={DB_PASSWORD};" if DB_USER else "Trusted_Connection=yes;")
+            + "TrustServerCertificate=yes;"
+        )
+        # Конвертуємо рядок ODBC у формат для SQLAlchemy
+        return "mssql+pyodbc:///?odbc_connect={}".format(quote_plus(odbc_str))
+    raise ValueError(f"Unknown DB_BACKEND: {backend} (mssql, sqlite or set DATABASE_URL)")
+
+
+def _sqlite_pragmas(dbapi_conn, _record):
+    cursor = dbapi_conn.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size={-SQLITE_CACHE_MB * 1024}")  # від'ємне — у KiB
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_MB * 1024 * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cursor.close()
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class PoolMonitor:
+    """
+    Checkout wait times, connections in use and the thread holding each one.
+    A connection still held by a thread when its request ends is a leak
+    (a session that was never closed).
+    """
+
+    def __init__(self, window=DB_WAIT_WINDOW, trace=DB_LEAK_TRACE):
+        self.trace = trace
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)  # ms
+        self._held = {}  # id(connection record) -> {"thread", "since", "stack", "reported"}
+        self._counters = {"checkouts": 0, "timeouts": 0, "leaks": 0}
+        self._peak_in_use = 0
+
+    def waited(self, ms, timed_out=False):
+        with self._lock:
+            self._waits.append(ms)
+            self._counters["timeouts" if timed_out else "checkouts"] += 1
+
+    def checked_out(self, record):
+        holder = {"thread": threading.get_ident(), "since": time.time(), "reported": False,
+                  "stack": "".join(traceback.format_stack(limit=12)[:-2]) if self.trace else None}
+        with self._lock:
+            self._held[id(record)] = holder
+            self._peak_in_use = max(self._peak_in_use, len(self._held))
 
-# Windows Authentication + TrustServerCertificate
-odbc_str = (
-    r"DRIVER={ODBC Driver 17 for SQL Server};"
-    f"SERVER={DB_SERVER};"
-    f"DATABASE={DB_NAME};"
-    "Trusted_Connection=yes;"
-    "TrustServerCertificate=yes;"
-)
+    def checked_in(self, record):
+        with self._lock:
+            self._held.pop(id(record), None)
+
+    def leaked(self, thread_id=None):
+        """Connections the thread still holds that were not reported yet; marks them reported."""
+        thread_id = thread_id or threading.get_ident()
+        with self._lock:
+            found = [h for h in self._held.values() if h["thread"] == thread_id and not h["reported"]]
+            for holder in found:
+                holder["reported"] = True
+            self._counters["leaks"] += len(found)
+        return found
+
+    def stats(self, pool=None):
+        with self._lock:
+            waits = sorted(self._waits)
+            data = dict(self._counters, in_use=len(self._held), peak_in_use=self._peak_in_use)
+        if waits:
+            data["wait_ms"] = {
+                "window": len(waits),
+                "mean": round(sum(waits) / len(waits), 3),
+                "p50": round(_percentile(waits, 0.50), 3),
+                "p95": round(_percentile(waits, 0.95), 3),
+                "p99": round(_percentile(waits, 0.99), 3),
+                "max": round(waits[-1], 3),
+            }
+        if isinstance(pool, QueuePool):
+            data.update(pool_size=pool.size(), idle=pool.checkedin(), overflow=max(0, pool.overflow()))
+        return data
+
+
+pool_monitor = PoolMonitor()
+
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool that reports how long every checkout waited for a free connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_monitor.waited((time.perf_counter() - started) * 1000, timed_out=True)
+            logging.warning(f"DB pool exhausted: no connection within {self._timeout}s ({pool_monitor.stats(self)})")
+            raise
+        pool_monitor.waited((time.perf_counter() - started) * 1000)
+        return connection
+
+
+def _on_checkout(_dbapi_conn, record, _proxy):
+    pool_monitor.checked_out(record)
+
+
+def _on_checkin(_dbapi_conn, record):
+    pool_monitor.checked_in(record)
+
+
+def build_engine(url=None, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+                 pool_recycle=DB_POOL_RECYCLE, pool_pre_ping=DB_POOL_PRE_PING, echo=DB_ECHO):
+    """Engine for url (default: from the environment) with explicit pool settings."""
+    url = url or database_url()
+    kwargs = {"echo": echo, "pool_pre_ping": pool_pre_ping}
+
+    if url.startswith("sqlite"):
+        in_memory = url in ("sqlite://", "sqlite:///:memory:")
+        kwargs["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        if in_memory:
+            kwargs["poolclass"] = StaticPool  # one shared connection, or every session sees an empty database
+        else:
+            kwargs.update(poolclass=MonitoredQueuePool, pool_size=pool_size, max_overflow=max_overflow,
+                          pool_timeout=pool_timeout, pool_recycle=pool_recycle)
+        engine = create_engine(url, **kwargs)
+        if not in_memory:
+            event.listen(engine, "connect", _sqlite_pragmas)
+    else:
+        kwargs.update(poolclass=MonitoredQueuePool, pool_size=pool_size, max_overflow=max_overflow,
+                      pool_timeout=pool_timeout, pool_recycle=pool_recycle)
+        if url.startswith("mssql+pyodbc"):
+            kwargs["fast_executemany"] = True  # executemany-вставки логів одним пакетом
+        engine = create_engine(url, **kwargs)
+
+    event.listen(engine, "checkout", _on_checkout)
+    event.listen(engine, "checkin", _on_checkin)
+    return engine
 
-# Конвертуємо рядок ODBC у формат для SQLAlchemy
-odbc_conn_url = "mssql+pyodbc:///?odbc_connect={}".format(quote_plus(odbc_str))
 
 # Створюємо SQLAlchemy engine
-engine = create_engine(odbc_conn_url, echo=True, fast_executemany=True)
+engine = build_engine()
 
 # Створюємо сесію
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -42,6 +222,10 @@ def test_connection():
 def get_db_session():
     return SessionLocal()
 
+def pool_stats():
+    """Стан пулу для /api/system/stats: очікування checkout, зайняті з'єднання, витоки."""
+    return pool_monitor.stats(engine.pool)
+
 # Запуск тесту при запуску файлу напряму
 if __name__ == "__main__":
     test_connection()
@@ -4,4 +4,5 @@ from .recognition_logs import RecognitionLog
 from .audio_files import AudioFile
 from .models import Model
 from .aircraft_types import AircraftType
-from .realtime_sessions import RealtimeSession
\ No newline at end of file
+from .realtime_sessions import RealtimeSession
+from .recognition_rollups import RecognitionLogHourly
\ No newline at end of file
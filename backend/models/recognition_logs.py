@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from db import Base
@@ -12,9 +12,19 @@ class RecognitionLog(Base):
     AircraftTypeID = Column(Integer, ForeignKey("AircraftTypes.AircraftTypeID"), nullable=False)
 
     Confidence = Column(Float, nullable=False)
-    SourceType = Column(String(10), nullable=False)  # 'file' or 'realtime'
+    SourceType = Column(String(10), nullable=False)  # 'file', 'realtime' or 'batch'
     ProcessingTimeMs = Column(Integer, nullable=False)
     CreatedAt = Column(DateTime, default=datetime.now)
 
     # --- relationships
-    user = relationship("User", back_populates="logs")
\ No newline at end of file
+    user = relationship("User", back_populates="logs")
+
+    # історія користувача: seek по (UserID, CreatedAt, LogID) у порядку сторінок;
+    # решта колонок сторінки — INCLUDE, щоб запит не ходив у кластерний індекс
+    __table_args__ = (
+        Index(
+            "IX_Recognition_Logs_User_Created",
+            UserID, CreatedAt.desc(), LogID.desc(),
+            mssql_include=["AircraftTypeID", "Confidence", "ProcessingTimeMs", "SourceType"],
+        ),
+    )
\ No newline at end of file
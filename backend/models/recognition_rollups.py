@@ -0,0 +1,15 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, Integer, String
+from db import Base
+
+class RecognitionLogHourly(Base):
+    """Recognition_Logs, згруповані за годиною × користувачем × типом апарата × джерелом."""
+    __tablename__ = "Recognition_Logs_Hourly"
+
+    HourStart = Column(DateTime, primary_key=True)
+    UserID = Column(Integer, primary_key=True)
+    AircraftTypeID = Column(Integer, primary_key=True)
+    SourceType = Column(String(10), primary_key=True)
+
+    Detections = Column(Integer, nullable=False, default=0)
+    ConfidenceSum = Column(Float, nullable=False, default=0)
+    ProcessingTimeMsSum = Column(BigInteger, nullable=False, default=0)
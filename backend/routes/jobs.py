@@ -0,0 +1,119 @@
+import os
+import shutil
+import zipfile
+
+from flask import Blueprint, jsonify, request
+
+from services.bulk_jobs import (
+    BulkJobError, bulk_jobs, items_from_audio_files, items_from_directory, items_from_zip, new_job_id,
+)
+from services.model_service import MODEL_FILES
+from services.users_service import authenticated_user_id
+
+jobs_bp = Blueprint("jobs", __name__)
+
+# Server directories the API may scan for directory jobs (the CLI may use any);
+# unset = directory jobs only from the CLI
+BULK_INPUT_ROOT = os.environ.get("BULK_INPUT_ROOT") or None
+
+
+def _inside_input_root(directory):
+    if not BULK_INPUT_ROOT:
+        return False
+    root = os.path.realpath(BULK_INPUT_ROOT)
+    return os.path.commonpath([root, os.path.realpath(directory)]) == root
+
+
+def _owned_job(job_id):
+    """(job, None) або (None, відповідь з помилкою): задачею керує лише її власник."""
+    user_id = authenticated_user_id()
+    if not user_id:
+        return None, (jsonify({"error": "Unauthorized"}), 401)
+    job = bulk_jobs.get(job_id)
+    if not job:
+        return None, (jsonify({"error": "Job not found"}), 404)
+    if job.manifest["user_id"] != user_id:
+        return None, (jsonify({"error": "Forbidden"}), 403)
+    return job, None
+
+
+# -------------------------
+# CREATE — multipart "file" (ZIP) або JSON {"directory": ...} / {"file_ids": [...]}
+# -------------------------
+@jobs_bp.post("")
+def create_job():
+    upload = request.files.get("file")
+    data = request.form if upload else (request.get_json(silent=True) or {})
+    model_key = str(data.get("model", ""))
+    # власник задачі (і чиї Audio_Files можна брати) — з токена, не з тіла запиту
+    user_id = authenticated_user_id()
+
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    if model_key not in MODEL_FILES:
+        return jsonify({"error": f"Unknown model: {model_key}"}), 400
+
+    try:
+        if upload:
+            job_id = new_job_id()
+            job_dir = bulk_jobs.job_dir(job_id)
+            os.makedirs(job_dir, exist_ok=True)
+            zip_path = os.path.join(job_dir, "input.zip")
+            try:
+                upload.save(zip_path)
+                items = items_from_zip(zip_path)
+            except Exception:
+                shutil.rmtree(job_dir, ignore_errors=True)  # задачі немає — архів нікому не потрібен
+                raise
+            job = bulk_jobs.create(items, model_key, user_id, source="zip", job_id=job_id)
+        elif data.get("directory"):
+            if not _inside_input_root(data["directory"]):
+                return jsonify({"error": "Каталог поза BULK_INPUT_ROOT"}), 403
+            job = bulk_jobs.create(items_from_directory(data["directory"]), model_key, user_id, source="directory")
+        elif data.get("file_ids"):
+            job = bulk_jobs.create(items_from_audio_files(data["file_ids"], user_id), model_key, user_id, source="audio_files")
+        else:
+            return jsonify({"error": "Потрібен file (ZIP), directory або file_ids"}), 400
+    except (BulkJobError, ValueError, zipfile.BadZipFile) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(job.progress()), 202
+
+
+@jobs_bp.get("")
+def list_jobs():
+    user_id = authenticated_user_id()
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    return jsonify(bulk_jobs.list(user_id))
+
+
+@jobs_bp.get("/<job_id>")
+def get_job(job_id):
+    job, error = _owned_job(job_id)
+    if error:
+        return error
+    result = job.progress()
+    result["failures"] = job.failures()
+    return jsonify(result)
+
+
+@jobs_bp.post("/<job_id>/resume")
+def resume_job(job_id):
+    job, error = _owned_job(job_id)
+    if error:
+        return error
+    if not bulk_jobs.resume(job_id):
+        return jsonify({"error": "Job is already running"}), 409
+    return jsonify(job.progress()), 202
+
+
+@jobs_bp.post("/<job_id>/cancel")
+def cancel_job(job_id):
+    job, error = _owned_job(job_id)
+    if error:
+        return error
+    job.cancel()
+    return jsonify({"success": True})
@@ -1,20 +1,20 @@
 from flask import Blueprint, jsonify, request
-from db import get_db_session
 from models.settings import SystemSettings
+from services.db_session import get_db
+from services.reference_cache import reference_cache
 
 settings_bp = Blueprint("settings", __name__)
 
-# GET — отримати значення
+# GET — отримати значення (з кешу довідників, фронтенд опитує його постійно)
 @settings_bp.get("/realtime")
 def get_realtime():
-    session = get_db_session()
-    row = session.query(SystemSettings).filter_by(SettingKey="allow_realtime").first()
+    value = reference_cache.setting("allow_realtime")
 
-    if not row:
+    if value is None:
         return jsonify({"allow_realtime": False}), 200
 
-    # row.SettingValue — це рядок "1" або "0"
-    return jsonify({"allow_realtime": row.SettingValue == "1"}), 200
+    # SettingValue — це рядок "1" або "0"
+    return jsonify({"allow_realtime": value == "1"}), 200
 
 
 # POST — оновити значення
@@ -23,7 +23,7 @@ def update_realtime():
     data = request.get_json()
     enabled = data.get("enabled", False)
 
-    session = get_db_session()
+    session = get_db()
     row = session.query(SystemSettings).filter_by(SettingKey="allow_realtime").first()
 
     if not row:
@@ -32,5 +32,6 @@ def update_realtime():
 
     row.SettingValue = "1" if enabled else "0"
     session.commit()
+    reference_cache.invalidate("settings")
 
-    return jsonify({"status": "ok"}), 200
\ No newline at end of file
+    return jsonify({"status": "ok"}), 200
@@ -0,0 +1,198 @@
+import functools
+import json
+import logging
+import time
+from datetime import datetime
+
+import numpy as np
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from models.realtime_sessions import RealtimeSession
+from services.auth_tokens import current_user_id
+from services.batching import QueueFullError
+from services.db_session import get_db
+from services.logging_service import queue_recognition_log
+from services.model_service import CLASS_LABELS, MODEL_FILES, get_scheduler, predict
+from services.reference_cache import reference_cache
+from services.stream_sessions import STREAM_HOP_MS, STREAM_SAMPLE_RATE, StreamSession, stream_sessions
+from services.users_service import authenticated_user_id
+
+# Транспорт. Браузер шле шматки PCM окремими POST (fetch тримає keep-alive
+# з'єднання, тож це без нового TCP/TLS на шматок): потокове тіло запиту
+# fetch підтримує лише Chromium і лише half-duplex — відповідь читається
+# після кінця тіла, тобто прогнози прийшли б наприкінці сесії. WebSocket
+# потребував би окремого сервера (flask-sock/gevent), якого в проєкті немає.
+# Для не-браузерних клієнтів (edge-пристрої, CLI) є справді постійне
+# з'єднання: chunked POST .../audio/stream, відповідь — NDJSON на ходу.
+STREAM_READ_BYTES = 4 * 1024  # ~46 ms float32 PCM при 22050 Гц
+
+stream_bp = Blueprint("stream", __name__)
+
+
+def _close_session_row(session_id, status):
+    db = get_db()
+    row = db.query(RealtimeSession).filter(RealtimeSession.SessionID == session_id).first()
+    if row and row.Status == "running":
+        row.EndTime = datetime.now()
+        if row.StartTime:
+            row.DurationSeconds = int((row.EndTime - row.StartTime).total_seconds())
+        row.Status = status
+        db.commit()
+
+
+def _expire_idle():
+    """Сесії без аудіо довше за таймаут — з пам'яті, рядок RealtimeSession — у timeout."""
+    for expired in stream_sessions.expire_idle():
+        _close_session_row(expired.session_id, "timeout")
+
+
+def _owned_session(session_id):
+    """(session, None) або (None, відповідь з помилкою): сесією керує лише її власник."""
+    _expire_idle()
+    session = stream_sessions.get(session_id)
+    if not session:
+        return None, (jsonify({"error": "Session not found"}), 404)
+    if session.user_id != current_user_id():
+        return None, (jsonify({"error": "Forbidden"}), 403)
+    return session, None
+
+
+# -------------------------
+# START — створює RealtimeSession і стан потоку
+# -------------------------
+@stream_bp.post("/sessions")
+def start_session():
+    _expire_idle()
+
+    data = request.get_json(silent=True) or {}
+    # власник сесії — з токена; саме з ним звіряються audio/stop
+    user_id = authenticated_user_id()
+    model_key = str(data.get("model", ""))
+    try:
+        sample_rate = int(data.get("sample_rate", STREAM_SAMPLE_RATE))
+        hop_ms = int(data.get("hop_ms", STREAM_HOP_MS))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid sample_rate/hop_ms"}), 400
+
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    if model_key not in MODEL_FILES:
+        return jsonify({"error": f"Unknown model: {model_key}"}), 400
+    if not 8000 <= sample_rate <= 192000 or not 100 <= hop_ms <= 5000:
+        return jsonify({"error": "Invalid sample_rate/hop_ms"}), 400
+
+    try:
+        get_scheduler(model_key)  # load now so a bad model fails the start, not the first chunk
+    except Exception as e:
+        return jsonify({"error": f"Помилка завантаження моделі: {str(e)}"}), 500
+
+    db = get_db()
+    row = RealtimeSession(UserID=int(user_id), ModelID=int(model_key), Status="running")
+    db.add(row)
+    db.commit()
+    session_id = row.SessionID
+
+    # resolved per prediction: the model may be evicted and reloaded during a long session
+    session = StreamSession(session_id, model_key, functools.partial(predict, model_key), CLASS_LABELS,
+                            input_rate=sample_rate, hop_ms=hop_ms, user_id=int(user_id))
+    try:
+        stream_sessions.add(session)
+    except RuntimeError as e:
+        _close_session_row(session_id, "rejected")
+        return jsonify({"error": str(e)}), 503
+
+    return jsonify({"sessionId": session_id, "sampleRate": sample_rate, "hopMs": hop_ms}), 201
+
+
+def _log_predictions(session, predictions, processing_ms):
+    """
+    Розпізнавання потоку — у Recognition_Logs через чергу відкладеного запису.
+    Сюди йдуть не всі hop-и, а відібрані StreamSession.loggable(): зміна мітки
+    або та сама мітка раз на STREAM_LOG_INTERVAL_SECONDS.
+    """
+    for p in predictions:
+        try:
+            aircraft_id = reference_cache.aircraft_type_id(p["result"])
+            if aircraft_id is not None:
+                queue_recognition_log(session.user_id, aircraft_id, p["confidence"], processing_ms, "realtime")
+        except Exception:
+            logging.exception("Queueing realtime log failed:")
+
+
+# -------------------------
+# AUDIO — тіло запиту: сирий PCM float32 little-endian, моно
+# -------------------------
+def _push(session, samples):
+    started = time.perf_counter()
+    with session.lock:
+        predictions = session.push(samples)
+        to_log = session.loggable(predictions)
+    _log_predictions(session, to_log, (time.perf_counter() - started) * 1000)
+    return predictions
+
+
+@stream_bp.post("/sessions/<int:session_id>/audio")
+def push_audio(session_id):
+    session, error = _owned_session(session_id)
+    if error:
+        return error
+
+    body = request.get_data(cache=False)
+    if len(body) % 4:
+        return jsonify({"error": "Body must be float32 PCM"}), 400
+    samples = np.frombuffer(body, dtype="<f4")
+
+    try:
+        predictions = _push(session, samples)
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503
+
+    return jsonify({"predictions": predictions, "receivedSeconds": round(session.samples_received / session.sr, 3)})
+
+
+# -------------------------
+# AUDIO STREAM — одне chunked-з'єднання на всю сесію: тіло читається по мірі
+# надходження, на кожен прочитаний шматок — рядок NDJSON з прогнозами
+# -------------------------
+@stream_bp.post("/sessions/<int:session_id>/audio/stream")
+def push_audio_stream(session_id):
+    session, error = _owned_session(session_id)
+    if error:
+        return error
+
+    def generate():
+        stream = request.stream
+        tail = b""
+        while True:
+            chunk = stream.read(STREAM_READ_BYTES)
+            if not chunk:
+                break
+            data = tail + chunk
+            usable = len(data) - len(data) % 4  # float32 can straddle two reads
+            tail = data[usable:]
+            if not usable:
+                continue
+            try:
+                predictions = _push(session, np.frombuffer(data[:usable], dtype="<f4"))
+            except QueueFullError as e:
+                yield json.dumps({"error": str(e)}) + "\n"
+                continue
+            if predictions:
+                yield json.dumps({"predictions": predictions,
+                                  "receivedSeconds": round(session.samples_received / session.sr, 3)}) + "\n"
+        yield json.dumps({"done": True, "receivedSeconds": round(session.samples_received / session.sr, 3)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+# -------------------------
+# STOP
+# -------------------------
+@stream_bp.delete("/sessions/<int:session_id>")
+def stop_session(session_id):
+    _, error = _owned_session(session_id)
+    if error:
+        return error
+    stream_sessions.remove(session_id)
+    _close_session_row(session_id, "stopped")
+    return jsonify({"success": True})
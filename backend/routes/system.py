@@ -1,99 +1,82 @@
-import psutil
 import time
-import os
-from flask import Blueprint, jsonify, g
-import subprocess
+from db import pool_stats
+from flask import Blueprint, Response, jsonify, g, request
+from services.result_cache import result_cache
+from services.model_service import registry_stats
+from services.async_jobs import async_jobs
+from services.tracing import stage_stats
+from services.request_metrics import request_metrics
+from services.resource_sampler import resource_sampler
+from services.reference_cache import reference_cache
+from services.logging_service import log_writer
+from services.users_service import user_cache
 
 system_bp = Blueprint("system", __name__)
 
-backend_process = psutil.Process(os.getpid())
-
 START_TIME = time.time()
-REQUEST_COUNT = 0
-TOTAL_RESPONSE_TIME = 0.0
-NETWORK_IN = 0
-NETWORK_OUT = 0
+
 
 def register_request():
-    global REQUEST_COUNT, NETWORK_IN
-    REQUEST_COUNT += 1
-    content_length = g.get("content_length", None)
-    if content_length:
-        NETWORK_IN += content_length
+    request_metrics.start_request(g.get("content_length", None))
 
 def register_request_time(duration_ms: float, response):
-    global TOTAL_RESPONSE_TIME, NETWORK_OUT
-    TOTAL_RESPONSE_TIME += duration_ms
-    if response and response.data:
-        NETWORK_OUT += len(response.data)
-
-def get_gpu_usage_by_pid(pid: int):
-    """Використання GPU конкретним процесом (MB). Повертає None, якщо немає процесів)."""
-    try:
-        output = subprocess.check_output(
-            ["nvidia-smi", "--query-compute-apps=pid,used_memory", "--format=csv,noheader,nounits"],
-            encoding="utf-8"
-        )
-        usage = 0
-        for line in output.strip().split("\n"):
-            line_pid, mem = line.strip().split(",")
-            if int(line_pid) == pid:
-                usage += int(mem)  # MB
-        return round(usage / 1024, 3)  # GB
-    except Exception:
-        return None
-
-def get_gpu_total_usage():
-    """Загальне завантаження GPU у % та пам'яті (GB)"""
-    try:
-        output = subprocess.check_output(
-            ["nvidia-smi", "--query-gpu=utilization.gpu,memory.used,memory.total",
-             "--format=csv,noheader,nounits"],
-            encoding="utf-8"
-        )
-        gpu_stats = []
-        for line in output.strip().split("\n"):
-            util, mem_used, mem_total = map(int, line.strip().split(","))
-            gpu_stats.append({
-                "util_percent": util,
-                "memory_used_gb": round(mem_used / 1024, 3),
-                "memory_total_gb": round(mem_total / 1024, 3)
-            })
-        return gpu_stats
-    except Exception:
-        return None
+    # шаблон маршруту (/api/jobs/<job_id>), а не сам URL — щоб не плодити серій
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    request_metrics.observe(route, request.method, response.status_code if response else 500,
+                            duration_ms / 1000, bytes_out=response.content_length if response else 0)
 
 @system_bp.get("/stats")
 def get_stats():
     uptime_seconds = time.time() - START_TIME
     uptime_hours = round(uptime_seconds / 3600, 2)
 
-    cpu_backend = backend_process.cpu_percent(interval=0.2)
-    mem = backend_process.memory_info()
-    ram_backend_gb = round(mem.rss / (1024 ** 3), 3)
-    total_ram = psutil.virtual_memory()
-    ram_total_gb = round(total_ram.total / (1024 ** 3), 2)
+    # CPU/RAM/GPU — останній знімок фонового семплера, без очікування й subprocess
+    resources = resource_sampler.latest()
 
-    avg_response_ms = (
-        round(TOTAL_RESPONSE_TIME / REQUEST_COUNT, 2)
-        if REQUEST_COUNT > 0 else 0
-    )
+    # запити всіх воркер-процесів (METRICS_DIR), а не лише цього
+    http = request_metrics.summary()
 
-    # Використання GPU твоєю програмою
-    gpu_usage_by_process_gb = get_gpu_usage_by_pid(backend_process.pid)
+    return jsonify({
+        "uptime_hours": uptime_hours,
+        "requests": http["requests"],
+        "avg_response_ms": http["avg_response_ms"],
+        "cpu_backend": resources["cpu_backend"],
+        "ram_backend_gb": resources["ram_backend_gb"],
+        "ram_total_gb": resources["ram_total_gb"],
+        "network_sent_gb": round(http["bytes_out"] / (1024 ** 3), 4),
+        "network_recv_gb": round(http["bytes_in"] / (1024 ** 3), 4),
+        "gpu_usage_by_process_gb": resources["gpu_usage_by_process_gb"],  # пам'ять, яку займає твоя програма
+        "gpu_total_stats": resources["gpu_total_stats"],                  # загальне завантаження GPU
+        "sampled_at": resources["time"],
+        "result_cache": result_cache.stats(),                # кеш результатів /analyze
+        "models": registry_stats(),                          # завантажені моделі, пам'ять, витіснення
+        "async_analyze": async_jobs.stats(),                 # черга async /analyze
+        "stages": stage_stats.snapshot(),                    # p50/p95/p99 етапів розпізнавання
+        "reference_cache": reference_cache.stats(),          # довідники AircraftTypes/Models/System_Settings
+        "recognition_logs": log_writer.stats(),              # черга відкладеного запису логів
+        "db_pool": pool_stats(),                             # очікування checkout, зайняті з'єднання, витоки
+        "user_cache": user_cache.stats(),                    # користувачі за токеном, без запиту на кожен виклик
+        "http": http                                         # гістограми затримок по маршрутах/статусах
+    })
 
-    # Загальне GPU
-    gpu_total_stats = get_gpu_total_usage()
 
+@system_bp.get("/history")
+def get_resource_history():
+    """Знімки ресурсів за останні ?minutes=N хвилин (за замовчуванням — уся історія) для графіків."""
+    minutes = request.args.get("minutes", type=float)
     return jsonify({
-        "uptime_hours": uptime_hours,
-        "requests": REQUEST_COUNT,
-        "avg_response_ms": avg_response_ms,
-        "cpu_backend": cpu_backend,
-        "ram_backend_gb": ram_backend_gb,
-        "ram_total_gb": ram_total_gb,
-        "network_sent_gb": round(NETWORK_OUT / (1024 ** 3), 4),
-        "network_recv_gb": round(NETWORK_IN / (1024 ** 3), 4),
-        "gpu_usage_by_process_gb": gpu_usage_by_process_gb,  # пам'ять, яку займає твоя програма
-        "gpu_total_stats": gpu_total_stats                   # загальне завантаження GPU
-    })
\ No newline at end of file
+        "interval_seconds": resource_sampler.interval,
+        "samples": resource_sampler.history(minutes * 60 if minutes else None),
+    })
+
+
+@system_bp.get("/stages")
+def get_stage_stats():
+    """Затримки етапів (upload, decode, features, predict, db_lookup, *.total) за останні запити."""
+    return jsonify(stage_stats.snapshot())
+
+
+@system_bp.get("/metrics")
+def get_prometheus_metrics():
+    """Prometheus text format: гістограми затримок по маршрутах, сумовані по всіх воркерах."""
+    return Response(request_metrics.prometheus(), mimetype="text/plain; version=0.0.4")
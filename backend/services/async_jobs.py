@@ -0,0 +1,161 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from services.batching import QueueFullError
+
+# Worker threads for async /analyze, how many jobs may wait for one, and how
+# long a finished job's result is kept for polling
+ASYNC_ANALYZE_WORKERS = int(os.environ.get("ASYNC_ANALYZE_WORKERS", "2"))
+ASYNC_ANALYZE_MAX_PENDING = int(os.environ.get("ASYNC_ANALYZE_MAX_PENDING", "64"))
+ASYNC_RESULT_TTL = float(os.environ.get("ASYNC_RESULT_TTL", "600"))
+# Uploads wait here until their job ran (default: system temp dir)
+ASYNC_SPOOL_DIR = os.environ.get("ASYNC_SPOOL_DIR") or None
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class AsyncJob:
+    def __init__(self, job_id, cleanup=None):
+        self.job_id = job_id
+        self.status = "queued"  # queued | running | done | failed
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None       # (body dict, HTTP status) of the analysis
+        self.error = None
+        self.cleanup = cleanup   # called once the job finished (e.g. delete the spooled upload)
+        self.done = threading.Event()
+
+    def to_dict(self):
+        info = {
+            "jobId": self.job_id,
+            "status": self.status,
+            "submittedAt": self.submitted_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+        }
+        if self.result is not None:
+            info["result"], info["httpStatus"] = self.result
+        if self.error is not None:
+            info["error"] = self.error
+        return info
+
+
+class AsyncJobQueue:
+    """
+    Обмежена черга фонових задач /analyze. Великі завантаження не тримають
+    потік веб-сервера: запит лише зберігає файл і отримує jobId (202), а
+    декодування й інференс іде в max(workers) фонових потоках. Коли задач,
+    що чекають, більше за max_pending — QueueFullError (503).
+    """
+
+    def __init__(self, workers=ASYNC_ANALYZE_WORKERS, max_pending=ASYNC_ANALYZE_MAX_PENDING, result_ttl=ASYNC_RESULT_TTL):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="async-analyze")
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # job_id -> AsyncJob, oldest first
+        self._queued = 0
+        self._running = 0
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "expired": 0}
+        self._queue_wait_ms = deque(maxlen=1024)
+        self._latency_ms = deque(maxlen=1024)  # submit -> finished
+
+    def submit(self, fn, *args, cleanup=None) -> AsyncJob:
+        """Queue fn(*args) -> (body, status); raises QueueFullError when max_pending jobs already wait."""
+        self._expire()
+        job = AsyncJob(uuid.uuid4().hex, cleanup=cleanup)
+        with self._lock:
+            if self._queued >= self.max_pending:
+                self._counters["rejected"] += 1
+                raise QueueFullError(f"Async analyze queue is full ({self.max_pending})")
+            self._queued += 1
+            self._counters["submitted"] += 1
+            self._jobs[job.job_id] = job
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job, fn, args):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            job.status = "running"
+            job.started_at = time.time()
+            self._queue_wait_ms.append((job.started_at - job.submitted_at) * 1000)
+
+        try:
+            result, status = fn(*args), "done"
+        except Exception as e:
+            logging.exception(f"Async analyze job {job.job_id} failed:")
+            result, status = None, "failed"
+            job.error = str(e)
+        finally:
+            if job.cleanup is not None:
+                try:
+                    job.cleanup()
+                except Exception:
+                    logging.exception(f"Async analyze job {job.job_id} cleanup failed:")
+
+        with self._lock:
+            self._running -= 1
+            job.result = result
+            job.status = status
+            job.finished_at = time.time()
+            self._counters["completed" if status == "done" else "failed"] += 1
+            self._latency_ms.append((job.finished_at - job.submitted_at) * 1000)
+        job.done.set()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout):
+        """Job after it finished or timeout seconds passed (long-poll); None if unknown."""
+        job = self.get(job_id)
+        if job is not None and timeout > 0:
+            job.done.wait(timeout)
+        return job
+
+    def _expire(self):
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            for job_id in [j.job_id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+                del self._jobs[job_id]
+                self._counters["expired"] += 1
+
+    def stats(self) -> dict:
+        self._expire()
+        now = time.time()
+        with self._lock:
+            queued = [j for j in self._jobs.values() if j.status == "queued"]
+            running = [j for j in self._jobs.values() if j.status == "running"]
+            waits = sorted(self._queue_wait_ms)
+            latencies = sorted(self._latency_ms)
+            return dict(
+                self._counters,
+                workers=self.workers,
+                max_pending=self.max_pending,
+                queue_depth=self._queued,
+                running=self._running,
+                oldest_queued_age_s=round(max((now - j.submitted_at for j in queued), default=0), 3),
+                oldest_running_age_s=round(max((now - j.submitted_at for j in running), default=0), 3),
+                p50_queue_wait_ms=round(_percentile(waits, 0.5), 1),
+                p95_queue_wait_ms=round(_percentile(waits, 0.95), 1),
+                p50_latency_ms=round(_percentile(latencies, 0.5), 1),
+                p95_latency_ms=round(_percentile(latencies, 0.95), 1),
+                max_latency_ms=round(latencies[-1], 1) if latencies else 0,
+                retained=len(self._jobs),
+            )
+
+
+async_jobs = AsyncJobQueue()
@@ -0,0 +1,58 @@
+import os
+
+from flask import g, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+# Signing key shared by all worker processes (and restarts) — required
+AUTH_SECRET_KEY = os.environ.get("AUTH_SECRET_KEY") or None
+AUTH_TOKEN_TTL = int(os.environ.get("AUTH_TOKEN_TTL", str(12 * 3600)))  # seconds
+# Transitional: also accept a bare X-User-ID header from old clients. Anyone can
+# send any ID in it, so it stays off unless explicitly enabled with 1
+AUTH_ALLOW_USER_ID_HEADER = os.environ.get("AUTH_ALLOW_USER_ID_HEADER", "0") == "1"
+
+if AUTH_SECRET_KEY is None:
+    raise RuntimeError("AUTH_SECRET_KEY is not set: access tokens need a signing key "
+                       "(e.g. python -c \"import secrets; print(secrets.token_hex(32))\")")
+
+_serializer = URLSafeTimedSerializer(AUTH_SECRET_KEY, salt="access-token")
+
+
+def issue_token(user_id, role):
+    """Signed access token carrying the user ID and role; valid for AUTH_TOKEN_TTL seconds."""
+    return _serializer.dumps({"uid": int(user_id), "role": role})
+
+
+def verify_token(token, max_age=AUTH_TOKEN_TTL):
+    """{"user_id", "role"} of a valid token, None for a forged, malformed or expired one. No DB access."""
+    try:
+        data = _serializer.loads(token, max_age=max_age)
+    except BadSignature:  # SignatureExpired included
+        return None
+    return {"user_id": int(data["uid"]), "role": data["role"]}
+
+
+def current_principal():
+    """
+    Identity of the current request from "Authorization: Bearer <token>",
+    falling back to X-User-ID (role unknown) while AUTH_ALLOW_USER_ID_HEADER
+    is on. Resolved once per request.
+    """
+    if "principal" in g:
+        return g.principal
+
+    principal = None
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        principal = verify_token(token.strip())
+    elif AUTH_ALLOW_USER_ID_HEADER:
+        user_id = request.headers.get("X-User-ID")
+        if user_id and user_id.isdigit():
+            principal = {"user_id": int(user_id), "role": None}
+
+    g.principal = principal
+    return principal
+
+
+def current_user_id():
+    principal = current_principal()
+    return principal["user_id"] if principal else None
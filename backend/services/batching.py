@@ -0,0 +1,156 @@
+import logging
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a scheduler queue already holds max_queue_size requests."""
+
+
+class SchedulerClosedError(RuntimeError):
+    """Raised by submit() after stop(), e.g. when the model was unloaded."""
+
+
+class BatchScheduler:
+    """
+    Dynamic micro-batching in front of a single model.
+
+    Requests enqueue their feature tensor together with a Future. A worker
+    thread takes the first waiting request, then keeps collecting until either
+    max_batch_size items are gathered or max_wait_ms has passed since that
+    first request arrived, runs one batched forward pass and fans the rows of
+    the result back out to the waiting futures.
+    """
+
+    def __init__(self, name, predict_fn, max_batch_size=16, max_wait_ms=10, max_queue_size=256):
+        self.name = name
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.max_queue_size = max(1, int(max_queue_size))
+
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._closed = False
+        self._close_lock = threading.Lock()  # no submit can slip in behind the stop sentinel
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._rejected = 0
+        self._batch_sizes = Counter()
+        self._total_wait_ms = 0.0
+        self._max_wait_ms = 0.0
+        self._recent_waits_ms = deque(maxlen=1024)
+        self._total_predict_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True)
+        self._thread.start()
+
+    # ---------------- public API ----------------
+    def submit(self, features) -> Future:
+        """Enqueue a (n, ...) feature array; the future resolves to its (n, classes) predictions."""
+        future = Future()
+        with self._close_lock:
+            if self._closed:
+                raise SchedulerClosedError(f"Model '{self.name}' was unloaded")
+            try:
+                self._queue.put_nowait((features, future, time.perf_counter()))
+            except queue.Full:
+                with self._stats_lock:
+                    self._rejected += 1
+                raise QueueFullError(f"Model '{self.name}' queue is full ({self.max_queue_size})")
+        return future
+
+    def predict(self, features, timeout=None):
+        return self.submit(features).result(timeout=timeout)
+
+    def stop(self, wait=True):
+        """Reject new requests; the ones already queued are still served."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        if wait:
+            self._thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            waits = sorted(self._recent_waits_ms)
+            p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+            return {
+                "model": self.name,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "max_queue_size": self.max_queue_size,
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "items": self._items,
+                "rejected": self._rejected,
+                "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0,
+                "batch_size_histogram": {str(k): v for k, v in sorted(self._batch_sizes.items())},
+                "avg_queue_wait_ms": round(self._total_wait_ms / self._items, 3) if self._items else 0,
+                "p95_queue_wait_ms": round(p95, 3),
+                "max_queue_wait_ms": round(self._max_wait_ms, 3),
+                "avg_predict_ms": round(self._total_predict_ms / self._batches, 3) if self._batches else 0,
+            }
+
+    # ---------------- worker ----------------
+    def _collect(self, first):
+        batch = [first]
+        rows = len(first[0])
+        deadline = first[2] + self.max_wait
+        while rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # put the stop sentinel back so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [item for item in self._collect(first) if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            waits_ms = [(started - enqueued) * 1000 for _, _, enqueued in batch]
+            try:
+                inputs = np.concatenate([features for features, _, _ in batch], axis=0)
+                preds = np.asarray(self.predict_fn(inputs))
+            except Exception as e:
+                logging.exception(f"Batched predict failed for model '{self.name}':")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            predict_ms = (time.perf_counter() - started) * 1000
+
+            offset = 0
+            for features, future, _ in batch:
+                n = len(features)
+                future.set_result(preds[offset:offset + n])
+                offset += n
+
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._batch_sizes[len(inputs)] += 1
+                self._total_wait_ms += sum(waits_ms)
+                self._max_wait_ms = max(self._max_wait_ms, max(waits_ms))
+                self._recent_waits_ms.extend(waits_ms)
+                self._total_predict_ms += predict_ms
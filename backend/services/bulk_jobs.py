@@ -0,0 +1,409 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import insert
+
+from services.feature_pool import clip_features
+from services.model_service import CLASS_LABELS, predict
+from services.reference_cache import reference_cache
+from services.rollups import apply_rollups
+
+# Where job manifests (and uploaded archives) live, how many jobs run at once,
+# threads decoding + extracting features ahead of the model and rows per
+# predict / INSERT batch
+BULK_JOBS_DIR = os.environ.get("BULK_JOBS_DIR") or os.path.join(os.path.dirname(__file__), "..", "jobs")
+BULK_JOBS_WORKERS = int(os.environ.get("BULK_JOBS_WORKERS", "1"))
+BULK_DECODE_WORKERS = int(os.environ.get("BULK_DECODE_WORKERS", str(min(8, os.cpu_count() or 1))))
+BULK_BATCH_SIZE = int(os.environ.get("BULK_BATCH_SIZE", "64"))
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg", ".mp3", ".webm", ".m4a", ".aac")
+SOURCE_TYPE = "batch"  # Recognition_Logs.SourceType of rows written by bulk jobs
+
+SR = 22050
+DURATION = 5.0
+N_MFCC = 40
+
+
+class BulkJobError(ValueError):
+    """Invalid job input (empty archive, missing directory, unknown files...)."""
+
+
+def new_job_id():
+    return uuid.uuid4().hex[:12]
+
+
+# ================== ITEMS ==========================
+def items_from_zip(zip_path):
+    with zipfile.ZipFile(zip_path) as zf:
+        names = [n for n in zf.namelist() if not n.endswith("/") and n.lower().endswith(AUDIO_EXTENSIONS)]
+    if not names:
+        raise BulkJobError("Архів не містить аудіофайлів")
+    return [{"name": n, "zip": zip_path, "member": n} for n in sorted(names)]
+
+
+def items_from_directory(directory):
+    if not os.path.isdir(directory):
+        raise BulkJobError(f"Каталог не знайдено: {directory}")
+    items = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                path = os.path.join(root, name)
+                items.append({"name": os.path.relpath(path, directory), "path": path})
+    if not items:
+        raise BulkJobError("Каталог не містить аудіофайлів")
+    return sorted(items, key=lambda item: item["name"])
+
+
+def items_from_audio_files(file_ids, user_id):
+    """Audio_Files rows of this user only — FileIDs of other users are treated as not found."""
+    from db import SessionLocal
+    from models.audio_files import AudioFile
+
+    db = SessionLocal()
+    try:
+        rows = db.query(AudioFile.FileID, AudioFile.FilePath, AudioFile.OriginalName) \
+            .filter(AudioFile.FileID.in_([int(i) for i in file_ids]), AudioFile.UserID == int(user_id)).all()
+    finally:
+        db.close()
+    if not rows:
+        raise BulkJobError("Файли не знайдено")
+    return [{"name": name or os.path.basename(path), "path": path, "file_id": file_id}
+            for file_id, path, name in sorted(rows)]
+
+
+class _ItemReader:
+    """Reads item bytes; keeps one ZipFile handle per archive (ZipFile reads are not thread-safe)."""
+
+    def __init__(self):
+        self._zips = {}
+        self._lock = threading.Lock()
+
+    def read(self, item):
+        if "zip" not in item:
+            with open(item["path"], "rb") as f:
+                return f.read()
+        with self._lock:
+            zf = self._zips.get(item["zip"])
+            if zf is None:
+                zf = self._zips[item["zip"]] = zipfile.ZipFile(item["zip"])
+            return zf.read(item["member"])
+
+    def close(self):
+        for zf in self._zips.values():
+            zf.close()
+
+
+# ================== JOB ==========================
+class BulkJob:
+    """
+    Пакетний аналіз: список файлів -> декодування + MFCC у пулі потоків
+    (на кілька батчів наперед) -> батчевий predict -> bulk INSERT у
+    Recognition_Logs.
+
+    Стан лежить у manifest.json каталогу задачі й оновлюється після кожного
+    записаного батчу, тож після падіння resume продовжує з першого
+    необробленого файлу. Гарантія — "хоча б один раз": якщо процес впаде між
+    COMMIT батчу і записом маніфесту, цей батч (не більше) запишеться вдруге.
+    """
+
+    def __init__(self, manifest_path, manifest):
+        self.manifest_path = manifest_path
+        self.manifest = manifest
+        self.job_id = manifest["job_id"]
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._run_started = None
+        self._run_done = 0
+        self._claimed = False
+
+    # ---------------- persistence ----------------
+    @classmethod
+    def create(cls, items, model_key, user_id, source, jobs_dir=BULK_JOBS_DIR, job_id=None):
+        job_id = job_id or new_job_id()
+        job_dir = os.path.join(jobs_dir, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        manifest = {
+            "job_id": job_id,
+            "source": source,
+            "model": model_key,
+            "user_id": int(user_id),
+            "status": "queued",
+            "created_at": time.time(),
+            "finished_at": None,
+            "error": None,
+            "items": [dict(item, status="pending") for item in items],
+            "elapsed_seconds": 0.0,
+        }
+        job = cls(os.path.join(job_dir, "manifest.json"), manifest)
+        job.save()
+        return job
+
+    @classmethod
+    def load(cls, manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            return cls(manifest_path, json.load(f))
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self.manifest, ensure_ascii=False)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)  # a crash leaves the old or the new manifest, never half
+
+    # ---------------- progress ----------------
+    def progress(self) -> dict:
+        with self._lock:
+            m = self.manifest
+            counts = {"pending": 0, "done": 0, "failed": 0}
+            for item in m["items"]:
+                counts[item["status"]] += 1
+            total = len(m["items"])
+            elapsed = m["elapsed_seconds"]
+            if self._run_started is not None:
+                elapsed += time.monotonic() - self._run_started
+                rate = self._run_done / max(time.monotonic() - self._run_started, 1e-9)
+            else:
+                rate = (counts["done"] + counts["failed"]) / elapsed if elapsed else 0.0
+
+            status = m["status"]
+            if status == "running" and not self._claimed:
+                status = "interrupted"  # the process running it died; resume continues it
+
+            return {
+                "jobId": self.job_id,
+                "status": status,
+                "model": m["model"],
+                "source": m["source"],
+                "total": total,
+                "done": counts["done"],
+                "failed": counts["failed"],
+                "pending": counts["pending"],
+                "percent": round(100 * (total - counts["pending"]) / total, 2) if total else 100.0,
+                "filesPerSecond": round(rate, 2),
+                "etaSeconds": round(counts["pending"] / rate, 1) if rate and counts["pending"] else None,
+                "elapsedSeconds": round(elapsed, 1),
+                "error": m["error"],
+                "createdAt": m["created_at"],
+            }
+
+    def failures(self):
+        with self._lock:
+            return [{"name": i["name"], "error": i.get("error")} for i in self.manifest["items"] if i["status"] == "failed"]
+
+    def cancel(self):
+        self._cancel.set()
+
+    def claim(self):
+        """True for the single caller allowed to start run() now; False while a run is under way."""
+        with self._lock:
+            if self._claimed:
+                return False
+            self._claimed = True
+            self._cancel.clear()
+            return True
+
+    # ---------------- run ----------------
+    def run(self, batch_size=BULK_BATCH_SIZE, decode_workers=BULK_DECODE_WORKERS):
+        """Process every pending item; safe to call again on a job that crashed or was cancelled."""
+        with self._lock:
+            self.manifest.update(status="running", error=None)
+            pending = [i for i, item in enumerate(self.manifest["items"]) if item["status"] == "pending"]
+        self._run_started = time.monotonic()
+        self._run_done = 0
+        self.save()
+
+        try:
+            aircraft_ids = _aircraft_type_ids()
+            reader = _ItemReader()
+            try:
+                with ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix=f"bulk-{self.job_id}") as pool:
+                    for batch in self._feature_batches(pool, reader, pending, batch_size):
+                        self._write_batch(batch, aircraft_ids)
+                        if self._cancel.is_set():
+                            break
+            finally:
+                reader.close()
+            status = "cancelled" if self._cancel.is_set() else "completed"
+            error = None
+        except Exception as e:
+            logging.exception(f"Bulk job {self.job_id} failed:")
+            status, error = "failed", str(e)
+
+        with self._lock:
+            self.manifest["elapsed_seconds"] += time.monotonic() - self._run_started
+            self._run_started = None
+            self.manifest.update(status=status, error=error,
+                                 finished_at=time.time() if status == "completed" else None)
+            self._claimed = False
+        self.save()
+        if status == "completed":
+            self._remove_uploads()
+        return self.progress()
+
+    def _remove_uploads(self):
+        """Uploaded archives in the job directory are only needed until the job completes (resume reads them)."""
+        job_dir = os.path.dirname(self.manifest_path)
+        for zip_path in {item["zip"] for item in self.manifest["items"] if "zip" in item}:
+            if os.path.dirname(os.path.abspath(zip_path)) == os.path.abspath(job_dir):
+                try:
+                    os.remove(zip_path)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    logging.exception(f"Bulk job {self.job_id}: could not remove {zip_path}")
+
+    def _features(self, reader, index):
+        item = self.manifest["items"][index]
+        started = time.perf_counter()
+        try:
+            features = clip_features(reader.read(item), sr=SR, duration=DURATION, n_mfcc=N_MFCC)
+            return index, features, None, time.perf_counter() - started
+        except Exception as e:
+            return index, None, str(e) or type(e).__name__, time.perf_counter() - started
+
+    def _feature_batches(self, pool, reader, indices, batch_size):
+        """Batches of decoded items in order; decoding runs up to two batches ahead."""
+        in_flight = deque()
+        position = 0
+        while position < len(indices) or in_flight:
+            while position < len(indices) and len(in_flight) < 2 * batch_size:
+                in_flight.append(pool.submit(self._features, reader, indices[position]))
+                position += 1
+            batch = [in_flight.popleft().result() for _ in range(min(batch_size, len(in_flight)))]
+            yield batch
+            if self._cancel.is_set():
+                for future in in_flight:
+                    future.cancel()
+                return
+
+    def _write_batch(self, batch, aircraft_ids):
+        ok = [(index, features, seconds) for index, features, error, seconds in batch if error is None]
+        rows, results = [], {}
+        if ok:
+            started = time.perf_counter()
+            preds = np.asarray(predict(self.manifest["model"], np.concatenate([f for _, f, _ in ok], axis=0)))
+            predict_share = (time.perf_counter() - started) / len(ok)
+
+            for (index, _, decode_seconds), p in zip(ok, preds):
+                label = CLASS_LABELS[int(np.argmax(p))]
+                confidence = round(float(np.max(p)) * 100, 2)
+                processing_ms = int((decode_seconds + predict_share) * 1000)
+                results[index] = {"result": label, "confidence": confidence}
+                rows.append({
+                    "UserID": self.manifest["user_id"],
+                    "AircraftTypeID": aircraft_ids.get(label),
+                    "Confidence": confidence,
+                    "SourceType": SOURCE_TYPE,
+                    "ProcessingTimeMs": processing_ms,
+                    "CreatedAt": datetime.now(),
+                })
+
+        if rows:
+            _insert_logs(rows)
+
+        with self._lock:
+            items = self.manifest["items"]
+            for index, _, error, _ in batch:
+                if error is None:
+                    items[index].update(status="done", **results[index])
+                else:
+                    items[index].update(status="failed", error=error)
+            self._run_done += len(batch)
+        self.save()
+
+
+def _aircraft_type_ids():
+    ids = {label: reference_cache.aircraft_type_id(label) for label in CLASS_LABELS}
+    missing = [label for label, type_id in ids.items() if type_id is None]
+    if missing:
+        raise RuntimeError(f"AircraftTypes rows missing for: {', '.join(missing)}")
+    return ids
+
+
+def _insert_logs(rows):
+    """One executemany INSERT per batch (fast_executemany on the engine)."""
+    from db import SessionLocal
+    from models.recognition_logs import RecognitionLog
+
+    db = SessionLocal()
+    try:
+        db.execute(insert(RecognitionLog), rows)
+        apply_rollups(db, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# ================== REGISTRY ==========================
+class BulkJobManager:
+    """Jobs of this process; runs them on a small executor and finds manifests on disk for resume."""
+
+    def __init__(self, jobs_dir=BULK_JOBS_DIR, workers=BULK_JOBS_WORKERS):
+        self.jobs_dir = jobs_dir
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="bulk-job")
+
+    def create(self, items, model_key, user_id, source, job_id=None):
+        job = BulkJob.create(items, model_key, user_id, source, jobs_dir=self.jobs_dir, job_id=job_id)
+        self._submit(job)
+        return job
+
+    def _submit(self, job):
+        with self._lock:
+            self._jobs[job.job_id] = job
+        if not job.claim():
+            return False
+        self._executor.submit(job.run)
+        return True
+
+    def job_dir(self, job_id):
+        return os.path.join(self.jobs_dir, job_id)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        # a job from before a restart: known from its manifest only
+        manifest_path = os.path.join(self.job_dir(os.path.basename(job_id)), "manifest.json")
+        if os.path.exists(manifest_path):
+            job = BulkJob.load(manifest_path)
+            with self._lock:
+                return self._jobs.setdefault(job.job_id, job)
+        return None
+
+    def resume(self, job_id):
+        """Start an interrupted job again from its manifest; None if unknown, False if it is still running."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        return self._submit(job)
+
+    def list(self, user_id=None):
+        """Progress of every known job (or of one user's), newest first."""
+        if os.path.isdir(self.jobs_dir):
+            for name in os.listdir(self.jobs_dir):
+                self.get(name)
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if user_id is None or job.manifest["user_id"] == user_id]
+        return sorted((job.progress() for job in jobs), key=lambda p: p["createdAt"], reverse=True)
+
+
+bulk_jobs = BulkJobManager()
@@ -0,0 +1,38 @@
+import logging
+import time
+
+from flask import g
+
+from db import SessionLocal, pool_monitor
+
+
+def get_db():
+    """
+    Session of the current request: opened on first use, closed by close_db
+    on every exit path (return, abort, exception). Handlers must not close it.
+    """
+    if "db_session" not in g:
+        g.db_session = SessionLocal()
+    return g.db_session
+
+
+def close_db(error=None):
+    session = g.pop("db_session", None)
+    if session is not None:
+        try:
+            if error is not None:
+                session.rollback()
+        finally:
+            session.close()
+
+    # anything this thread still holds now belongs to a session nobody closed
+    for holder in pool_monitor.leaked():
+        logging.warning(
+            f"DB connection leaked: still checked out after the request, held for "
+            f"{time.time() - holder['since']:.1f}s"
+            + (f"; checked out at\n{holder['stack']}" if holder["stack"] else " (DB_LEAK_TRACE=1 shows where)")
+        )
+
+
+def init_app(app):
+    app.teardown_appcontext(close_db)
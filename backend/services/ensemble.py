@@ -0,0 +1,56 @@
+import logging
+
+import numpy as np
+
+FUSION_METHODS = ("mean", "weighted", "majority")
+
+
+def predict_all(features, model_keys, get_scheduler):
+    """
+    Подає ті самі ознаки в усі моделі одночасно: кожен планувальник має свій
+    робочий потік, тож час ≈ найповільніша модель, а не сума.
+    Повертає ({key: ймовірності}, {key: помилка}).
+    """
+    futures, errors = {}, {}
+    for key in model_keys:
+        try:
+            futures[key] = get_scheduler(key).submit(features)
+        except Exception as e:
+            logging.exception(f"Ensemble: model '{key}' unavailable:")
+            errors[key] = str(e)
+
+    probs = {}
+    for key, future in futures.items():
+        try:
+            probs[key] = np.asarray(future.result())[0]
+        except Exception as e:
+            logging.exception(f"Ensemble: model '{key}' failed:")
+            errors[key] = str(e)
+    return probs, errors
+
+
+def fuse(probs, method="mean", weights=None):
+    """(class index, confidence 0..1, fused probabilities, votes) for {key: probabilities}."""
+    keys = list(probs)
+    stacked = np.stack([probs[k] for k in keys])
+    votes = np.bincount(stacked.argmax(axis=1), minlength=stacked.shape[1])
+
+    if method == "weighted":
+        w = np.array([float((weights or {}).get(k, 1.0)) for k in keys])
+        if (w < 0).any():
+            raise ValueError(f"Ensemble weights must be >= 0: {dict(zip(keys, w.tolist()))}")
+        if w.sum() == 0:
+            # e.g. the only models that answered are weighted 0: better an average than NaN
+            logging.warning(f"Ensemble weights of {keys} are all 0, fusing with equal weights")
+            w = np.ones(len(keys))
+        fused = (stacked * w[:, None]).sum(axis=0) / w.sum()
+        idx = int(np.argmax(fused))
+    elif method == "majority":
+        fused = stacked.mean(axis=0)
+        # most votes wins; ties go to the higher mean probability
+        idx = int(np.lexsort((fused, votes))[-1])
+    else:
+        fused = stacked.mean(axis=0)
+        idx = int(np.argmax(fused))
+
+    return idx, float(fused[idx]), fused, votes
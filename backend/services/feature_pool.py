@@ -0,0 +1,117 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from services.tracing import record, span
+from utils.audio_io import decode_audio
+from utils.audio_processing import extract_features_batch
+
+# Processes for decode + MFCC; 0 keeps the old behaviour (request thread)
+FEATURE_POOL_WORKERS = int(os.environ.get("FEATURE_POOL_WORKERS", "0"))
+
+
+def _attach(name):
+    """Open a block the parent created; the parent alone unlinks it."""
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    # spawned workers share the parent's resource tracker, so registering
+    # the name again is a no-op and the parent's unlink() unregisters it
+    return SharedMemory(name=name)
+
+
+def _worker_clip_features(in_name, in_size, out_name, out_shape, sr, duration, n_mfcc):
+    """
+    Runs in a pool process: bytes from shared memory in, features to shared
+    memory out. Returns (decode_ms, features_ms) for the parent's trace.
+    """
+    shm_in = _attach(in_name)
+    try:
+        data = bytes(shm_in.buf[:in_size])
+    finally:
+        shm_in.close()
+
+    started = time.perf_counter()
+    y = decode_audio(data, sr=sr, duration=duration)
+    decoded = time.perf_counter()
+    features = extract_features_batch([y], sr=sr, n_mfcc=n_mfcc)
+    timings = ((decoded - started) * 1000, (time.perf_counter() - decoded) * 1000)
+
+    shm_out = _attach(out_name)
+    try:
+        np.ndarray(out_shape, dtype=np.float32, buffer=shm_out.buf)[:] = features
+    finally:
+        shm_out.close()
+    return timings
+
+
+def _worker_ready():
+    return os.getpid()
+
+
+class FeaturePool:
+    """
+    Пул процесів для CPU-важкого етапу (декодування + MFCC) поза GIL
+    потоку запиту. Завантажений файл і готові ознаки передаються через
+    shared memory, а не pickle; сама модель лишається в основному процесі.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # created on first use so importing the app does not spawn processes
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+            return self._executor
+
+    def warmup(self):
+        """Start every worker and import the audio stack there before the first request."""
+        executor = self._get_executor()
+        for future in [executor.submit(_worker_ready) for _ in range(self.workers)]:
+            future.result()
+
+    def clip_features(self, data: bytes, sr=22050, duration=None, n_mfcc=40):
+        out_shape = (1, n_mfcc, 1)
+        shm_in = SharedMemory(create=True, size=max(1, len(data)))
+        shm_out = SharedMemory(create=True, size=int(np.prod(out_shape)) * 4)
+        try:
+            shm_in.buf[:len(data)] = data
+            future = self._get_executor().submit(
+                _worker_clip_features, shm_in.name, len(data), shm_out.name, out_shape, sr, duration, n_mfcc
+            )
+            decode_ms, features_ms = future.result()
+            record("decode", decode_ms)
+            record("features", features_ms)
+            return np.ndarray(out_shape, dtype=np.float32, buffer=shm_out.buf).copy()
+        finally:
+            for shm in (shm_in, shm_out):
+                shm.close()
+                shm.unlink()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+feature_pool = FeaturePool(FEATURE_POOL_WORKERS) if FEATURE_POOL_WORKERS > 0 else None
+
+
+def clip_features(data: bytes, sr=22050, duration=None, n_mfcc=40):
+    """Ознаки (1, n_mfcc, 1) одного кліпу — у пулі процесів, якщо він увімкнений."""
+    if feature_pool is not None:
+        return feature_pool.clip_features(data, sr=sr, duration=duration, n_mfcc=n_mfcc)
+    with span("decode"):
+        y = decode_audio(data, sr=sr, duration=duration)
+    with span("features"):
+        return extract_features_batch([y], sr=sr, n_mfcc=n_mfcc)
@@ -0,0 +1,105 @@
+import os
+import threading
+
+import numpy as np
+
+# Backends a MODEL_FILES entry may select with "backend"
+BACKENDS = ("keras", "tflite_f16", "tflite_int8")
+TFLITE_NUM_THREADS = int(os.environ.get("TFLITE_NUM_THREADS", "1"))
+
+
+def tflite_path(model_path, variant):
+    """model.h5 -> model.f16.tflite / model.int8.tflite (next to the Keras file)."""
+    stem, _ = os.path.splitext(model_path)
+    return f"{stem}.{variant}.tflite"
+
+
+def _tflite_interpreter_class():
+    # the standalone runtimes are much lighter than importing all of TensorFlow
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        import tensorflow as tf
+        return tf.lite.Interpreter
+
+
+class KerasBackend:
+    name = "keras"
+
+    def __init__(self, path):
+        import tensorflow as tf
+
+        self.path = path
+        self.model = tf.keras.models.load_model(path)
+        self.input_shape = tuple(self.model.input_shape)
+
+    def predict(self, x):
+        return np.asarray(self.model.predict_on_batch(x))
+
+    def memory_bytes(self):
+        return int(sum(w.nbytes for w in self.model.get_weights()))
+
+
+class TFLiteBackend:
+    """
+    TFLite interpreter behind the same predict() as KerasBackend. The input
+    tensor is resized when the batch size changes; int8 models with
+    integer input/output get (de)quantized here.
+    """
+
+    def __init__(self, path, num_threads=TFLITE_NUM_THREADS):
+        self.path = path
+        self.name = "tflite_" + path.rsplit(".", 2)[-2]
+        self.interpreter = _tflite_interpreter_class()(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch = int(self._input["shape"][0])
+        self.input_shape = (None,) + tuple(int(d) for d in self._input["shape"][1:])
+        self._lock = threading.Lock()  # an interpreter is not thread-safe
+
+    def _resize(self, batch):
+        if batch != self._batch:
+            shape = [batch] + list(self.input_shape[1:])
+            self.interpreter.resize_tensor_input(self._input["index"], shape)
+            self.interpreter.allocate_tensors()
+            self._input = self.interpreter.get_input_details()[0]
+            self._output = self.interpreter.get_output_details()[0]
+            self._batch = batch
+
+    def predict(self, x):
+        x = np.asarray(x, dtype=np.float32)
+        with self._lock:
+            self._resize(len(x))
+            if self._input["dtype"] != np.float32:
+                scale, zero = self._input["quantization"]
+                x = np.clip(np.round(x / scale + zero), -128, 127).astype(self._input["dtype"])
+            self.interpreter.set_tensor(self._input["index"], x)
+            self.interpreter.invoke()
+            out = self.interpreter.get_tensor(self._output["index"]).copy()
+            if self._output["dtype"] != np.float32:
+                scale, zero = self._output["quantization"]
+                out = (out.astype(np.float32) - zero) * scale
+        return out
+
+    def memory_bytes(self):
+        return os.path.getsize(self.path)
+
+
+def load_backend(model_path, backend="keras"):
+    """Inference backend for a Keras model file; tflite_* use the converted artifact next to it."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+    if backend == "keras":
+        return KerasBackend(model_path)
+
+    path = tflite_path(model_path, backend.split("_", 1)[1])
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"TFLite artifact not found: {path} (run python -m tools.convert_tflite)")
+    return TFLiteBackend(path)
@@ -0,0 +1,142 @@
+import csv
+import importlib.util
+import io
+import os
+
+from sqlalchemy import select
+
+from db import SessionLocal
+from models.aircraft_types import AircraftType
+from models.recognition_logs import RecognitionLog
+from models.users import User
+
+# Rows fetched per round trip (and per Parquet row group); memory use of an
+# export is bounded by one partition regardless of how many rows it has
+EXPORT_PARTITION_ROWS = int(os.environ.get("EXPORT_PARTITION_ROWS", "20000"))
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+COLUMNS = ("LogID", "CreatedAt", "UserID", "Username", "AircraftTypeID", "AircraftName",
+           "Confidence", "ProcessingTimeMs", "SourceType")
+
+
+def export_select(conditions):
+    """Logs joined with users and aircraft types, in LogID (clustered key) order."""
+    return (
+        select(
+            RecognitionLog.LogID,
+            RecognitionLog.CreatedAt,
+            RecognitionLog.UserID,
+            User.Username,
+            RecognitionLog.AircraftTypeID,
+            AircraftType.AircraftName,
+            RecognitionLog.Confidence,
+            RecognitionLog.ProcessingTimeMs,
+            RecognitionLog.SourceType,
+        )
+        .outerjoin(User, User.UserID == RecognitionLog.UserID)
+        .outerjoin(AircraftType, AircraftType.AircraftTypeID == RecognitionLog.AircraftTypeID)
+        .where(*conditions)
+        .order_by(RecognitionLog.LogID)
+    )
+
+
+def iter_partitions(conditions, partition_rows=EXPORT_PARTITION_ROWS):
+    """Lists of row tuples, partition_rows at a time, from a streamed (server-side) result."""
+    db = SessionLocal()
+    try:
+        result = db.execute(export_select(conditions).execution_options(stream_results=True, yield_per=partition_rows))
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def iter_csv(conditions, partition_rows=EXPORT_PARTITION_ROWS):
+    """CSV as bytes chunks: the header, then one chunk per partition."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    yield buffer.getvalue().encode("utf-8")
+
+    for partition in iter_partitions(conditions, partition_rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            (log_id, created_at.isoformat(sep=" ") if created_at else "", *rest)
+            for log_id, created_at, *rest in partition
+        )
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """Write-only file for ParquetWriter whose content is taken out after every row group."""
+
+    def __init__(self):
+        self.closed = False
+        self._buffer = bytearray()
+        self._position = 0
+
+    def write(self, data):
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data, self._buffer = bytes(self._buffer), bytearray()
+        return data
+
+
+def check_format(fmt):
+    """Raises ValueError for an unknown format, RuntimeError when its writer is not installed."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "parquet":
+        if importlib.util.find_spec("pyarrow") is None:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+
+def iter_parquet(conditions, partition_rows=EXPORT_PARTITION_ROWS):
+    """Parquet as bytes chunks, one row group per partition."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("LogID", pa.int64()),
+        ("CreatedAt", pa.timestamp("ms")),
+        ("UserID", pa.int32()),
+        ("Username", pa.string()),
+        ("AircraftTypeID", pa.int32()),
+        ("AircraftName", pa.string()),
+        ("Confidence", pa.float64()),
+        ("ProcessingTimeMs", pa.int32()),
+        ("SourceType", pa.string()),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for partition in iter_partitions(conditions, partition_rows):
+            columns = list(zip(*partition))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()  # footer; an export with no rows is still a valid (empty) file
+
+
+def iter_export(fmt, conditions, partition_rows=EXPORT_PARTITION_ROWS):
+    check_format(fmt)
+    return iter_csv(conditions, partition_rows) if fmt == "csv" else iter_parquet(conditions, partition_rows)
@@ -1,5 +1,37 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import psutil
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
 from db import SessionLocal
 from models.recognition_logs import RecognitionLog
+from services.rollups import apply_rollups
+
+# Write-behind of Recognition_Logs: rows are flushed in one INSERT when
+# LOG_BATCH_SIZE are pending or LOG_FLUSH_SECONDS passed since the oldest one.
+LOG_BATCH_SIZE = int(os.environ.get("LOG_BATCH_SIZE", "200"))
+LOG_FLUSH_SECONDS = float(os.environ.get("LOG_FLUSH_SECONDS", "2"))
+# Rows kept while the database is unreachable; beyond that the oldest are dropped
+LOG_MAX_BACKLOG = int(os.environ.get("LOG_MAX_BACKLOG", "50000"))
+# memory  - rows live only in RAM until flushed (a crash loses < LOG_FLUSH_SECONDS)
+# journal - every row is also appended to LOG_JOURNAL_DIR first and replayed on
+#           startup if the process died before the flush (fsync per row with LOG_JOURNAL_FSYNC=1)
+# sync    - no queue: one INSERT + commit per row, as before
+LOG_DURABILITY = os.environ.get("LOG_DURABILITY", "memory")
+LOG_JOURNAL_DIR = os.environ.get("LOG_JOURNAL_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "log_journal"))
+LOG_JOURNAL_FSYNC = os.environ.get("LOG_JOURNAL_FSYNC", "0") == "1"
+
+DURABILITY_MODES = ("memory", "journal", "sync")
+
 
 def save_recognition_log(user_id, aircraft_type_id,
                          confidence, processing_ms, source_type):
@@ -13,8 +45,273 @@ def save_recognition_log(user_id, aircraft_type_id,
             SourceType=source_type
         )
         db.add(log)
+        db.flush()
+        apply_rollups(db, [{"UserID": user_id, "AircraftTypeID": aircraft_type_id, "Confidence": confidence,
+                            "ProcessingTimeMs": processing_ms, "SourceType": source_type,
+                            "CreatedAt": log.CreatedAt}])
         db.commit()
         db.refresh(log)
         return log.LogID
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def _insert_rows(rows):
+    db = SessionLocal()
+    try:
+        db.execute(insert(RecognitionLog), rows)
+        apply_rollups(db, rows)  # погодинні агрегати — в тій самій транзакції
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class LogWriter:
+    """
+    Черга записів Recognition_Logs з відкладеним записом: запит лише кладе
+    рядок у пам'ять, фоновий потік вставляє накопичене одним executemany
+    (за розміром або за часом). Якщо БД недоступна, рядки лишаються в черзі
+    до наступної спроби; рядок, який БД відхиляє (IntegrityError), відкидається
+    (лічильник rejected), а не блокує чергу. Режим journal дописує кожен рядок у файл і після
+    падіння процесу довантажує його при старті (at-least-once).
+    """
+
+    def __init__(self, batch_size=LOG_BATCH_SIZE, flush_seconds=LOG_FLUSH_SECONDS, max_backlog=LOG_MAX_BACKLOG,
+                 durability=LOG_DURABILITY, journal_dir=LOG_JOURNAL_DIR, fsync=LOG_JOURNAL_FSYNC):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"LOG_DURABILITY must be one of {', '.join(DURABILITY_MODES)}")
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.max_backlog = max(self.batch_size, max_backlog)
+        self.durability = durability
+        self.journal_dir = journal_dir
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time (thread, close(), flush())
+        self._wake = threading.Event()
+        self._pending = deque()
+        self._thread = None
+        self._closed = False
+        self._journal = None
+        self._journal_seq = 0
+        self._segments = []  # rotated journal files whose rows are not committed yet
+        self._counters = {"queued": 0, "written": 0, "batches": 0, "failed_flushes": 0, "dropped": 0,
+                          "rejected": 0, "replayed": 0}
+        self._last_flush = {"at": None, "rows": 0, "ms": 0.0, "error": None}
+
+        if durability == "journal":
+            os.makedirs(journal_dir, exist_ok=True)
+            self._replay()
+
+    # ---------------- journal ----------------
+    def _journal_path(self):
+        self._journal_seq += 1
+        return os.path.join(self.journal_dir, f"{os.getpid()}-{int(time.time() * 1000)}-{self._journal_seq}.jsonl")
+
+    def _replay(self):
+        """Rows of journals a previous process left behind go to the front of the queue."""
+        for path in sorted(glob.glob(os.path.join(self.journal_dir, "*.jsonl"))):
+            pid = os.path.basename(path).split("-", 1)[0]
+            if pid.isdigit() and int(pid) != os.getpid() and psutil.pid_exists(int(pid)):
+                continue  # journal of another live worker
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line of a crashed write
+                    row["CreatedAt"] = datetime.fromisoformat(row["CreatedAt"])
+                    self._pending.append(row)
+                    self._counters["replayed"] += 1
+            self._segments.append(path)
+        if self._counters["replayed"]:
+            logging.info(f"Replaying {self._counters['replayed']} recognition logs from {self.journal_dir}")
+            self._ensure_thread()
+
+    def _journal_write(self, row):
+        if self._journal is None:
+            self._journal = open(self._journal_path(), "a", encoding="utf-8")
+        self._journal.write(json.dumps(dict(row, CreatedAt=row["CreatedAt"].isoformat())) + "\n")
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+    def _rotate_journal(self):
+        """Current journal becomes a segment of the batch being flushed; new rows start a new file."""
+        if self._journal is not None:
+            self._segments.append(self._journal.name)
+            self._journal.close()
+            self._journal = None
+
+    # ---------------- queue ----------------
+    def enqueue(self, user_id, aircraft_type_id, confidence, processing_ms, source_type):
+        """Queue one log row; the row is in the table within flush_seconds (immediately in sync mode)."""
+        row = {
+            "UserID": int(user_id),
+            "AircraftTypeID": aircraft_type_id,
+            "Confidence": confidence,
+            "ProcessingTimeMs": int(processing_ms),
+            "SourceType": source_type,
+            "CreatedAt": datetime.now(),  # time of recognition, not of the flush
+        }
+        if self.durability == "sync" or self._closed:
+            _insert_rows([row])
+            with self._lock:
+                self._counters["queued"] += 1
+                self._counters["written"] += 1
+            return
+
+        with self._lock:
+            if self.durability == "journal":
+                self._journal_write(row)
+            self._pending.append(row)
+            self._counters["queued"] += 1
+            while len(self._pending) > self.max_backlog:
+                self._pending.popleft()
+                self._counters["dropped"] += 1
+            full = len(self._pending) >= self.batch_size
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass  # logged in flush(); rows stay queued for the next round
+
+    def flush(self):
+        """Write everything queued so far in batches of batch_size; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                rows = list(self._pending)
+                self._pending.clear()
+                self._rotate_journal()
+                segments, self._segments = self._segments, []
+            if not rows:
+                self._remove_segments(segments)
+                return 0
+
+            started = time.perf_counter()
+            done = written = rejected = batches = 0  # done: rows written or rejected so far
+            try:
+                for i in range(0, len(rows), self.batch_size):
+                    batch = rows[i:i + self.batch_size]
+                    try:
+                        _insert_rows(batch)
+                        written += len(batch)
+                        batches += 1
+                        done += len(batch)
+                        continue
+                    except IntegrityError:
+                        logging.warning("Recognition log batch rejected, retrying it row by row")
+                    # рядок, який БД ніколи не прийме (напр. неіснуючий UserID), не повинен
+                    # тримати чергу: такі відкидаються, решта пачки пишеться поштучно
+                    for row in batch:
+                        try:
+                            _insert_rows([row])
+                            written += 1
+                        except IntegrityError as e:
+                            rejected += 1
+                            logging.error(f"Dropping recognition log {row}: {e.orig}")
+                        done += 1
+            except Exception as e:
+                logging.exception("Writing recognition logs failed, keeping them queued:")
+                with self._lock:
+                    self._pending.extendleft(reversed(rows[done:]))
+                    self._segments = segments + self._segments
+                    self._counters["failed_flushes"] += 1
+                    self._counters["written"] += written
+                    self._counters["batches"] += batches
+                    self._counters["rejected"] += rejected
+                    self._last_flush.update(at=time.time(), rows=written, error=str(e),
+                                            ms=round((time.perf_counter() - started) * 1000, 2))
+                raise
+
+            self._remove_segments(segments)
+            with self._lock:
+                self._counters["written"] += written
+                self._counters["batches"] += batches
+                self._counters["rejected"] += rejected
+                self._last_flush.update(at=time.time(), rows=written, error=None,
+                                        ms=round((time.perf_counter() - started) * 1000, 2))
+            return written
+
+    def _remove_segments(self, segments):
+        for path in segments:
+            try:
+                os.remove(path)
+            except OSError:
+                logging.exception(f"Could not remove log journal {path}:")
+
+    def close(self):
+        """Flush on shutdown; later rows are written synchronously."""
+        self._closed = True
+        self._wake.set()
+        try:
+            self.flush()
+        except Exception:
+            logging.error(f"{len(self._pending)} recognition logs were not written on shutdown")
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            oldest = self._pending[0]["CreatedAt"] if self._pending else None
+            return dict(
+                self._counters,
+                durability=self.durability,
+                batch_size=self.batch_size,
+                flush_seconds=self.flush_seconds,
+                max_backlog=self.max_backlog,
+                backlog=len(self._pending),
+                oldest_pending_age_s=round((datetime.now() - oldest).total_seconds(), 3) if oldest else 0,
+                last_flush=dict(self._last_flush),
+            )
+
+
+log_writer = LogWriter()
+atexit.register(log_writer.close)
+
+
+def check_log_refs(user_id, aircraft_type_id):
+    """
+    ValueError for a UserID or AircraftTypeID that does not exist. Both come
+    from the caches, so a queued row costs no query; while the database is
+    unreachable the row is let through (flush() drops it if it is rejected).
+    """
+    from services.reference_cache import reference_cache
+    from services.users_service import user_cache
+
+    try:
+        aircraft = reference_cache.aircraft_type(int(aircraft_type_id))
+        user = user_cache.get(int(user_id))
+    except SQLAlchemyError:
+        return
+    if aircraft is None:
+        raise ValueError(f"Unknown AircraftTypeID: {aircraft_type_id}")
+    if user is None:
+        raise ValueError(f"Unknown UserID: {user_id}")
+
+
+def queue_recognition_log(user_id, aircraft_type_id, confidence, processing_ms, source_type):
+    """save_recognition_log without the round trip: the row goes through the write-behind queue."""
+    check_log_refs(user_id, aircraft_type_id)
+    log_writer.enqueue(user_id, aircraft_type_id, confidence, processing_ms, source_type)
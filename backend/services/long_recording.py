@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+
+from utils.audio_io import iter_audio_blocks, iter_windows
+from utils.audio_processing import extract_features_batch
+
+
+# Межі вікна/кроку: вікно не коротше за кадр STFT (n_fft = 2048 семплів при
+# 22050 Гц), крок не дрібніший за MIN_HOP, вікно не довше за MAX_WINDOW
+LONG_MIN_WINDOW_SECONDS = 0.1
+LONG_MIN_HOP_SECONDS = float(os.environ.get("LONG_MIN_HOP_SECONDS", "0.1"))
+LONG_MAX_WINDOW_SECONDS = float(os.environ.get("LONG_MAX_WINDOW_SECONDS", "60"))
+
+
+def check_window(window_seconds, hop_seconds, sr=22050, n_fft=2048):
+    """(window, hop) у семплах; ValueError, якщо параметри поза межами."""
+    if not LONG_MIN_WINDOW_SECONDS <= window_seconds <= LONG_MAX_WINDOW_SECONDS:
+        raise ValueError(f"window має бути від {LONG_MIN_WINDOW_SECONDS} до {LONG_MAX_WINDOW_SECONDS} с")
+    if not LONG_MIN_HOP_SECONDS <= hop_seconds <= window_seconds:
+        raise ValueError(f"hop має бути від {LONG_MIN_HOP_SECONDS} с до window")
+    window = int(window_seconds * sr)
+    hop = int(hop_seconds * sr)
+    if window < n_fft or hop < 1:
+        raise ValueError(f"window має містити щонайменше {n_fft} семплів")
+    return window, hop
+
+
+def analyze_long_recording(stream, predict, labels, sr=22050, n_mfcc=40,
+                           window_seconds=5.0, hop_seconds=2.5, batch_windows=32):
+    """
+    Класифікує довгий запис ковзним вікном з обмеженою пам'яттю.
+
+    Файл декодується блоками, ознаки рахуються для кожного перекритого
+    вікна, вікна йдуть у модель пачками по batch_windows. У пам'яті
+    одночасно — лише поточний блок, буфер вікна та одна пачка.
+    Повертає таймлайн по вікнах і загальний вердикт (середні ймовірності).
+    """
+    window, hop = check_window(window_seconds, hop_seconds, sr=sr)
+
+    timeline = []
+    prob_sum = None
+    label_counts = dict.fromkeys(labels, 0)
+    total_samples = 0
+
+    def flush(starts, clips):
+        nonlocal prob_sum
+        preds = np.asarray(predict(extract_features_batch(clips, sr=sr, n_mfcc=n_mfcc)))
+        prob_sum = preds.sum(axis=0) if prob_sum is None else prob_sum + preds.sum(axis=0)
+        for start, clip, p in zip(starts, clips, preds):
+            idx = int(np.argmax(p))
+            label_counts[labels[idx]] += 1
+            timeline.append({
+                "start": round(start / sr, 2),
+                "end": round((start + len(clip)) / sr, 2),
+                "result": labels[idx],
+                "confidence": round(float(p[idx]) * 100, 2),
+            })
+
+    starts, clips = [], []
+    for start, clip in iter_windows(iter_audio_blocks(stream, sr=sr), window, hop):
+        starts.append(start)
+        clips.append(clip)
+        total_samples = start + len(clip)
+        if len(clips) >= batch_windows:
+            flush(starts, clips)
+            starts, clips = [], []
+    if clips:
+        flush(starts, clips)
+
+    if not timeline:
+        return None
+
+    mean_probs = prob_sum / len(timeline)
+    idx = int(np.argmax(mean_probs))
+    return {
+        "result": labels[idx],
+        "confidence": round(float(mean_probs[idx]) * 100, 2),
+        "duration_seconds": round(total_samples / sr, 2),
+        "windows": len(timeline),
+        "window_seconds": window_seconds,
+        "hop_seconds": hop_seconds,
+        "label_counts": label_counts,
+        "timeline": timeline,
+    }
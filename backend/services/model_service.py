@@ -0,0 +1,332 @@
+import gc
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import psutil
+
+from services.batching import BatchScheduler, SchedulerClosedError
+from services.inference_backends import load_backend, tflite_path
+from services.reference_cache import reference_cache
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+# ----- MODEL PATHS -----
+# Per model key (ModelID in the Models table): weights file, micro-batching
+# settings (max_batch_size rows per forward pass, max_wait_ms to fill a batch,
+# max_queue_size waiting requests before /analyze answers 503), the
+# model's weight in the "weighted" ensemble fusion and the inference backend
+# ("keras", or "tflite_f16" / "tflite_int8" after python -m tools.convert_tflite).
+MODEL_FILES = {
+    "4": {"file": "model.h5", "max_batch_size": 16, "max_wait_ms": 10, "max_queue_size": 256, "weight": 1.0, "backend": "keras"},
+    "6": {"file": "yamnet.h5", "max_batch_size": 16, "max_wait_ms": 10, "max_queue_size": 256, "weight": 1.0, "backend": "keras"},
+    "5": {"file": "crnn.h5", "max_batch_size": 8, "max_wait_ms": 15, "max_queue_size": 128, "weight": 1.0, "backend": "keras"},
+}
+
+
+def model_backend(model_key):
+    """Backend for a model: MODEL_BACKEND_<key> env var overrides MODEL_FILES."""
+    return os.environ.get(f"MODEL_BACKEND_{model_key}") or MODEL_FILES[model_key].get("backend", "keras")
+
+
+def model_fingerprint(model_key):
+    """
+    Backend plus identity (mtime, size) of the weights file it loads. Part of
+    the cached prediction keys, so switching the backend or replacing the
+    weights never serves predictions of the previous model (spilled ones included).
+    """
+    backend = model_backend(model_key)
+    path = os.path.join(MODEL_DIR, MODEL_FILES[model_key]["file"])
+    if backend != "keras":
+        path = tflite_path(path, backend.split("_", 1)[1])
+    try:
+        st = os.stat(path)
+    except OSError:
+        return backend
+    return f"{backend}:{st.st_mtime_ns}:{st.st_size}"
+
+# ================== CLASS LABELS ==========================
+CLASS_LABELS = ["drone", "airplane", "helicopter"]
+
+# RAM the resident models may take together (0 = no limit)
+MODEL_MEMORY_BUDGET_MB = float(os.environ.get("MODEL_MEMORY_BUDGET_MB", "1024"))
+
+loaded_models = OrderedDict()  # model_key -> backend, least recently used first
+schedulers = {}                # model_key -> BatchScheduler
+
+# model_key -> {"state": not_loaded|loading|warming|ready|failed|unloaded, ...}
+model_states = {key: {"state": "not_loaded"} for key in MODEL_FILES}
+# model_key -> loads / unloads / evictions / memory_bytes / last_used
+model_usage = {key: {"loads": 0, "unloads": 0, "evictions": 0, "memory_bytes": 0, "last_used": None}
+               for key in MODEL_FILES}
+preload_keys = set()  # models the readiness check waits for
+preload_started = threading.Event()
+
+_locks = {key: threading.Lock() for key in MODEL_FILES}
+_registry_lock = threading.Lock()  # loaded_models / schedulers / model_usage
+_measure_lock = threading.Lock()   # one load at a time, so RSS growth is attributable
+
+_process = psutil.Process(os.getpid())
+
+
+def _set_state(model_key, state, **extra):
+    info = dict(model_states.get(model_key, {}))
+    info.update(extra, state=state)
+    model_states[model_key] = info
+
+
+def _warmup(model_key, model):
+    """Run dummy batches so graph tracing happens before the first real request."""
+    shape = [d if d is not None else 1 for d in model.input_shape[1:]]
+    for batch_size in sorted({1, MODEL_FILES[model_key].get("max_batch_size", 16)}):
+        model.predict(np.zeros([batch_size] + shape, dtype=np.float32))
+
+
+# ================== ACTIVE MODELS (Models table) ==========
+def get_active_model_keys():
+    """Model keys that are active in the Models table and have weights configured (from the reference cache)."""
+    return [str(model_id) for model_id in reference_cache.models(active_only=True) if str(model_id) in MODEL_FILES]
+
+
+def invalidate_active_models():
+    reference_cache.invalidate("models")
+
+
+def _check_servable(model_key):
+    if model_key not in MODEL_FILES:
+        raise ValueError(f"Unknown model key: {model_key}")
+    try:
+        active = get_active_model_keys()
+    except Exception as e:
+        # the database being down should not take inference down with it;
+        # serve everything configured (the cache retries the table itself)
+        logging.warning(f"Could not read active models, serving all MODEL_FILES: {e}")
+        return
+    if model_key not in active:
+        raise ValueError(f"Model '{model_key}' is not active")
+
+
+# ================== MODEL LOADING =========================
+def _load(model_key):
+    """Load + warm up under the per-key lock; returns the backend."""
+    model_path = os.path.join(MODEL_DIR, MODEL_FILES[model_key]["file"])
+    if not os.path.exists(model_path):
+        _set_state(model_key, "failed", error=f"Model file not found: {model_path}")
+        raise FileNotFoundError(f"Model file not found: {model_path}")
+
+    backend = model_backend(model_key)
+    with _measure_lock:
+        try:
+            logging.info(f"Loading model: {model_path} ({backend})")
+            _set_state(model_key, "loading", error=None, backend=backend)
+            rss_before = _process.memory_info().rss
+            started = time.perf_counter()
+            model = load_backend(model_path, backend)
+            load_ms = (time.perf_counter() - started) * 1000
+
+            _set_state(model_key, "warming", load_ms=round(load_ms, 1))
+            started = time.perf_counter()
+            _warmup(model_key, model)
+            warmup_ms = (time.perf_counter() - started) * 1000
+            rss_growth = _process.memory_info().rss - rss_before
+        except Exception as e:
+            _set_state(model_key, "failed", error=str(e))
+            raise
+
+    # the first model also pays for runtime imports; never report less than the weights
+    memory_bytes = max(rss_growth, model.memory_bytes())
+    with _registry_lock:
+        usage = model_usage[model_key]
+        usage["loads"] += 1
+        usage["memory_bytes"] = memory_bytes
+        usage["last_used"] = time.time()
+        loaded_models[model_key] = model
+    _set_state(model_key, "ready", warmup_ms=round(warmup_ms, 1), ready_at=time.time())
+    logging.info(f"Model '{model_key}' loaded in {load_ms:.0f} ms, warmed up in {warmup_ms:.0f} ms, "
+                 f"~{memory_bytes / 2 ** 20:.1f} MB.")
+    return model
+
+
+def get_model(model_key: str):
+    """Load the model's inference backend (once, under a per-key lock), warm it up and cache it."""
+    _check_servable(model_key)
+
+    model = loaded_models.get(model_key)
+    if model is not None:
+        return model
+
+    with _locks[model_key]:
+        # another thread may have finished loading while we waited
+        model = loaded_models.get(model_key)
+        if model is None:
+            model = _load(model_key)
+
+    _enforce_budget(keep=model_key)
+    return model
+
+
+def get_scheduler(model_key: str) -> BatchScheduler:
+    """Batching scheduler for the model; requests should predict through it."""
+    scheduler = schedulers.get(model_key)
+    if scheduler is not None and model_key in loaded_models:
+        _check_servable(model_key)
+        _touch(model_key)
+        return scheduler
+
+    model = get_model(model_key)
+    with _locks[model_key]:
+        with _registry_lock:
+            if model_key not in schedulers and model_key in loaded_models:
+                cfg = MODEL_FILES[model_key]
+                schedulers[model_key] = BatchScheduler(
+                    model_key,
+                    model.predict,
+                    max_batch_size=cfg.get("max_batch_size", 16),
+                    max_wait_ms=cfg.get("max_wait_ms", 10),
+                    max_queue_size=cfg.get("max_queue_size", 256),
+                )
+            scheduler = schedulers.get(model_key)
+    if scheduler is None:
+        # evicted between loading and here by a concurrent load; load again
+        return get_scheduler(model_key)
+    _touch(model_key)
+    return scheduler
+
+
+def predict(model_key, features):
+    """
+    Predict through the model's scheduler, resolving it on every call — for
+    long-lived callers (streams, long recordings) that must survive the model
+    being evicted and loaded again in between.
+    """
+    try:
+        return get_scheduler(model_key).predict(features)
+    except SchedulerClosedError:
+        return get_scheduler(model_key).predict(features)
+
+
+# ================== EVICTION ==============================
+def _touch(model_key):
+    with _registry_lock:
+        if model_key in loaded_models:
+            loaded_models.move_to_end(model_key)
+            model_usage[model_key]["last_used"] = time.time()
+
+
+def _resident_bytes():
+    return sum(model_usage[key]["memory_bytes"] for key in loaded_models)
+
+
+def _pop_model(model_key):
+    """Drop a model from the registry; returns its scheduler (caller stops it outside the lock)."""
+    loaded_models.pop(model_key, None)
+    return schedulers.pop(model_key, None)
+
+
+def _stop(scheduler):
+    if scheduler is not None:
+        # queued requests are still answered by the old model
+        scheduler.stop(wait=False)
+    gc.collect()
+
+
+def _enforce_budget(keep=None):
+    """Evict least recently used models until the resident ones fit MODEL_MEMORY_BUDGET_MB."""
+    budget = MODEL_MEMORY_BUDGET_MB * 2 ** 20
+    if budget <= 0:
+        return
+
+    evicted = []
+    with _registry_lock:
+        for key in list(loaded_models):
+            if _resident_bytes() <= budget:
+                break
+            if key == keep:
+                continue
+            evicted.append((key, _pop_model(key)))
+            model_usage[key]["evictions"] += 1
+
+    for key, scheduler in evicted:
+        _set_state(key, "unloaded", reason="evicted")
+        logging.info(f"Model '{key}' evicted to stay within {MODEL_MEMORY_BUDGET_MB:.0f} MB.")
+        _stop(scheduler)
+
+
+def unload_model(model_key):
+    """Unload a model right away (e.g. it was deactivated); True if it was resident."""
+    with _registry_lock:
+        resident = model_key in loaded_models
+        scheduler = _pop_model(model_key)
+        if resident:
+            model_usage[model_key]["unloads"] += 1
+    preload_keys.discard(model_key)
+
+    if resident:
+        _set_state(model_key, "unloaded", reason="deactivated")
+        logging.info(f"Model '{model_key}' unloaded.")
+    _stop(scheduler)
+    return resident
+
+
+def registry_stats() -> dict:
+    """Per-model residency, load counts and memory for /api/system/stats."""
+    with _registry_lock:
+        resident = list(loaded_models)
+        usage = {key: dict(info) for key, info in model_usage.items()}
+        resident_bytes = _resident_bytes()
+
+    models = {}
+    for key, info in usage.items():
+        state = model_states.get(key, {})
+        models[key] = {
+            "state": state.get("state"),
+            "backend": state.get("backend") or model_backend(key),
+            "resident": key in resident,
+            "loads": info["loads"],
+            "unloads": info["unloads"],
+            "evictions": info["evictions"],
+            "memory_mb": round(info["memory_bytes"] / 2 ** 20, 1) if key in resident else 0,
+            "last_used": info["last_used"],
+        }
+    return {
+        "budget_mb": MODEL_MEMORY_BUDGET_MB,
+        "resident_mb": round(resident_bytes / 2 ** 20, 1),
+        "resident": resident,  # least recently used first
+        "models": models,
+    }
+
+
+# ================== PRELOAD / READINESS ====================
+def _preload(keys):
+    for key in keys:
+        try:
+            get_scheduler(key)
+        except Exception:
+            logging.exception(f"Preloading model '{key}' failed:")
+
+
+def start_preload(keys=None):
+    """Load and warm up the given (default: all active) models in a background thread."""
+    if keys is None:
+        try:
+            keys = get_active_model_keys()
+        except Exception:
+            logging.exception("Could not read active models, preloading all MODEL_FILES:")
+            keys = list(MODEL_FILES)
+
+    preload_keys.update(keys)
+    preload_started.set()
+    thread = threading.Thread(target=_preload, args=(list(keys),), name="model-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def readiness():
+    """(is_ready, per-model state) — ready once every preloaded model has been warmed up."""
+    states = {key: dict(info) for key, info in model_states.items()}
+    # a model evicted later was ready once and loads again on demand
+    ready = preload_started.is_set() and all(states[k].get("ready_at") for k in preload_keys)
+    return ready, states
@@ -0,0 +1,160 @@
+import logging
+import os
+import threading
+import time
+
+# How long a loaded reference table is trusted. Writes through this process
+# invalidate it at once; the TTL bounds how stale other worker processes get.
+REFERENCE_CACHE_TTL = float(os.environ.get("REFERENCE_CACHE_TTL", "60"))
+# After a failed load the table is not retried for this long (DB down)
+REFERENCE_RETRY_SECONDS = float(os.environ.get("REFERENCE_RETRY_SECONDS", "5"))
+
+TABLES = ("aircraft_types", "models", "settings")
+
+
+def _load_aircraft_types(session):
+    from models.aircraft_types import AircraftType
+
+    return {
+        row.AircraftTypeID: {"name": row.AircraftName, "description": row.Description}
+        for row in session.query(AircraftType).all()
+    }
+
+
+def _load_models(session):
+    from models.models import Model
+
+    return {
+        row.ModelID: {"name": row.ModelName, "description": row.Description, "is_active": row.IsActive == 1}
+        for row in session.query(Model).all()
+    }
+
+
+def _load_settings(session):
+    from models.settings import SystemSettings
+
+    return {row.SettingKey: row.SettingValue for row in session.query(SystemSettings).all()}
+
+
+_LOADERS = {"aircraft_types": _load_aircraft_types, "models": _load_models, "settings": _load_settings}
+
+
+class ReferenceCache:
+    """
+    Невеликі довідкові таблиці (AircraftTypes, Models, System_Settings) у
+    пам'яті процесу: гарячі запити не ходять у БД. Таблиця перечитується
+    повністю — після invalidate() (запис через API) або коли минув ttl.
+    Якщо БД недоступна, віддається остання завантажена копія.
+    """
+
+    def __init__(self, ttl=REFERENCE_CACHE_TTL, retry_seconds=REFERENCE_RETRY_SECONDS):
+        self.ttl = ttl
+        self.retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self._load_locks = {table: threading.Lock() for table in TABLES}
+        self._data = {}        # table -> dict
+        self._expires = {}     # table -> monotonic deadline
+        self._errors = {}      # table -> last load exception
+        self._counters = {table: {"hits": 0, "misses": 0, "loads": 0, "load_errors": 0, "invalidations": 0}
+                          for table in TABLES}
+        self._loaded_at = {}   # table -> wall time of the last successful load
+
+    def _query(self, table):
+        from db import SessionLocal
+
+        session = SessionLocal()
+        try:
+            return _LOADERS[table](session)
+        finally:
+            session.close()
+
+    def table(self, table) -> dict:
+        """Whole table as a dict; loads it on first use or after expiry/invalidation."""
+        now = time.monotonic()
+        with self._lock:
+            if table in self._data and now < self._expires.get(table, 0):
+                self._counters[table]["hits"] += 1
+                return self._data[table]
+            self._counters[table]["misses"] += 1
+
+        # one loader per table; concurrent callers wait for it instead of all querying
+        with self._load_locks[table]:
+            with self._lock:
+                if table in self._data and time.monotonic() < self._expires.get(table, 0):
+                    return self._data[table]
+                if table in self._errors and time.monotonic() < self._expires.get(table, 0):
+                    raise self._errors[table]
+            try:
+                data = self._query(table)
+            except Exception as e:
+                with self._lock:
+                    self._counters[table]["load_errors"] += 1
+                    self._expires[table] = time.monotonic() + self.retry_seconds
+                    if table not in self._data:
+                        self._errors[table] = e
+                        raise
+                logging.exception(f"Could not reload {table}, keeping the previous copy:")
+                return self._data[table]
+            with self._lock:
+                self._data[table] = data
+                self._expires[table] = time.monotonic() + self.ttl
+                self._errors.pop(table, None)
+                self._loaded_at[table] = time.time()
+                self._counters[table]["loads"] += 1
+            return data
+
+    def invalidate(self, table=None):
+        """Drop one table (or all) so the next lookup reads it again."""
+        with self._lock:
+            for name in ([table] if table else TABLES):
+                self._expires[name] = 0.0
+                self._errors.pop(name, None)
+                self._counters[name]["invalidations"] += 1
+
+    def load(self):
+        """Warm every table at startup; failures are logged, lookups retry later."""
+        for table in TABLES:
+            try:
+                self.table(table)
+            except Exception as e:
+                logging.warning(f"Reference table {table} not loaded at startup: {e}")
+
+    # ---------------- lookups ----------------
+    def aircraft_type_id(self, name):
+        """AircraftTypeID for a class label ("drone"), or None."""
+        name = name.lower()
+        for type_id, row in self.table("aircraft_types").items():
+            if row["name"].lower() == name:
+                return type_id
+        return None
+
+    def aircraft_type(self, type_id):
+        return self.table("aircraft_types").get(type_id)
+
+    def models(self, active_only=False) -> dict:
+        models = self.table("models")
+        if active_only:
+            return {model_id: m for model_id, m in models.items() if m["is_active"]}
+        return models
+
+    def setting(self, key, default=None):
+        return self.table("settings").get(key, default)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            tables = {}
+            for table in TABLES:
+                counters = self._counters[table]
+                lookups = counters["hits"] + counters["misses"]
+                tables[table] = dict(
+                    counters,
+                    rows=len(self._data.get(table, {})),
+                    hit_rate=round(counters["hits"] / lookups, 4) if lookups else 0.0,
+                    loaded_at=self._loaded_at.get(table),
+                    expires_in_s=round(max(0.0, self._expires.get(table, 0) - now), 1),
+                )
+            return {"ttl_seconds": self.ttl, "tables": tables}
+
+
+reference_cache = ReferenceCache()
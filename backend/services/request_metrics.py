@@ -0,0 +1,294 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+import psutil
+
+# Histogram upper bounds in seconds (Prometheus convention); +Inf is implicit
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SLOT_SECONDS = 10       # sliding windows are built from slots of this length
+MAX_WINDOW_SECONDS = 900
+WINDOWS = (60, 300, 900)
+
+# Directory shared by all worker processes of one deployment; every process
+# writes its snapshot there and readers sum them. Unset = this process only.
+METRICS_DIR = os.environ.get("METRICS_DIR") or None
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+
+
+def _empty():
+    return {"buckets": [0] * (len(BUCKETS) + 1), "sum": 0.0, "count": 0}
+
+
+def _merge(into, other):
+    for i, n in enumerate(other["buckets"]):
+        into["buckets"][i] += n
+    into["sum"] += other["sum"]
+    into["count"] += other["count"]
+
+
+def _quantile(hist, q):
+    """Quantile estimated from the histogram by linear interpolation inside the bucket (seconds)."""
+    if not hist["count"]:
+        return 0.0
+    rank = q * hist["count"]
+    seen = 0
+    for i, n in enumerate(hist["buckets"]):
+        if seen + n >= rank and n:
+            lower = BUCKETS[i - 1] if i > 0 else 0.0
+            upper = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+            return lower + (upper - lower) * (rank - seen) / n
+        seen += n
+    return BUCKETS[-1]
+
+
+class RequestMetrics:
+    """
+    Latency histograms per (route, method, status): lifetime totals for
+    Prometheus counters plus per-SLOT_SECONDS slots for sliding windows. Slots
+    are keyed by absolute time, so snapshots of several processes add up
+    slot by slot.
+    """
+
+    def __init__(self, metrics_dir=METRICS_DIR, flush_seconds=METRICS_FLUSH_SECONDS):
+        self.metrics_dir = metrics_dir
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._totals = {}  # key -> histogram
+        self._slots = {}   # key -> {slot: histogram}
+        self._counters = {"bytes_in": 0, "bytes_out": 0}
+        self._in_flight = 0
+        self._started_at = time.time()
+        self._flusher = None
+        if metrics_dir:
+            os.makedirs(metrics_dir, exist_ok=True)
+
+    # ---------------- recording ----------------
+    def start_request(self, bytes_in=0):
+        with self._lock:
+            self._in_flight += 1
+            self._counters["bytes_in"] += bytes_in or 0
+
+    def observe(self, route, method, status, seconds, bytes_out=0):
+        key = (route, method, str(status))
+        bucket = next((i for i, upper in enumerate(BUCKETS) if seconds <= upper), len(BUCKETS))
+        slot = int(time.time() // SLOT_SECONDS)
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._counters["bytes_out"] += bytes_out or 0
+            slots = self._slots.setdefault(key, {})
+            for hist in (self._totals.setdefault(key, _empty()), slots.setdefault(slot, _empty())):
+                hist["buckets"][bucket] += 1
+                hist["sum"] += seconds
+                hist["count"] += 1
+            oldest = slot - MAX_WINDOW_SECONDS // SLOT_SECONDS
+            for old in [s for s in slots if s < oldest]:
+                del slots[old]
+        self._ensure_flusher()
+
+    # ---------------- snapshots ----------------
+    def _local_snapshot(self):
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "written_at": time.time(),
+                "started_at": self._started_at,
+                "in_flight": self._in_flight,
+                "counters": dict(self._counters),
+                "series": [
+                    {"key": list(key), "total": total,
+                     "slots": {str(s): h for s, h in self._slots.get(key, {}).items()}}
+                    for key, total in self._totals.items()
+                ],
+            }
+
+    def _ensure_flusher(self):
+        if not self.metrics_dir or self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush()
+            except OSError:
+                logging.exception("Writing request metrics failed:")
+
+    def flush(self):
+        """Write this process's snapshot for the other workers to read; absorb those of dead workers."""
+        self._absorb_dead()
+        path = os.path.join(self.metrics_dir, f"{os.getpid()}.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(self._local_snapshot(), f)
+        os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def _alive(snap):
+        """The process that wrote snap still runs (and its PID was not reused by a newer process)."""
+        try:
+            return psutil.Process(snap["pid"]).create_time() <= snap["started_at"] + 1
+        except (psutil.NoSuchProcess, psutil.AccessDenied, KeyError):
+            return False
+
+    def _absorb_dead(self):
+        """
+        Snapshots of exited workers are merged into this process's own series
+        and their files removed, so the directory holds one file per live
+        worker while the lifetime totals (Prometheus counters) never go back.
+        The rename claims a file: only one worker absorbs it.
+        """
+        for path in glob.glob(os.path.join(self.metrics_dir, "*.json")):
+            if os.path.basename(path) == f"{os.getpid()}.json":
+                continue
+            try:
+                with open(path) as f:
+                    snap = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if self._alive(snap):
+                continue
+            claimed = f"{path}.absorb-{os.getpid()}"
+            try:
+                os.replace(path, claimed)
+            except OSError:
+                continue  # another worker got it first
+            try:
+                with open(claimed) as f:
+                    snap = json.load(f)  # re-read: it may have been rewritten before the claim
+                self._merge_snapshot(snap)
+            except (OSError, ValueError):
+                logging.exception(f"Absorbing request metrics of PID {snap.get('pid')} failed:")
+            finally:
+                try:
+                    os.remove(claimed)
+                except OSError:
+                    pass
+
+    def _merge_snapshot(self, snap):
+        oldest = int(time.time() // SLOT_SECONDS) - MAX_WINDOW_SECONDS // SLOT_SECONDS
+        with self._lock:
+            for name, value in snap["counters"].items():
+                self._counters[name] = self._counters.get(name, 0) + value
+            for series in snap["series"]:
+                key = tuple(series["key"])
+                _merge(self._totals.setdefault(key, _empty()), series["total"])
+                slots = self._slots.setdefault(key, {})
+                for s, hist in series["slots"].items():
+                    if int(s) >= oldest:
+                        _merge(slots.setdefault(int(s), _empty()), hist)
+
+    def _snapshots(self):
+        """This process live plus every other process's last flushed snapshot."""
+        snapshots = [self._local_snapshot()]
+        if self.metrics_dir:
+            for path in glob.glob(os.path.join(self.metrics_dir, "*.json")):
+                if os.path.basename(path) == f"{os.getpid()}.json":
+                    continue
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue  # being replaced right now
+        return snapshots
+
+    def aggregate(self):
+        """(totals {key: hist}, slots {key: {slot: hist}}, counters, in_flight, processes) over all processes."""
+        totals, slots = {}, {}
+        counters = {"bytes_in": 0, "bytes_out": 0}
+        in_flight = 0
+        now = time.time()
+        snapshots = self._snapshots()
+        for snap in snapshots:
+            for name, value in snap["counters"].items():
+                counters[name] = counters.get(name, 0) + value
+            # a process that stopped flushing is gone; its totals stay, its in-flight does not
+            if now - snap["written_at"] < 3 * self.flush_seconds or snap["pid"] == os.getpid():
+                in_flight += snap["in_flight"]
+            for series in snap["series"]:
+                key = tuple(series["key"])
+                _merge(totals.setdefault(key, _empty()), series["total"])
+                key_slots = slots.setdefault(key, {})
+                for s, hist in series["slots"].items():
+                    _merge(key_slots.setdefault(int(s), _empty()), hist)
+        return totals, slots, counters, in_flight, len(snapshots)
+
+    def summary(self, windows=WINDOWS) -> dict:
+        """JSON for /api/system/stats: lifetime totals and per-route windows with percentiles."""
+        totals, slots, counters, in_flight, processes = self.aggregate()
+        current = int(time.time() // SLOT_SECONDS)
+
+        routes = []
+        for key in sorted(totals):
+            route, method, status = key
+            entry = {"route": route, "method": method, "status": status,
+                     "count": totals[key]["count"], "windows": {}}
+            for window in windows:
+                hist = _empty()
+                first = current - window // SLOT_SECONDS + 1
+                for s, h in slots.get(key, {}).items():
+                    if s >= first:
+                        _merge(hist, h)
+                entry["windows"][f"{window}s"] = {
+                    "count": hist["count"],
+                    "rps": round(hist["count"] / window, 3),
+                    "mean_ms": round(hist["sum"] / hist["count"] * 1000, 2) if hist["count"] else 0,
+                    "p50_ms": round(_quantile(hist, 0.50) * 1000, 2),
+                    "p95_ms": round(_quantile(hist, 0.95) * 1000, 2),
+                    "p99_ms": round(_quantile(hist, 0.99) * 1000, 2),
+                }
+            routes.append(entry)
+
+        count = sum(h["count"] for h in totals.values())
+        seconds = sum(h["sum"] for h in totals.values())
+        return {
+            "processes": processes,
+            "requests": count,
+            "in_flight": in_flight,
+            "avg_response_ms": round(seconds / count * 1000, 2) if count else 0,
+            "bytes_in": counters["bytes_in"],
+            "bytes_out": counters["bytes_out"],
+            "routes": routes,
+        }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format (0.0.4) of the aggregated metrics."""
+        totals, _, counters, in_flight, _ = self.aggregate()
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route, method and status.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (route, method, status), hist in sorted(totals.items()):
+            labels = f'route="{_escape(route)}",method="{method}",status="{status}"'
+            cumulative = 0
+            for upper, n in zip(BUCKETS + ("+Inf",), hist["buckets"]):
+                cumulative += n
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{upper}"}} {cumulative}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {hist['sum']:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {hist['count']}")
+
+        lines += [
+            "# HELP http_requests_in_flight Requests being handled right now.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {in_flight}",
+            "# HELP http_request_bytes_total Request body bytes received.",
+            "# TYPE http_request_bytes_total counter",
+            f"http_request_bytes_total {counters['bytes_in']}",
+            "# HELP http_response_bytes_total Response body bytes sent.",
+            "# TYPE http_response_bytes_total counter",
+            f"http_response_bytes_total {counters['bytes_out']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,155 @@
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+
+import psutil
+
+# How often the sampler wakes up and how much history it keeps for charts
+RESOURCE_SAMPLE_SECONDS = float(os.environ.get("RESOURCE_SAMPLE_SECONDS", "5"))
+RESOURCE_HISTORY_SECONDS = float(os.environ.get("RESOURCE_HISTORY_SECONDS", "900"))
+
+# Looked up once: on GPU-less nodes there is no nvidia-smi and nothing to spawn
+NVIDIA_SMI = shutil.which("nvidia-smi")
+
+
+def get_gpu_usage_by_pid(pid: int):
+    """Використання GPU конкретним процесом (GB). None, якщо GPU немає."""
+    if NVIDIA_SMI is None:
+        return None
+    try:
+        output = subprocess.check_output(
+            [NVIDIA_SMI, "--query-compute-apps=pid,used_memory", "--format=csv,noheader,nounits"],
+            encoding="utf-8", timeout=5
+        )
+        usage = 0
+        for line in output.strip().split("\n"):
+            if not line.strip():
+                continue
+            line_pid, mem = line.strip().split(",")
+            if int(line_pid) == pid:
+                usage += int(mem)  # MB
+        return round(usage / 1024, 3)  # GB
+    except Exception:
+        return None
+
+
+def get_gpu_total_usage():
+    """Загальне завантаження GPU у % та пам'яті (GB)"""
+    if NVIDIA_SMI is None:
+        return None
+    try:
+        output = subprocess.check_output(
+            [NVIDIA_SMI, "--query-gpu=utilization.gpu,memory.used,memory.total",
+             "--format=csv,noheader,nounits"],
+            encoding="utf-8", timeout=5
+        )
+        gpu_stats = []
+        for line in output.strip().split("\n"):
+            util, mem_used, mem_total = map(int, line.strip().split(","))
+            gpu_stats.append({
+                "util_percent": util,
+                "memory_used_gb": round(mem_used / 1024, 3),
+                "memory_total_gb": round(mem_total / 1024, 3)
+            })
+        return gpu_stats
+    except Exception:
+        return None
+
+
+class ResourceSampler:
+    """
+    Фоновий потік, що раз на interval секунд знімає CPU, RSS, мережу та GPU
+    (якщо є nvidia-smi) у кільцевий буфер. /api/system/stats віддає останній
+    знімок миттєво, історія — з того ж буфера без додаткових вимірів.
+    """
+
+    def __init__(self, interval=RESOURCE_SAMPLE_SECONDS, history_seconds=RESOURCE_HISTORY_SECONDS):
+        self.interval = interval
+        self.process = psutil.Process(os.getpid())
+        self._samples = deque(maxlen=max(1, int(history_seconds / interval)))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_net = None
+
+        # cpu_percent(None) compares with the previous call; prime both counters
+        self.process.cpu_percent(None)
+        psutil.cpu_percent(None)
+        self._cpu_at = time.monotonic()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                sample = self.sample()
+                with self._lock:
+                    self._samples.append(sample)
+            except Exception:
+                logging.exception("Resource sampling failed:")
+            time.sleep(self.interval)
+
+    def sample(self) -> dict:
+        mem = self.process.memory_info()
+        vm = psutil.virtual_memory()
+
+        # the sampler thread and latest() both get here: the deltas against the
+        # previous reading are a read-modify-write of _last_net / _cpu_at
+        with self._lock:
+            now = time.time()
+            net = psutil.net_io_counters()
+            sent_rate = recv_rate = None
+            if self._last_net is not None:
+                last_time, last = self._last_net
+                elapsed = max(now - last_time, 1e-6)
+                sent_rate = round((net.bytes_sent - last.bytes_sent) / elapsed, 1)
+                recv_rate = round((net.bytes_recv - last.bytes_recv) / elapsed, 1)
+            self._last_net = (now, net)
+
+            # over a few milliseconds since the previous reading the percentage is noise
+            cpu_backend = cpu_total = None
+            if time.monotonic() - self._cpu_at >= 0.1:
+                cpu_backend = self.process.cpu_percent(None)
+                cpu_total = psutil.cpu_percent(None)
+                self._cpu_at = time.monotonic()
+
+        return {
+            "time": round(now, 3),
+            "cpu_backend": cpu_backend,
+            "cpu_total": cpu_total,
+            "ram_backend_gb": round(mem.rss / (1024 ** 3), 3),
+            "ram_used_percent": vm.percent,
+            "ram_total_gb": round(vm.total / (1024 ** 3), 2),
+            "net_sent_bytes_per_s": sent_rate,
+            "net_recv_bytes_per_s": recv_rate,
+            "gpu_usage_by_process_gb": get_gpu_usage_by_pid(self.process.pid),
+            "gpu_total_stats": get_gpu_total_usage(),
+        }
+
+    def latest(self) -> dict:
+        """Most recent sample; starts the sampler (and takes a first sample) on first use."""
+        self.start()
+        with self._lock:
+            if self._samples:
+                return self._samples[-1]
+        sample = self.sample()
+        with self._lock:
+            if not self._samples:
+                self._samples.append(sample)
+            return self._samples[-1]
+
+    def history(self, seconds=None) -> list:
+        self.start()
+        cutoff = time.time() - seconds if seconds else 0
+        with self._lock:
+            return [s for s in self._samples if s["time"] >= cutoff]
+
+
+resource_sampler = ResourceSampler()
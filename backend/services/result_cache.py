@@ -0,0 +1,178 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+# Memory budget of the cache and optional directory for entries evicted from memory
+RESULT_CACHE_MAX_MB = float(os.environ.get("RESULT_CACHE_MAX_MB", "64"))
+RESULT_CACHE_SPILL_DIR = os.environ.get("RESULT_CACHE_SPILL_DIR") or None
+RESULT_CACHE_SPILL_MAX_MB = float(os.environ.get("RESULT_CACHE_SPILL_MAX_MB", "512"))
+
+ENTRY_OVERHEAD_BYTES = 200  # dict slot, key string, ndarray header
+
+
+class ResultCache:
+    """
+    Content-addressed LRU cache of NumPy arrays (feature vectors, model
+    predictions) under a memory budget.
+
+    - keys come from make_key(): sha256 of the uploaded bytes plus parameters;
+    - entries evicted from memory are spilled to spill_dir (if set) and read
+      back on the next miss;
+    - concurrent get_or_compute() calls for the same key run compute() once,
+      the others wait for its result (single flight).
+    """
+
+    def __init__(self, max_bytes, spill_dir=None, spill_max_bytes=0):
+        self.max_bytes = int(max_bytes)
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = int(spill_max_bytes)
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> ndarray, most recently used last
+        self._bytes = 0
+        self._inflight = {}  # key -> Future
+        self._counters = {"hits": 0, "misses": 0, "disk_hits": 0, "dedup_waits": 0,
+                          "evictions": 0, "spilled": 0, "errors": 0}
+
+    @staticmethod
+    def make_key(data: bytes, **params) -> str:
+        h = hashlib.sha256(data)
+        for name in sorted(params):
+            h.update(f"|{name}={params[name]}".encode())
+        return h.hexdigest()
+
+    # ---------------- lookup ----------------
+    def get_or_compute(self, key, compute):
+        """Cached array for key, or compute() it (once across concurrent callers) and cache it."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return value
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self._counters["dedup_waits"] += 1
+                owner = False
+            else:
+                future = Future()
+                self._inflight[key] = future
+                self._counters["misses"] += 1
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = self._load_spilled(key)
+            if value is None:
+                value = np.asarray(compute())
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            with self._lock:
+                self._counters["errors"] += 1
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    # ---------------- storage ----------------
+    @staticmethod
+    def _size(key, value):
+        return value.nbytes + len(key) + ENTRY_OVERHEAD_BYTES
+
+    def _store(self, key, value):
+        size = self._size(key, value)
+        if size > self.max_bytes:
+            return
+
+        evicted = []
+        with self._lock:
+            self._entries[key] = value
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, old_value = self._entries.popitem(last=False)
+                self._bytes -= self._size(old_key, old_value)
+                self._counters["evictions"] += 1
+                evicted.append((old_key, old_value))
+
+        # disk I/O outside the lock
+        for old_key, old_value in evicted:
+            self._spill(old_key, old_value)
+
+    def _spill_path(self, key):
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.spill_dir, name + ".npy")
+
+    def _spill(self, key, value):
+        if not self.spill_dir:
+            return
+        try:
+            np.save(self._spill_path(key), value, allow_pickle=False)
+            with self._lock:
+                self._counters["spilled"] += 1
+            self._trim_spill_dir()
+        except OSError:
+            logging.exception("Result cache spill failed:")
+
+    def _load_spilled(self, key):
+        if not self.spill_dir:
+            return None
+        path = self._spill_path(key)
+        try:
+            value = np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        os.utime(path)  # keep recently used spill files from being trimmed first
+        with self._lock:
+            self._counters["disk_hits"] += 1
+        return value
+
+    def _trim_spill_dir(self):
+        files = []
+        for entry in os.scandir(self.spill_dir):
+            if entry.name.endswith(".npy"):
+                st = entry.stat()
+                files.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.spill_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    # ---------------- metrics ----------------
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"] + self._counters["dedup_waits"]
+            hits = self._counters["hits"] + self._counters["dedup_waits"] + self._counters["disk_hits"]
+            return dict(
+                self._counters,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                inflight=len(self._inflight),
+                hit_rate=round(hits / lookups, 4) if lookups else 0,
+                spill_enabled=bool(self.spill_dir),
+            )
+
+
+result_cache = ResultCache(
+    RESULT_CACHE_MAX_MB * 1024 * 1024,
+    spill_dir=RESULT_CACHE_SPILL_DIR,
+    spill_max_bytes=RESULT_CACHE_SPILL_MAX_MB * 1024 * 1024,
+)
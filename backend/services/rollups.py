@@ -0,0 +1,140 @@
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, literal_column, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models.recognition_logs import RecognitionLog
+from models.recognition_rollups import RecognitionLogHourly
+
+KEY_COLUMNS = ("HourStart", "UserID", "AircraftTypeID", "SourceType")
+
+
+def hour_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def hour_end(moment: datetime) -> datetime:
+    """moment rounded up to the hour (unchanged when already on one)."""
+    start = hour_start(moment)
+    return start if start == moment else start + timedelta(hours=1)
+
+
+def rollup_bounds(start=None, end=None):
+    """
+    Hour-aligned [start, end) the rollups can actually answer for: every hour
+    that overlaps the requested range, i.e. start rounded down and end rounded
+    up. ?to=10:30 therefore includes the 10:00 hour up to 10:59.
+    """
+    return (hour_start(start) if start else None), (hour_end(end) if end else None)
+
+
+def aggregate_rows(rows):
+    """Log rows (dicts as inserted) -> {(hour, user, type, source): [detections, confidence_sum, ms_sum]}."""
+    totals = {}
+    for row in rows:
+        created_at = row.get("CreatedAt") or datetime.now()
+        key = (hour_start(created_at), row["UserID"], row["AircraftTypeID"], row["SourceType"])
+        acc = totals.setdefault(key, [0, 0.0, 0])
+        acc[0] += 1
+        acc[1] += row["Confidence"]
+        acc[2] += row["ProcessingTimeMs"]
+    return totals
+
+
+def _increment(db, key, detections, confidence_sum, ms_sum):
+    hour, user_id, type_id, source = key
+    return db.execute(
+        update(RecognitionLogHourly)
+        .where(RecognitionLogHourly.HourStart == hour,
+               RecognitionLogHourly.UserID == user_id,
+               RecognitionLogHourly.AircraftTypeID == type_id,
+               RecognitionLogHourly.SourceType == source)
+        .values(Detections=RecognitionLogHourly.Detections + detections,
+                ConfidenceSum=RecognitionLogHourly.ConfidenceSum + confidence_sum,
+                ProcessingTimeMsSum=RecognitionLogHourly.ProcessingTimeMsSum + ms_sum)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def apply_rollups(db, rows):
+    """
+    Add freshly inserted log rows to the hourly rollups in the same transaction
+    (call before commit). Keys are touched in sorted order so concurrent
+    writers lock them in the same order.
+    """
+    for key, (detections, confidence_sum, ms_sum) in sorted(aggregate_rows(rows).items()):
+        if _increment(db, key, detections, confidence_sum, ms_sum):
+            continue
+        try:
+            # savepoint: another writer may create the same hour row first
+            with db.begin_nested():
+                db.execute(insert(RecognitionLogHourly).values(
+                    dict(zip(KEY_COLUMNS, key), Detections=detections,
+                         ConfidenceSum=confidence_sum, ProcessingTimeMsSum=ms_sum)))
+        except IntegrityError:
+            _increment(db, key, detections, confidence_sum, ms_sum)
+
+
+def _hour_expr(dialect, column):
+    """CreatedAt truncated to the hour, in SQL of the given dialect."""
+    if dialect == "mssql":
+        return func.dateadd(literal_column("hour"), func.datediff(literal_column("hour"), literal_column("0"), column),
+                            literal_column("0"))
+    if dialect == "sqlite":
+        # same text layout SQLAlchemy uses for DateTime on SQLite, so range filters compare correctly
+        return func.strftime("%Y-%m-%d %H:00:00.000000", column)
+    if dialect == "postgresql":
+        return func.date_trunc("hour", column)
+    raise ValueError(f"Rollup rebuild is not supported on {dialect}")
+
+
+def rebuild_rollups(db, start=None, end=None):
+    """
+    Reconciliation: replace the rollups of hours [start, end) with a GROUP BY
+    over the raw logs, in one transaction. Returns the number of rollup rows.
+    Best run on closed hours — writers of the current hour may race with it.
+    """
+    start = hour_start(start) if start else None
+    end = hour_start(end) if end else None
+    hour = _hour_expr(db.get_bind().dialect.name, RecognitionLog.CreatedAt)
+
+    source = select(
+        hour.label("HourStart"),
+        RecognitionLog.UserID,
+        RecognitionLog.AircraftTypeID,
+        RecognitionLog.SourceType,
+        func.count().label("Detections"),
+        func.sum(RecognitionLog.Confidence).label("ConfidenceSum"),
+        func.sum(RecognitionLog.ProcessingTimeMs).label("ProcessingTimeMsSum"),
+    ).where(RecognitionLog.CreatedAt.isnot(None))
+    purge = delete(RecognitionLogHourly)
+    if start:
+        source = source.where(RecognitionLog.CreatedAt >= start)
+        purge = purge.where(RecognitionLogHourly.HourStart >= start)
+    if end:
+        source = source.where(RecognitionLog.CreatedAt < end)
+        purge = purge.where(RecognitionLogHourly.HourStart < end)
+    source = source.group_by(hour, RecognitionLog.UserID, RecognitionLog.AircraftTypeID, RecognitionLog.SourceType)
+
+    try:
+        removed = db.execute(purge).rowcount
+        written = db.execute(insert(RecognitionLogHourly).from_select(
+            list(KEY_COLUMNS) + ["Detections", "ConfidenceSum", "ProcessingTimeMsSum"], source)).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logging.info(f"Rollups rebuilt for [{start or '-inf'}, {end or '+inf'}): {removed} removed, {written} written")
+    return written
+
+
+def rollup_query(db, columns, start=None, end=None):
+    """db.query over the hourly rollups of the hours overlapping [start, end) — see rollup_bounds()."""
+    start, end = rollup_bounds(start, end)
+    query = db.query(*columns)
+    if start:
+        query = query.filter(RecognitionLogHourly.HourStart >= start)
+    if end:
+        query = query.filter(RecognitionLogHourly.HourStart < end)
+    return query
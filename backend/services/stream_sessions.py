@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+
+import numpy as np
+import soxr
+
+from utils.features import get_engine
+
+STREAM_SAMPLE_RATE = 22050
+STREAM_WINDOW_SECONDS = 5.0   # audio the prediction looks at
+STREAM_HOP_MS = 500           # how often a new prediction is emitted
+STREAM_MIN_SECONDS = 1.0      # no predictions before this much audio arrived
+STREAM_IDLE_TIMEOUT = 60.0    # seconds without audio before a session is dropped
+STREAM_MAX_SESSIONS = 64
+# A realtime prediction becomes a Recognition_Logs row when the label changes
+# or, for an unchanged label, at most once per this many seconds of audio
+STREAM_LOG_INTERVAL_SECONDS = float(os.environ.get("STREAM_LOG_INTERVAL_SECONDS", "30"))
+
+
+class StreamSession:
+    """
+    Стан одного потоку моніторингу в реальному часі.
+
+    Сирий PCM приходить шматками. Для нових семплів рахуються лише нові
+    STFT-кадри; їх log-mel спектри лежать у кільцевому буфері на window
+    секунд. Кожні hop_ms нового аудіо MFCC-вектор збирається з буфера
+    (кліп top_db, середнє, DCT) і йде в модель — декодування й FFT старих
+    даних не повторюються.
+    """
+
+    def __init__(self, session_id, model_key, predict, labels, input_rate=STREAM_SAMPLE_RATE,
+                 sr=STREAM_SAMPLE_RATE, window_seconds=STREAM_WINDOW_SECONDS, hop_ms=STREAM_HOP_MS,
+                 n_mfcc=40, user_id=None, log_interval=STREAM_LOG_INTERVAL_SECONDS):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.model_key = model_key
+        self.predict = predict
+        self.labels = labels
+        self.sr = sr
+        self.engine = get_engine(sr=sr, n_mfcc=n_mfcc)
+
+        self.hop_samples = max(1, int(sr * hop_ms / 1000))
+        self.min_frames = max(1, int(STREAM_MIN_SECONDS * sr) // self.engine.hop_length)
+        capacity = max(1, int(window_seconds * sr) // self.engine.hop_length)
+
+        self._resampler = None
+        if input_rate != sr:
+            self._resampler = soxr.ResampleStream(input_rate, sr, 1, dtype="float32", quality="HQ")
+
+        # samples not yet covered by a full STFT frame (< n_fft + one chunk)
+        self._pending = np.zeros(0, dtype=np.float32)
+        # ring of per-frame log-mel spectra
+        self._mel_ring = np.zeros((capacity, self.engine.n_mels), dtype=np.float32)
+        self._ring_pos = 0
+        self._ring_count = 0
+
+        self.samples_received = 0
+        self._since_emit = 0
+        self.started_at = time.time()
+        self.last_seen = time.monotonic()
+        self.lock = threading.Lock()
+
+        self.log_interval = log_interval
+        self._logged_label = None
+        self._logged_t = None
+
+    def _append_frames(self, log_mel):
+        capacity = len(self._mel_ring)
+        if len(log_mel) >= capacity:
+            log_mel = log_mel[-capacity:]
+        idx = (self._ring_pos + np.arange(len(log_mel))) % capacity
+        self._mel_ring[idx] = log_mel
+        self._ring_pos = (self._ring_pos + len(log_mel)) % capacity
+        self._ring_count = min(capacity, self._ring_count + len(log_mel))
+
+    def _window_log_mel(self):
+        capacity = len(self._mel_ring)
+        idx = (self._ring_pos - self._ring_count + np.arange(self._ring_count)) % capacity
+        return self._mel_ring[idx]
+
+    def push(self, samples):
+        """Додає PCM (float32, моно); повертає прогнози, що з'явилися за цей шматок."""
+        self.last_seen = time.monotonic()
+        samples = np.asarray(samples, dtype=np.float32)
+        if self._resampler is not None:
+            samples = self._resampler.resample_chunk(samples)
+
+        engine = self.engine
+        predictions = []
+        # feed in hop-sized pieces so every emission sees exactly the audio up to it
+        for start in range(0, len(samples), self.hop_samples):
+            piece = samples[start:start + self.hop_samples]
+            self._pending = np.concatenate((self._pending, piece))
+            self._since_emit += len(piece)
+            self.samples_received += len(piece)
+
+            frames = engine.frames(self._pending, center=False)
+            if len(frames):
+                self._append_frames(engine.log_mel(frames))
+                self._pending = self._pending[len(frames) * engine.hop_length:]
+
+            if self._since_emit >= self.hop_samples and self._ring_count >= self.min_frames:
+                self._since_emit = 0
+                predictions.append(self._emit())
+        return predictions
+
+    def loggable(self, predictions):
+        """Predictions worth a log row: a new label, or the same one after log_interval seconds of audio."""
+        selected = []
+        for p in predictions:
+            if p["result"] != self._logged_label or p["t"] - self._logged_t >= self.log_interval:
+                self._logged_label, self._logged_t = p["result"], p["t"]
+                selected.append(p)
+        return selected
+
+    def _emit(self):
+        mfcc = self.engine.mfcc_mean_from_log_mel(self._window_log_mel())
+        preds = np.asarray(self.predict(mfcc[None, :, None].astype(np.float32)))[0]
+        idx = int(np.argmax(preds))
+        return {
+            "t": round(self.samples_received / self.sr, 3),
+            "result": self.labels[idx],
+            "confidence": round(float(preds[idx]) * 100, 2),
+        }
+
+
+class StreamSessionRegistry:
+    def __init__(self, max_sessions=STREAM_MAX_SESSIONS, idle_timeout=STREAM_IDLE_TIMEOUT):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def expire_idle(self):
+        """Drops sessions that sent no audio for idle_timeout; returns them so callers can close DB rows."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [s for s in self._sessions.values() if now - s.last_seen > self.idle_timeout]
+            for s in expired:
+                del self._sessions[s.session_id]
+        return expired
+
+    def add(self, session):
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise RuntimeError("Too many realtime sessions")
+            self._sessions[session.session_id] = session
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def remove(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+stream_sessions = StreamSessionRegistry()
@@ -0,0 +1,122 @@
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+# Samples kept per stage for the percentiles and finished traces kept for
+# /api/log to look up the server-measured processing time
+STAGE_WINDOW = 2048
+RECENT_TRACES = 4096
+
+_current = contextvars.ContextVar("trace", default=None)
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class Trace:
+    """Spans of one recognition request; a stage entered twice accumulates."""
+
+    def __init__(self, name):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.started = time.perf_counter()
+        self.finished = None
+        self.spans = {}
+
+    def add(self, stage, ms):
+        self.spans[stage] = self.spans.get(stage, 0.0) + ms
+
+    def total_ms(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return (end - self.started) * 1000
+
+    def to_dict(self):
+        return {
+            "traceId": self.trace_id,
+            "processingTimeMs": int(round(self.total_ms())),
+            "timings": {stage: round(ms, 2) for stage, ms in self.spans.items()},
+        }
+
+
+class StageStats:
+    """Thread-safe sliding window of the latest durations per stage."""
+
+    def __init__(self, window=STAGE_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = {}
+
+    def add(self, stage, ms):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(ms)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            data = {stage: (sorted(samples), self._counts[stage]) for stage, samples in self._samples.items()}
+        return {
+            stage: {
+                "count": count,
+                "window": len(values),
+                "mean_ms": round(sum(values) / len(values), 3),
+                "p50_ms": round(_percentile(values, 0.50), 3),
+                "p95_ms": round(_percentile(values, 0.95), 3),
+                "p99_ms": round(_percentile(values, 0.99), 3),
+                "max_ms": round(values[-1], 3),
+            }
+            for stage, (values, count) in sorted(data.items())
+        }
+
+
+stage_stats = StageStats()
+
+_recent = OrderedDict()  # trace_id -> processing ms, oldest first
+_recent_lock = threading.Lock()
+
+
+def record(stage, ms):
+    """Add a measured duration to the stage stats and to the current trace, if any."""
+    stage_stats.add(stage, ms)
+    trace = _current.get()
+    if trace is not None:
+        trace.add(stage, ms)
+
+
+@contextmanager
+def span(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, (time.perf_counter() - started) * 1000)
+
+
+@contextmanager
+def traced(name):
+    """Trace of the code inside; its total is recorded as stage "<name>.total"."""
+    trace = Trace(name)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        trace.finished = time.perf_counter()
+        stage_stats.add(f"{name}.total", trace.total_ms())
+        with _recent_lock:
+            _recent[trace.trace_id] = int(round(trace.total_ms()))
+            while len(_recent) > RECENT_TRACES:
+                _recent.popitem(last=False)
+
+
+def processing_ms(trace_id):
+    """Server-measured processing time of a recent trace, or None."""
+    with _recent_lock:
+        return _recent.get(trace_id)
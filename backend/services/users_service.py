@@ -1,15 +1,88 @@
-from flask import request
+import os
+import threading
+import time
+from collections import OrderedDict
+
 from db import SessionLocal
 from models.users import User
 
+# Users resolved by ID stay in memory this long; delete/change_password in this
+# process invalidate at once, the TTL bounds how stale other workers get
+USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "10000"))
+
+
+class UserCache:
+    """
+    UserID -> User (detached, column attributes only) with a TTL and LRU
+    eviction. "No such user" is cached too, so a deleted user's token does not
+    cost a query per request either.
+    """
+
+    def __init__(self, ttl=USER_CACHE_TTL, max_size=USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # user_id -> (monotonic deadline, User or None)
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def _load(self, user_id):
+        session = SessionLocal()
+        try:
+            user = session.query(User).filter(User.UserID == user_id).first()
+            if user is not None:
+                session.expunge(user)
+            return user
+        finally:
+            session.close()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and now < entry[0]:
+                self._entries.move_to_end(user_id)
+                self._counters["hits"] += 1
+                return entry[1]
+            self._counters["misses"] += 1
+
+        user = self._load(user_id)
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id=None):
+        """Drop one user (after a delete or password change) or everything."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(int(user_id), None)
+            self._counters["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, size=len(self._entries), ttl_seconds=self.ttl)
+
+
+user_cache = UserCache()
+
+
 def get_current_user():
-    user_id = request.headers.get("X-User-ID")
-    if not user_id:
+    # ідентичність — з підписаного токена (без БД), сам користувач — з кешу;
+    # токен видаленого користувача дає None
+    from services.auth_tokens import current_user_id  # тут, щоб user_cache не вимагав AUTH_SECRET_KEY (tools/)
+
+    user_id = current_user_id()
+    if user_id is None:
         return None
+    return user_cache.get(user_id)
 
-    db = SessionLocal()
-    try:
-        user = db.query(User).filter(User.UserID == int(user_id)).first()
-        return user
-    finally:
-        db.close()
\ No newline at end of file
+
+def authenticated_user_id():
+    """UserID власника токена, якщо такий користувач ще існує, інакше None."""
+    user = get_current_user()
+    return user.UserID if user is not None else None
@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# tests run from backend/ with the app's flat imports (db, services.*, utils.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# db.py builds its engine at import time: point it at a throwaway SQLite file
+os.environ.setdefault("DB_BACKEND", "sqlite")
+os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(prefix="backend_tests_"), "test.db"))
+# services.auth_tokens refuses to import without a signing key
+os.environ.setdefault("AUTH_SECRET_KEY", "test-secret-key")
+
+
+@pytest.fixture
+def db_tables():
+    """Every table created empty for one test, dropped afterwards."""
+    import models  # noqa: F401  (registers every table)
+    from db import Base, engine
+    from services.reference_cache import reference_cache
+    from services.users_service import user_cache
+
+    Base.metadata.create_all(bind=engine)
+    reference_cache.invalidate()
+    user_cache.invalidate()
+    yield engine
+    reference_cache.invalidate()
+    user_cache.invalidate()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def seeded(db_tables):
+    """Roles, two users and the three aircraft types."""
+    from db import SessionLocal
+    from models import AircraftType, Role, User
+
+    db = SessionLocal()
+    db.add_all([Role(RoleID=1, RoleName="admin"), Role(RoleID=2, RoleName="user")])
+    db.add_all([User(UserID=1, Username="alice", PasswordHash="-", RoleID=2),
+                User(UserID=2, Username="bob", PasswordHash="-", RoleID=2)])
+    db.add_all(AircraftType(AircraftTypeID=i, AircraftName=name)
+               for i, name in enumerate(("drone", "helicopter", "airplane"), start=1))
+    db.commit()
+    db.close()
+    return db_tables
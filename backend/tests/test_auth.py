@@ -0,0 +1,72 @@
+import pytest
+from flask import Flask
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from auth import auth_bp
+from services import db_session
+from services.auth_tokens import issue_token
+from services.users_service import user_cache
+
+
+@pytest.fixture
+def client(seeded):
+    from db import SessionLocal
+    from models import User
+
+    db = SessionLocal()
+    for user in db.query(User).all():
+        user.PasswordHash = generate_password_hash("secret")
+    db.commit()
+    db.close()
+    user_cache.invalidate()
+
+    app = Flask("test")
+    db_session.init_app(app)
+    app.register_blueprint(auth_bp)
+    yield app.test_client()
+    user_cache.invalidate()
+
+
+def _bearer(user_id):
+    return {"Authorization": f"Bearer {issue_token(user_id, 'user')}"}
+
+
+def _password_hash(user_id):
+    from db import SessionLocal
+    from models import User
+
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        return user.PasswordHash if user else None
+    finally:
+        db.close()
+
+
+def test_change_password_needs_a_token(client):
+    body = {"user_id": 2, "old_password": "secret", "new_password": "x"}
+    assert client.post("/api/change_password", json=body).status_code == 401
+    # X-User-ID is off by default, a literal "Bearer null" is no token either
+    assert client.post("/api/change_password", json=body, headers={"X-User-ID": "2"}).status_code == 401
+    assert client.post("/api/change_password", json=body, headers={"Authorization": "Bearer null"}).status_code == 401
+    assert check_password_hash(_password_hash(2), "secret")
+
+
+def test_change_password_acts_on_the_token_user(client):
+    # user_id in the body names bob, the token is alice's: alice's password changes
+    response = client.post("/api/change_password", headers=_bearer(1),
+                           json={"user_id": 2, "old_password": "secret", "new_password": "new-secret"})
+    assert response.status_code == 200
+    assert check_password_hash(_password_hash(1), "new-secret")
+    assert check_password_hash(_password_hash(2), "secret")
+
+
+def test_delete_account_deletes_only_the_token_user(client):
+    assert client.delete("/api/delete_account", json={"user_id": 1}).status_code == 401
+
+    assert client.delete("/api/delete_account", headers=_bearer(2), json={"user_id": 1}).status_code == 200
+    assert _password_hash(2) is None
+    assert _password_hash(1) is not None
+
+    # the token outlives the account but no longer authenticates anyone
+    assert client.delete("/api/delete_account", headers=_bearer(2)).status_code == 401
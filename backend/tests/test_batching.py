@@ -0,0 +1,84 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from services.batching import BatchScheduler, QueueFullError, SchedulerClosedError
+
+
+def _double(inputs):
+    return inputs * 2
+
+
+def test_results_are_split_back_per_request():
+    scheduler = BatchScheduler("t", _double, max_batch_size=8, max_wait_ms=50)
+    try:
+        futures = [scheduler.submit(np.full((n, 3), i, dtype=np.float32)) for i, n in enumerate((1, 2, 3))]
+        for i, (future, n) in enumerate(zip(futures, (1, 2, 3))):
+            result = future.result(timeout=5)
+            assert result.shape == (n, 3)
+            assert np.all(result == i * 2)
+    finally:
+        scheduler.stop()
+
+
+def test_concurrent_requests_share_a_batch():
+    calls = []
+
+    def predict(inputs):
+        calls.append(len(inputs))
+        return inputs
+
+    scheduler = BatchScheduler("t", predict, max_batch_size=4, max_wait_ms=200)
+    try:
+        futures = [scheduler.submit(np.zeros((1, 2))) for _ in range(4)]
+        for future in futures:
+            future.result(timeout=5)
+        assert calls == [4]
+        stats = scheduler.stats()
+        assert stats["batches"] == 1
+        assert stats["items"] == 4
+    finally:
+        scheduler.stop()
+
+
+def test_predict_error_reaches_every_waiter():
+    def fail(inputs):
+        raise ValueError("boom")
+
+    scheduler = BatchScheduler("t", fail, max_wait_ms=20)
+    try:
+        futures = [scheduler.submit(np.zeros((1, 2))) for _ in range(3)]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+    finally:
+        scheduler.stop()
+
+
+def test_full_queue_rejects():
+    release = threading.Event()
+
+    def slow(inputs):
+        release.wait(5)
+        return inputs
+
+    scheduler = BatchScheduler("t", slow, max_batch_size=1, max_wait_ms=0, max_queue_size=1)
+    try:
+        scheduler.submit(np.zeros((1, 1)))  # taken by the worker, blocks in predict
+        time.sleep(0.1)
+        scheduler.submit(np.zeros((1, 1)))  # fills the queue
+        with pytest.raises(QueueFullError):
+            scheduler.submit(np.zeros((1, 1)))
+        assert scheduler.stats()["rejected"] == 1
+    finally:
+        release.set()
+        scheduler.stop()
+
+
+def test_submit_after_stop_is_refused():
+    scheduler = BatchScheduler("t", _double)
+    scheduler.stop()
+    with pytest.raises(SchedulerClosedError):
+        scheduler.submit(np.zeros((1, 1)))
@@ -0,0 +1,107 @@
+import io
+import os
+import time
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from services import bulk_jobs as bulk_jobs_module
+from services.auth_tokens import issue_token
+from services.bulk_jobs import BulkJob, BulkJobManager, items_from_directory
+
+
+@pytest.fixture
+def stub_model(monkeypatch):
+    """Decoding and the model replaced by stand-ins: every clip comes out as "drone"."""
+    monkeypatch.setattr(bulk_jobs_module, "clip_features", lambda data, **kw: np.zeros((1, 4), dtype=np.float32))
+    monkeypatch.setattr(bulk_jobs_module, "predict",
+                        lambda model_key, x: np.tile(np.array([[0.9, 0.05, 0.05]], dtype=np.float32), (len(x), 1)))
+
+
+@pytest.fixture
+def audio_dir(tmp_path):
+    directory = tmp_path / "audio"
+    directory.mkdir()
+    for i in range(6):
+        (directory / f"clip_{i}.wav").write_bytes(b"RIFF-stand-in")
+    return str(directory)
+
+
+def _log_count():
+    from db import SessionLocal
+    from models import RecognitionLog
+
+    db = SessionLocal()
+    try:
+        return db.query(RecognitionLog).count()
+    finally:
+        db.close()
+
+
+def _wait(job, timeout=10):
+    deadline = time.monotonic() + timeout
+    while job.progress()["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return job.progress()
+
+
+def test_resume_continues_from_the_manifest(seeded, stub_model, audio_dir, tmp_path):
+    jobs_dir = str(tmp_path / "jobs")
+    # a job whose process died after the first three files were written
+    job = BulkJob.create(items_from_directory(audio_dir), "custom", 1, source="directory", jobs_dir=jobs_dir)
+    for item in job.manifest["items"][:3]:
+        item.update(status="done", result="drone", confidence=90.0)
+    job.manifest["status"] = "running"
+    job.save()
+
+    manager = BulkJobManager(jobs_dir=jobs_dir)  # a fresh process: the job is known from disk only
+    assert manager.get(job.job_id).progress()["status"] == "interrupted"
+    assert manager.resume(job.job_id) is True
+
+    progress = _wait(manager.get(job.job_id))
+    assert (progress["status"], progress["done"], progress["pending"]) == ("completed", 6, 0)
+    assert _log_count() == 3  # only the files that were still pending
+
+
+@pytest.fixture
+def client(seeded, stub_model, tmp_path, monkeypatch):
+    from routes import jobs as jobs_routes
+    from services import db_session
+
+    manager = BulkJobManager(jobs_dir=str(tmp_path / "jobs"))
+    monkeypatch.setattr(jobs_routes, "bulk_jobs", manager)
+    app = Flask("test")
+    db_session.init_app(app)
+    app.register_blueprint(jobs_routes.jobs_bp, url_prefix="/api/jobs")
+    return app.test_client(), manager
+
+
+def _bearer(user_id):
+    return {"Authorization": f"Bearer {issue_token(user_id, 'user')}"}
+
+
+def test_jobs_are_visible_to_their_owner_only(client, audio_dir):
+    client, manager = client
+    job = BulkJob.create(items_from_directory(audio_dir), "custom", 1, source="directory", jobs_dir=manager.jobs_dir)
+
+    assert client.get("/api/jobs").status_code == 401
+    assert client.get(f"/api/jobs/{job.job_id}").status_code == 401
+    assert [p["jobId"] for p in client.get("/api/jobs", headers=_bearer(1)).get_json()] == [job.job_id]
+    assert client.get("/api/jobs", headers=_bearer(2)).get_json() == []
+
+    assert client.get(f"/api/jobs/{job.job_id}", headers=_bearer(2)).status_code == 403
+    assert client.post(f"/api/jobs/{job.job_id}/resume", headers=_bearer(2)).status_code == 403
+    assert client.post(f"/api/jobs/{job.job_id}/cancel", headers=_bearer(2)).status_code == 403
+    assert client.get(f"/api/jobs/{job.job_id}", headers=_bearer(1)).status_code == 200
+    assert client.get("/api/jobs/unknown", headers=_bearer(1)).status_code == 404
+
+
+def test_rejected_zip_upload_leaves_nothing_behind(client):
+    client, manager = client
+    from services.model_service import MODEL_FILES
+
+    response = client.post("/api/jobs", headers=_bearer(1), content_type="multipart/form-data",
+                           data={"model": next(iter(MODEL_FILES)), "file": (io.BytesIO(b"not a zip"), "input.zip")})
+    assert response.status_code == 400
+    assert not os.path.isdir(manager.jobs_dir) or os.listdir(manager.jobs_dir) == []
@@ -0,0 +1,66 @@
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from services.ensemble import fuse, predict_all
+
+PROBS = {
+    "a": np.array([0.6, 0.3, 0.1]),
+    "b": np.array([0.1, 0.5, 0.4]),
+    "c": np.array([0.2, 0.45, 0.35]),
+}
+
+
+def test_mean():
+    idx, confidence, fused, votes = fuse(PROBS, "mean")
+    assert idx == 1
+    assert confidence == pytest.approx((0.3 + 0.5 + 0.45) / 3)
+    assert fused.sum() == pytest.approx(1.0)
+    assert votes.tolist() == [1, 2, 0]
+
+
+def test_weighted_follows_the_weights():
+    idx, confidence, fused, _ = fuse(PROBS, "weighted", {"a": 10.0, "b": 1.0, "c": 1.0})
+    assert idx == 0
+    assert confidence == pytest.approx((6.0 + 0.1 + 0.2) / 12)
+    assert fused.sum() == pytest.approx(1.0)
+
+
+def test_weighted_with_all_zero_weights_falls_back_to_mean():
+    idx, confidence, fused, _ = fuse(PROBS, "weighted", {"a": 0, "b": 0, "c": 0})
+    assert not np.isnan(fused).any()
+    assert (idx, confidence) == fuse(PROBS, "mean")[:2]
+
+
+def test_negative_weights_are_rejected():
+    with pytest.raises(ValueError):
+        fuse(PROBS, "weighted", {"a": -1.0})
+
+
+def test_majority_ties_go_to_the_higher_mean():
+    probs = {"a": np.array([0.9, 0.1, 0.0]), "b": np.array([0.2, 0.8, 0.0])}
+    idx, _, _, votes = fuse(probs, "majority")
+    assert votes.tolist() == [1, 1, 0]
+    assert idx == 0  # mean 0.55 against 0.45
+
+
+def test_predict_all_collects_failures():
+    class Scheduler:
+        def __init__(self, outcome):
+            self.outcome = outcome
+
+        def submit(self, features):
+            if self.outcome == "unavailable":
+                raise RuntimeError("not loaded")
+            future = Future()
+            if self.outcome == "fails":
+                future.set_exception(RuntimeError("boom"))
+            else:
+                future.set_result(np.array([self.outcome]))
+            return future
+
+    schedulers = {"a": Scheduler([0.7, 0.2, 0.1]), "b": Scheduler("fails"), "c": Scheduler("unavailable")}
+    probs, errors = predict_all(np.zeros((1, 4)), ["a", "b", "c"], schedulers.__getitem__)
+    assert list(probs) == ["a"] and probs["a"].tolist() == [0.7, 0.2, 0.1]
+    assert errors == {"b": "boom", "c": "not loaded"}
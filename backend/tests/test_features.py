@@ -0,0 +1,53 @@
+import warnings
+
+import librosa
+import numpy as np
+import pytest
+
+from utils.audio_processing import extract_features_batch
+from utils.features import MfccEngine
+
+SR = 22050
+N_MFCC = 40
+TOLERANCE = 1e-2
+
+# 5 s (the model clip), odd lengths, and clips shorter than n_fft (2048 samples)
+LENGTHS = (5 * SR, int(3.3 * SR), 59_761, 2048, 1102, 300)
+
+
+def _clip(n, seed):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / SR
+    y = sum(np.sin(2 * np.pi * rng.uniform(80, 300) * k * t) / k for k in range(1, 6))
+    y = y + 0.1 * rng.standard_normal(n)
+    return (0.3 * y / np.max(np.abs(y))).astype(np.float32)
+
+
+def _librosa_mean(y):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # n_fft larger than the clip
+        return np.mean(librosa.feature.mfcc(y=y, sr=SR, n_mfcc=N_MFCC), axis=1)
+
+
+@pytest.fixture(scope="module")
+def clips():
+    return [_clip(n, seed) for seed, n in enumerate(LENGTHS)]
+
+
+@pytest.mark.parametrize("index", range(len(LENGTHS)))
+def test_engine_matches_librosa(clips, index):
+    y = clips[index]
+    assert np.max(np.abs(MfccEngine(sr=SR, n_mfcc=N_MFCC).mfcc_mean(y) - _librosa_mean(y))) < TOLERANCE
+
+
+def test_batch_matches_librosa_for_mixed_lengths(clips):
+    features = extract_features_batch(clips, sr=SR, n_mfcc=N_MFCC)
+    assert features.shape == (len(clips), N_MFCC, 1)
+    reference = np.stack([_librosa_mean(y) for y in clips])
+    assert np.max(np.abs(features[..., 0] - reference)) < TOLERANCE
+
+
+def test_batch_equals_single_clip_path(clips):
+    engine = MfccEngine(sr=SR, n_mfcc=N_MFCC)
+    single = np.stack([engine.mfcc_mean(y) for y in clips])
+    np.testing.assert_allclose(engine.mfcc_mean_batch(clips), single, atol=1e-4)
@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from services import logging_service
+from services.logging_service import LogWriter, check_log_refs
+from services.users_service import user_cache
+
+
+@pytest.fixture
+def writer(seeded):
+    # no background flushes during a test: everything goes through writer.flush()
+    writer = LogWriter(batch_size=10, flush_seconds=3600, durability="memory")
+    user_cache.invalidate()
+    yield writer
+    writer._closed = True
+    user_cache.invalidate()
+
+
+def _count_logs():
+    from db import SessionLocal
+    from models import RecognitionLog
+    from models.recognition_rollups import RecognitionLogHourly
+    from sqlalchemy import func
+
+    db = SessionLocal()
+    try:
+        return (db.query(func.count(RecognitionLog.LogID)).scalar(),
+                db.query(func.sum(RecognitionLogHourly.Detections)).scalar() or 0)
+    finally:
+        db.close()
+
+
+def test_flush_writes_queued_rows_and_rollups(writer):
+    for i in range(25):
+        writer.enqueue(1 + i % 2, 1 + i % 3, 90.0, 12, "file")
+    assert writer.stats()["backlog"] == 25
+
+    assert writer.flush() == 25
+    assert _count_logs() == (25, 25)
+    stats = writer.stats()
+    assert (stats["backlog"], stats["written"], stats["batches"], stats["rejected"]) == (0, 25, 3, 0)
+
+
+def test_rejected_row_is_dropped_not_requeued(writer):
+    # a row with a UserID the table does not have, in the middle of good ones
+    for user_id in (1, 2, 999, 1, 2):
+        writer.enqueue(user_id, 1, 90.0, 12, "file")
+
+    assert writer.flush() == 4
+    assert _count_logs() == (4, 4)
+    stats = writer.stats()
+    assert (stats["backlog"], stats["written"], stats["rejected"], stats["failed_flushes"]) == (0, 4, 1, 0)
+
+    # later rows are not held up by it
+    writer.enqueue(1, 2, 80.0, 10, "realtime")
+    assert writer.flush() == 1
+    assert _count_logs() == (5, 5)
+
+
+def test_unreachable_database_keeps_rows_queued(writer, monkeypatch):
+    for _ in range(3):
+        writer.enqueue(1, 1, 90.0, 12, "file")
+
+    def down(rows):
+        raise OperationalError("INSERT", {}, Exception("database is down"))
+
+    monkeypatch.setattr(logging_service, "_insert_rows", down)
+    with pytest.raises(OperationalError):
+        writer.flush()
+    stats = writer.stats()
+    assert (stats["backlog"], stats["failed_flushes"], stats["rejected"]) == (3, 1, 0)
+
+    monkeypatch.undo()
+    assert writer.flush() == 3
+    assert _count_logs() == (3, 3)
+
+
+def test_unknown_user_or_type_is_refused_before_queueing(seeded):
+    user_cache.invalidate()
+    check_log_refs(1, 2)
+    with pytest.raises(ValueError):
+        check_log_refs(999, 1)
+    with pytest.raises(ValueError):
+        check_log_refs(1, 99)
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from api.logs import decode_cursor, encode_cursor, logs_bp
+from services import db_session
+
+
+@pytest.fixture
+def client(seeded):
+    from db import SessionLocal
+    from models import RecognitionLog
+
+    # 120 logs of alice with repeated timestamps (ties are broken by LogID), 5 of bob
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    db = SessionLocal()
+    db.add_all(RecognitionLog(UserID=1, AircraftTypeID=1 + i % 3, Confidence=90.0, ProcessingTimeMs=10,
+                              SourceType="file" if i % 2 else "realtime", CreatedAt=base + timedelta(minutes=i // 4))
+               for i in range(120))
+    db.add_all(RecognitionLog(UserID=2, AircraftTypeID=1, Confidence=80.0, ProcessingTimeMs=10,
+                              SourceType="file", CreatedAt=base) for _ in range(5))
+    db.commit()
+    db.close()
+
+    app = Flask("test")
+    db_session.init_app(app)
+    app.register_blueprint(logs_bp)
+    return app.test_client()
+
+
+def _pages(client, query):
+    items, cursor, pages = [], None, 0
+    while True:
+        response = client.get(f"/api/logs?{query}" + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        body = response.get_json()
+        items += body["items"]
+        pages += 1
+        cursor = body["nextCursor"]
+        if not cursor:
+            return items, pages
+
+
+def test_cursor_round_trip():
+    moment = datetime(2026, 1, 1, 12, 30, 15, 123000)
+    assert decode_cursor(encode_cursor(moment, 42)) == (moment, 42)
+
+
+def test_pages_cover_every_row_once_newest_first(client):
+    items, pages = _pages(client, "user_id=1&limit=25")
+    ids = [item["id"] for item in items]
+    assert len(ids) == 120 == len(set(ids))
+    assert pages == 5
+    times = [datetime.strptime(item["time"], "%d.%m.%Y %H:%M:%S") for item in items]
+    assert times == sorted(times, reverse=True)
+
+
+def test_first_page_carries_counts(client):
+    body = client.get("/api/logs?user_id=1&limit=10").get_json()
+    assert body["total"] == 120
+    assert body["counts"] == {"Дрон": 40, "Вертоліт": 40, "Літак": 40}
+    second = client.get(f"/api/logs?user_id=1&limit=10&cursor={body['nextCursor']}").get_json()
+    assert "counts" not in second
+
+
+def test_filters_apply_across_pages(client):
+    items, _ = _pages(client, "user_id=1&limit=7&type=drone&source=file")
+    assert items and all(item["type"] == "Дрон" and item["source"] == "файл" for item in items)
+    assert len(items) == 20
+
+
+def test_bad_input_is_rejected(client):
+    assert client.get("/api/logs").status_code == 400
+    assert client.get("/api/logs?user_id=1&cursor=%%%").status_code == 400
+    assert client.get("/api/logs?user_id=1&type=zeppelin").status_code == 400
+    assert client.get("/api/logs?user_id=1&from=yesterday").status_code == 400
+
+
+def _export(client, query, user_id=None):
+    from services.auth_tokens import issue_token
+
+    headers = {"Authorization": f"Bearer {issue_token(user_id, 'user')}"} if user_id else {}
+    response = client.get(f"/api/logs/export?format=csv{query}", headers=headers)
+    rows = response.get_data(as_text=True).splitlines()[1:] if response.status_code == 200 else None
+    return response.status_code, rows
+
+
+def test_export_needs_a_token(client):
+    assert _export(client, "")[0] == 401
+
+
+def test_export_is_limited_to_own_logs(client):
+    status, rows = _export(client, "", user_id=2)
+    assert status == 200 and len(rows) == 5
+    assert _export(client, "&user_id=1", user_id=2)[0] == 403
+
+
+def test_admin_exports_everyone(client):
+    from db import SessionLocal
+    from models import User
+
+    db = SessionLocal()
+    db.add(User(UserID=3, Username="admin", PasswordHash="-", RoleID=1))
+    db.commit()
+    db.close()
+
+    assert len(_export(client, "", user_id=3)[1]) == 125
+    assert len(_export(client, "&user_id=1", user_id=3)[1]) == 120
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from services.long_recording import check_window
+from utils.audio_io import iter_windows
+
+
+def test_windows_cover_the_signal():
+    blocks = [np.arange(10, dtype=np.float32), np.arange(10, 25, dtype=np.float32)]
+    windows = list(iter_windows(blocks, window=10, hop=5))
+    assert [start for start, _ in windows] == [0, 5, 10, 15]
+    assert all(len(w) == 10 for _, w in windows)
+
+
+@pytest.mark.parametrize("window, hop", [(0, 5), (10, 0), (10, -1)])
+def test_iter_windows_rejects_empty_steps(window, hop):
+    with pytest.raises(ValueError):
+        next(iter_windows([np.zeros(100, dtype=np.float32)], window, hop))
+
+
+@pytest.mark.parametrize("window_seconds, hop_seconds", [
+    (5.0, 0.0), (5.0, 0.00001), (0.01, 0.01), (5.0, 6.0), (10_000.0, 5.0), (float("nan"), 1.0),
+])
+def test_check_window_rejects(window_seconds, hop_seconds):
+    with pytest.raises(ValueError):
+        check_window(window_seconds, hop_seconds)
+
+
+def test_check_window_in_samples():
+    assert check_window(5.0, 2.5) == (110250, 55125)
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from services import model_service
+from services.batching import SchedulerClosedError
+
+MB = 2 ** 20
+
+
+class StandInModel:
+    """Backend-shaped stand-in: fixed predictions, a declared weight size, a slow load."""
+
+    input_shape = (None, 4)
+    loads = []
+
+    def __init__(self, path, backend):
+        time.sleep(0.05)  # wide enough a window for concurrent first loads to overlap
+        self.path = path
+        StandInModel.loads.append(path)
+
+    def predict(self, x):
+        return np.tile(np.array([[0.8, 0.1, 0.1]], dtype=np.float32), (len(x), 1))
+
+    def memory_bytes(self):
+        return 100 * MB
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """A clean model registry over stand-in weights; every configured model active, budget 250 MB."""
+    for cfg in model_service.MODEL_FILES.values():
+        (tmp_path / cfg["file"]).write_bytes(b"")
+    keys = list(model_service.MODEL_FILES)
+    active = set(keys)
+    StandInModel.loads = []
+
+    monkeypatch.setattr(model_service, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(model_service, "load_backend", StandInModel)
+    monkeypatch.setattr(model_service, "get_active_model_keys", lambda: [k for k in keys if k in active])
+    monkeypatch.setattr(model_service, "MODEL_MEMORY_BUDGET_MB", 250)
+    monkeypatch.setattr(model_service, "loaded_models", OrderedDict())
+    monkeypatch.setattr(model_service, "schedulers", {})
+    monkeypatch.setattr(model_service, "model_states", {key: {"state": "not_loaded"} for key in keys})
+    monkeypatch.setattr(model_service, "model_usage", {
+        key: {"loads": 0, "unloads": 0, "evictions": 0, "memory_bytes": 0, "last_used": None} for key in keys})
+    yield keys, active
+    for scheduler in model_service.schedulers.values():
+        scheduler.stop()
+
+
+def test_least_recently_used_model_is_evicted_over_budget(registry):
+    first, second, third = registry[0]
+    old_scheduler = model_service.get_scheduler(first)
+    model_service.get_scheduler(second)
+    model_service.get_scheduler(first)  # first is now the most recently used
+
+    model_service.get_scheduler(third)  # 300 MB > 250 MB: second has to go
+    assert list(model_service.loaded_models) == [first, third]
+    stats = model_service.registry_stats()
+    assert stats["resident_mb"] == 200
+    assert stats["models"][second]["evictions"] == 1
+    assert model_service.model_states[second]["state"] == "unloaded"
+    assert model_service.schedulers[first] is old_scheduler
+
+    # an evicted model is loaded again on demand
+    assert model_service.predict(second, np.zeros((2, 4), dtype=np.float32)).shape == (2, 3)
+    assert model_service.model_usage[second]["loads"] == 2
+    assert len(model_service.loaded_models) == 2
+
+
+def test_deactivated_model_is_unloaded_and_refused(registry):
+    keys, active = registry
+    key = keys[0]
+    scheduler = model_service.get_scheduler(key)
+
+    active.discard(key)
+    assert model_service.unload_model(key) is True
+    assert key not in model_service.loaded_models and key not in model_service.schedulers
+    assert model_service.model_states[key]["state"] == "unloaded"
+    assert model_service.model_usage[key]["unloads"] == 1
+    with pytest.raises(SchedulerClosedError):
+        scheduler.predict(np.zeros((1, 4), dtype=np.float32))
+    with pytest.raises(ValueError):
+        model_service.get_scheduler(key)
+    assert model_service.unload_model(key) is False
+
+
+def test_concurrent_first_loads_load_once(registry):
+    key = registry[0][0]
+    barrier = threading.Barrier(8)
+    results, errors = [], []
+
+    def first_request():
+        barrier.wait()
+        try:
+            results.append(model_service.get_scheduler(key))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=first_request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(StandInModel.loads) == 1
+    assert model_service.model_usage[key]["loads"] == 1
+    assert len({id(scheduler) for scheduler in results}) == 1
+
+
+def test_fingerprint_follows_backend_and_weights(registry, tmp_path, monkeypatch):
+    key = registry[0][0]
+    weights = tmp_path / model_service.MODEL_FILES[key]["file"]
+    keras = model_service.model_fingerprint(key)
+    assert keras == model_service.model_fingerprint(key)
+
+    weights.write_bytes(b"retrained weights")
+    assert model_service.model_fingerprint(key) != keras
+
+    monkeypatch.setenv(f"MODEL_BACKEND_{key}", "tflite_int8")
+    assert model_service.model_fingerprint(key).startswith("tflite_int8")
@@ -0,0 +1,46 @@
+import json
+import os
+import time
+
+from services.request_metrics import RequestMetrics
+
+
+def _dead_snapshot(metrics_dir, pid=999_999_999):
+    other = RequestMetrics()
+    other.observe("/api/logs", "GET", 200, 0.02, bytes_out=100)
+    snap = other._local_snapshot()
+    snap.update(pid=pid, started_at=time.time() - 60)
+    with open(os.path.join(metrics_dir, f"{pid}.json"), "w") as f:
+        json.dump(snap, f)
+
+
+def test_totals_include_other_workers(tmp_path):
+    _dead_snapshot(str(tmp_path))
+    metrics = RequestMetrics(metrics_dir=str(tmp_path))
+    metrics.observe("/api/logs", "GET", 200, 0.01)
+    assert metrics.summary()["requests"] == 2
+
+
+def test_dead_worker_snapshot_is_absorbed_once(tmp_path):
+    _dead_snapshot(str(tmp_path))
+    metrics = RequestMetrics(metrics_dir=str(tmp_path))
+    metrics.observe("/api/logs", "GET", 200, 0.01)
+    metrics.flush()
+
+    assert sorted(os.listdir(tmp_path)) == [f"{os.getpid()}.json"]
+    summary = metrics.summary()
+    assert summary["requests"] == 2
+    assert summary["bytes_out"] == 100
+
+    metrics.flush()
+    assert metrics.summary()["requests"] == 2
+
+
+def test_live_worker_snapshot_is_kept(tmp_path):
+    snap = RequestMetrics()._local_snapshot()  # this process: alive
+    snap["pid"] = os.getppid()
+    snap["started_at"] = time.time()
+    with open(tmp_path / f"{os.getppid()}.json", "w") as f:
+        json.dump(snap, f)
+    RequestMetrics(metrics_dir=str(tmp_path)).flush()
+    assert f"{os.getppid()}.json" in os.listdir(tmp_path)
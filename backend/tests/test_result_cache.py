@@ -0,0 +1,73 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from services.result_cache import ResultCache
+
+
+def test_key_depends_on_content_and_params():
+    key = ResultCache.make_key(b"audio", model="1", sr=22050)
+    assert key == ResultCache.make_key(b"audio", sr=22050, model="1")
+    assert key != ResultCache.make_key(b"audio", model="2", sr=22050)
+    assert key != ResultCache.make_key(b"other", model="1", sr=22050)
+
+
+def test_second_lookup_is_a_hit():
+    cache = ResultCache(1 << 20)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.arange(4)
+
+    np.testing.assert_array_equal(cache.get_or_compute("k", compute), np.arange(4))
+    np.testing.assert_array_equal(cache.get_or_compute("k", compute), np.arange(4))
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResultCache(1 << 20)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return np.ones(3)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert len(results) == 5
+
+
+def test_lru_eviction_and_spill(tmp_path):
+    value = np.zeros(1000, dtype=np.float64)  # 8 KB
+    cache = ResultCache(20_000, spill_dir=str(tmp_path), spill_max_bytes=1 << 20)
+    for key in ("a", "b", "c"):
+        cache.get_or_compute(key, lambda: value)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["spilled"] == 1
+
+    # "a" was evicted to disk and comes back without recomputing
+    restored = cache.get_or_compute("a", lambda: pytest.fail("recomputed a spilled entry"))
+    np.testing.assert_array_equal(restored, value)
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_failed_compute_is_not_cached():
+    cache = ResultCache(1 << 20)
+
+    def fail():
+        raise RuntimeError("decode failed")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", fail)
+    np.testing.assert_array_equal(cache.get_or_compute("k", lambda: np.ones(1)), np.ones(1))
+    assert cache.stats()["errors"] == 1
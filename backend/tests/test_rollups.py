@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from services.rollups import apply_rollups, hour_end, hour_start, rebuild_rollups, rollup_bounds, rollup_query
+
+BASE = datetime(2026, 1, 1, 9, 0, 0)
+
+
+def _rows():
+    # 200 logs over ~5 hours, two users, every type and source
+    return [dict(UserID=1 + i % 2, AircraftTypeID=1 + i % 3, Confidence=50.0 + i % 50,
+                 ProcessingTimeMs=5 + i % 7, SourceType=("file", "realtime", "batch")[i % 3],
+                 CreatedAt=BASE + timedelta(minutes=i * 1.5))
+            for i in range(200)]
+
+
+def _snapshot(db):
+    from models.recognition_rollups import RecognitionLogHourly as H
+
+    rows = db.query(H.HourStart, H.UserID, H.AircraftTypeID, H.SourceType,
+                    H.Detections, H.ConfidenceSum, H.ProcessingTimeMsSum).all()
+    return sorted((r[0], r[1], r[2], r[3], r[4], round(r[5], 6), r[6]) for r in rows)
+
+
+def _write(db, rows):
+    from models import RecognitionLog
+
+    db.add_all(RecognitionLog(**row) for row in rows)
+    apply_rollups(db, rows)
+    db.commit()
+
+
+def test_hour_rounding():
+    assert hour_start(datetime(2026, 1, 1, 10, 30)) == datetime(2026, 1, 1, 10)
+    assert hour_end(datetime(2026, 1, 1, 10, 30)) == datetime(2026, 1, 1, 11)
+    assert hour_end(datetime(2026, 1, 1, 10)) == datetime(2026, 1, 1, 10)
+    assert rollup_bounds(datetime(2026, 1, 1, 9, 59), datetime(2026, 1, 1, 10, 1)) == (
+        datetime(2026, 1, 1, 9), datetime(2026, 1, 1, 11))
+    assert rollup_bounds() == (None, None)
+
+
+def test_incremental_rollups_match_rebuild(seeded):
+    from db import SessionLocal
+
+    rows = _rows()
+    db = SessionLocal()
+    try:
+        # written in uneven batches, as the API and the batch jobs do
+        for chunk in (rows[:1], rows[1:37], rows[37:150], rows[150:]):
+            _write(db, chunk)
+        incremental = _snapshot(db)
+        assert sum(r[4] for r in incremental) == len(rows)
+
+        rebuild_rollups(db)
+        assert _snapshot(db) == incremental
+    finally:
+        db.close()
+
+
+def test_partial_rebuild_leaves_other_hours(seeded):
+    from db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        _write(db, _rows())
+        before = _snapshot(db)
+        # unaligned bounds are rounded down: only the 10:00 and 11:00 hours are replaced
+        rebuild_rollups(db, BASE + timedelta(hours=1, minutes=20), BASE + timedelta(hours=3, minutes=40))
+        assert _snapshot(db) == before
+    finally:
+        db.close()
+
+
+def test_query_includes_every_overlapping_hour(seeded):
+    from db import SessionLocal
+    from models.recognition_rollups import RecognitionLogHourly as H
+
+    rows = _rows()
+    db = SessionLocal()
+    try:
+        _write(db, rows)
+        start, end = BASE + timedelta(minutes=30), BASE + timedelta(hours=2, minutes=15)
+        total = rollup_query(db, [func.sum(H.Detections)], start, end).scalar()
+        # the same count straight from the logs over the hour-aligned range 09:00..12:00
+        aligned_start, aligned_end = rollup_bounds(start, end)
+        expected = sum(1 for row in rows if aligned_start <= row["CreatedAt"] < aligned_end)
+        assert (aligned_start, aligned_end) == (BASE, BASE + timedelta(hours=3))
+        assert total == expected
+    finally:
+        db.close()
@@ -0,0 +1,28 @@
+from services.stream_sessions import StreamSession
+
+
+def _session(log_interval=30.0):
+    return StreamSession(1, "1", predict=None, labels=["дрон", "літак"], log_interval=log_interval)
+
+
+def _p(t, label):
+    return {"t": t, "result": label, "confidence": 90.0}
+
+
+def test_only_label_changes_and_interval_are_logged():
+    session = _session(log_interval=30.0)
+    hops = [_p(1.0 + 0.5 * i, "дрон") for i in range(10)]           # 1.0 .. 5.5 s
+    hops += [_p(6.0, "літак"), _p(6.5, "літак"), _p(7.0, "дрон")]
+    hops += [_p(37.0, "дрон"), _p(37.5, "дрон")]
+
+    logged = session.loggable(hops)
+    assert [(p["t"], p["result"]) for p in logged] == [
+        (1.0, "дрон"), (6.0, "літак"), (7.0, "дрон"), (37.0, "дрон"),
+    ]
+
+
+def test_state_carries_across_pushes():
+    session = _session(log_interval=30.0)
+    assert len(session.loggable([_p(1.0, "дрон")])) == 1
+    assert session.loggable([_p(1.5, "дрон")]) == []
+    assert len(session.loggable([_p(2.0, "літак")])) == 1
@@ -0,0 +1,77 @@
+"""
+Classify many recordings at once and write the results to Recognition_Logs.
+
+    cd backend && python -m tools.bulk_analyze --model 4 --user-id 1 --zip recordings.zip
+    cd backend && python -m tools.bulk_analyze --model 4 --user-id 1 --dir /data/recordings
+    cd backend && python -m tools.bulk_analyze --model 4 --user-id 1 --file-ids 10 11 12
+    cd backend && python -m tools.bulk_analyze --resume <job_id>
+
+Runs the same job as POST /api/jobs in this process, printing progress. An
+interrupted job (Ctrl+C, crash) continues from its manifest with --resume.
+"""
+import argparse
+import os
+import threading
+
+from services.bulk_jobs import (
+    BULK_BATCH_SIZE, BULK_DECODE_WORKERS, BULK_JOBS_DIR, BulkJob,
+    items_from_audio_files, items_from_directory, items_from_zip,
+)
+
+
+def _report(job, stop):
+    while not stop.wait(2.0):
+        p = job.progress()
+        eta = f"{p['etaSeconds']:.0f} s" if p["etaSeconds"] is not None else "-"
+        print(f"{p['done'] + p['failed']}/{p['total']} ({p['percent']:.1f}%)  "
+              f"{p['filesPerSecond']:.1f} files/s  failed {p['failed']}  eta {eta}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--zip", help="ZIP archive of recordings")
+    source.add_argument("--dir", help="directory of recordings (recursive)")
+    source.add_argument("--file-ids", nargs="+", type=int, help="Audio_Files.FileID values")
+    source.add_argument("--resume", metavar="JOB_ID", help="continue an interrupted job")
+    parser.add_argument("--model", help="model key (ModelID)")
+    parser.add_argument("--user-id", type=int, help="UserID the log rows belong to")
+    parser.add_argument("--jobs-dir", default=BULK_JOBS_DIR)
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    parser.add_argument("--decode-workers", type=int, default=BULK_DECODE_WORKERS)
+    args = parser.parse_args()
+
+    if args.resume:
+        job = BulkJob.load(os.path.join(args.jobs_dir, args.resume, "manifest.json"))
+    else:
+        if not args.model or args.user_id is None:
+            parser.error("--model and --user-id are required for a new job")
+        if args.zip:
+            items, kind = items_from_zip(os.path.abspath(args.zip)), "zip"
+        elif args.dir:
+            items, kind = items_from_directory(os.path.abspath(args.dir)), "directory"
+        else:
+            items, kind = items_from_audio_files(args.file_ids, args.user_id), "audio_files"
+        job = BulkJob.create(items, args.model, args.user_id, kind, jobs_dir=args.jobs_dir)
+    print(f"Job {job.job_id}: {len(job.manifest['items'])} files, model {job.manifest['model']}")
+
+    stop = threading.Event()
+    threading.Thread(target=_report, args=(job, stop), daemon=True).start()
+    job.claim()
+    try:
+        result = job.run(batch_size=args.batch_size, decode_workers=args.decode_workers)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted, continue with: python -m tools.bulk_analyze --resume {job.job_id}")
+        raise SystemExit(130)
+    finally:
+        stop.set()
+
+    print(f"{result['status']}: {result['done']} done, {result['failed']} failed, "
+          f"{result['filesPerSecond']:.1f} files/s, {result['elapsedSeconds']:.1f} s")
+    for failure in job.failures():
+        print(f"  failed {failure['name']}: {failure['error']}")
+    raise SystemExit(0 if result["status"] == "completed" else 1)
+
+
+if __name__ == "__main__":
+    main()
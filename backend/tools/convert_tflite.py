@@ -0,0 +1,99 @@
+"""
+Convert the Keras models in MODEL_FILES to TFLite artifacts for the
+tflite_f16 / tflite_int8 inference backends.
+
+    cd backend && python -m tools.convert_tflite [--models 4 5] [--calibration-dir DIR] [--samples 200]
+
+For model.h5 this writes model.f16.tflite (float16 weights) and
+model.int8.tflite (int8 weights and activations, float input/output) next to
+it. int8 calibration uses MFCCs of the audio files in --calibration-dir, or
+synthetic engine-like clips when no directory is given — real recordings
+give better activation ranges.
+"""
+import argparse
+import logging
+import os
+
+import numpy as np
+
+from services.inference_backends import tflite_path
+from services.model_service import MODEL_DIR, MODEL_FILES
+from utils.audio_io import decode_audio
+from utils.audio_processing import extract_features_batch
+
+SR = 22050
+DURATION = 5.0
+N_MFCC = 40
+
+
+def calibration_features(calibration_dir=None, samples=200):
+    """(samples, N_MFCC, 1) features for the int8 representative dataset."""
+    clips = []
+    if calibration_dir:
+        for name in sorted(os.listdir(calibration_dir)):
+            if len(clips) >= samples:
+                break
+            with open(os.path.join(calibration_dir, name), "rb") as f:
+                try:
+                    clips.append(decode_audio(f.read(), sr=SR, duration=DURATION))
+                except ValueError:
+                    logging.warning(f"Skipping {name}: not decodable audio")
+    if not clips:
+        from benchmarks._common import synth_audio
+        clips = [synth_audio(DURATION, SR, seed=i) for i in range(samples)]
+    return extract_features_batch(clips, sr=SR, n_mfcc=N_MFCC)
+
+
+def convert(model, variant, features=None):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if variant == "f16":
+        converter.target_spec.supported_types = [tf.float16]
+    else:
+        def representative_dataset():
+            for row in features:
+                yield [row[None, ...].astype(np.float32)]
+        converter.representative_dataset = representative_dataset
+    return converter.convert()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="*", default=list(MODEL_FILES), help="model keys (default: all)")
+    parser.add_argument("--variants", nargs="*", default=["f16", "int8"], choices=["f16", "int8"])
+    parser.add_argument("--calibration-dir", help="audio files for int8 calibration")
+    parser.add_argument("--samples", type=int, default=200, help="calibration clips")
+    args = parser.parse_args()
+
+    import tensorflow as tf
+
+    features = None
+    if "int8" in args.variants:
+        features = calibration_features(args.calibration_dir, args.samples)
+
+    failed = False
+    for key in args.models:
+        model_path = os.path.join(MODEL_DIR, MODEL_FILES[key]["file"])
+        if not os.path.exists(model_path):
+            print(f"[{key}] {model_path} not found, skipped")
+            continue
+        model = tf.keras.models.load_model(model_path)
+        for variant in args.variants:
+            out_path = tflite_path(model_path, variant)
+            try:
+                data = convert(model, variant, features)
+            except Exception as e:
+                failed = True
+                print(f"[{key}] {variant}: conversion failed: {e}")
+                continue
+            with open(out_path, "wb") as f:
+                f.write(data)
+            print(f"[{key}] {variant}: {out_path} ({len(data) / 1024:.1f} KB)")
+
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Export Recognition_Logs (with user names and aircraft type names) to CSV or Parquet.
+
+    cd backend && python -m tools.export_logs logs.parquet
+    cd backend && python -m tools.export_logs logs.csv --from 2025-10-01 --to 2025-10-31 --user-id 3
+    cd backend && python -m tools.export_logs - --format csv --source realtime > logs.csv
+
+The format follows the file extension unless --format is given. Rows are
+streamed from the database EXPORT_PARTITION_ROWS at a time and written as they
+arrive (one Parquet row group per partition), so memory use does not depend
+on how many rows are exported. Same filters as GET /api/logs/export.
+"""
+import argparse
+import os
+import sys
+import time
+
+from api.logs import LogQueryError, log_filters
+from models.recognition_logs import RecognitionLog
+from services.log_export import EXPORT_FORMATS, EXPORT_PARTITION_ROWS, iter_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="output file, - for stdout")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS))
+    parser.add_argument("--from", dest="start", help="ISO date/time, inclusive")
+    parser.add_argument("--to", dest="end", help="ISO date/time (a bare date includes that day)")
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--type", help="AircraftTypeID or name")
+    parser.add_argument("--source", help="file, realtime or batch")
+    parser.add_argument("--partition-rows", type=int, default=EXPORT_PARTITION_ROWS)
+    args = parser.parse_args()
+
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+    if fmt not in EXPORT_FORMATS:
+        parser.error("cannot tell the format from the file name, use --format")
+
+    filters = {"from": args.start, "to": args.end, "type": args.type, "source": args.source}
+    try:
+        conditions = log_filters({k: v for k, v in filters.items() if v})
+    except LogQueryError as e:
+        parser.error(str(e))
+    if args.user_id:
+        conditions.append(RecognitionLog.UserID == args.user_id)
+
+    started = time.perf_counter()
+    written = 0
+    out = sys.stdout.buffer if args.output == "-" else open(args.output + ".part", "wb")
+    try:
+        for chunk in iter_export(fmt, conditions, args.partition_rows):
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    if args.output != "-":
+        os.replace(args.output + ".part", args.output)  # no half-written file under the final name
+    print(f"{written / 2 ** 20:.1f} MB {fmt} in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Rebuild the hourly rollups (Recognition_Logs_Hourly) from the raw logs.
+
+    cd backend && python -m tools.rebuild_rollups                  # last 2 days of closed hours
+    cd backend && python -m tools.rebuild_rollups --days 30
+    cd backend && python -m tools.rebuild_rollups --from 2025-10-01 --to 2025-11-01
+    cd backend && python -m tools.rebuild_rollups --all            # backfill after the first deploy
+
+The rollups are kept up to date as logs are written; this is the
+reconciliation job (cron) that repairs drift, e.g. after logs were deleted or
+imported by hand. Each day is replaced in its own transaction. The current
+hour is left alone unless --include-current is given, since writers are still
+adding to it.
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from db import SessionLocal
+from models.recognition_logs import RecognitionLog
+from services.rollups import hour_start, rebuild_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    span = parser.add_mutually_exclusive_group()
+    span.add_argument("--days", type=float, default=2, help="rebuild the last N days (default 2)")
+    span.add_argument("--from", dest="start", type=datetime.fromisoformat, help="ISO date/time, inclusive")
+    span.add_argument("--all", action="store_true", help="everything since the oldest log")
+    parser.add_argument("--to", dest="end", type=datetime.fromisoformat, help="ISO date/time, exclusive (with --from)")
+    parser.add_argument("--include-current", action="store_true", help="also rebuild the hour in progress")
+    args = parser.parse_args()
+
+    end = args.end or (datetime.now() + timedelta(hours=1) if args.include_current else datetime.now())
+    end = hour_start(end)
+
+    db = SessionLocal()
+    try:
+        if args.all:
+            oldest = db.query(func.min(RecognitionLog.CreatedAt)).scalar()
+            if oldest is None:
+                print("No logs, nothing to rebuild")
+                return
+            start = hour_start(oldest)
+        elif args.start:
+            start = hour_start(args.start)
+        else:
+            start = hour_start(end - timedelta(days=args.days))
+
+        total = 0
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = min(chunk_start + timedelta(days=1), end)
+            total += rebuild_rollups(db, chunk_start, chunk_end)
+            print(f"{chunk_start:%Y-%m-%d %H:%M} .. {chunk_end:%Y-%m-%d %H:%M}  {total} rollup rows", flush=True)
+            chunk_start = chunk_end
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
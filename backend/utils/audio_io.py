@@ -0,0 +1,205 @@
+import io
+import os
+import subprocess
+import threading
+
+import numpy as np
+import soundfile as sf
+import soxr
+
+# ffmpeg is only needed for compressed formats (webm/ogg-opus, mp3, m4a ...)
+FFMPEG_BINARY = os.environ.get("FFMPEG_BINARY", "ffmpeg")
+
+# Formats libsndfile parses in-process
+NATIVE_FORMATS = {"wav", "flac", "ogg"}
+
+
+class AudioDecodeError(ValueError):
+    """Raised when an upload can not be decoded to PCM."""
+
+
+def detect_format(data: bytes):
+    """Guess container format from magic bytes (the upload file name can lie)."""
+    head = data[:16]
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[:3] == b"ID3" or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    return None
+
+
+def _to_mono(audio: np.ndarray) -> np.ndarray:
+    return audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0]
+
+
+def _decode_native(data: bytes, sr: int, duration):
+    with sf.SoundFile(io.BytesIO(data)) as f:
+        frames = -1 if duration is None else int(duration * f.samplerate)
+        audio = f.read(frames=frames, dtype="float32", always_2d=True)
+        native_sr = f.samplerate
+
+    y = _to_mono(audio)
+    if native_sr != sr:
+        y = soxr.resample(y, native_sr, sr, quality="HQ")
+    return np.ascontiguousarray(y, dtype=np.float32)
+
+
+def _decode_ffmpeg(data: bytes, sr: int, duration):
+    cmd = [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-i", "pipe:0"]
+    if duration is not None:
+        cmd += ["-t", str(duration)]
+    cmd += ["-f", "f32le", "-ac", "1", "-ar", str(sr), "pipe:1"]
+
+    try:
+        proc = subprocess.run(cmd, input=data, capture_output=True, check=False)
+    except FileNotFoundError:
+        raise AudioDecodeError(f"ffmpeg not found ({FFMPEG_BINARY})")
+
+    if proc.returncode != 0:
+        raise AudioDecodeError(proc.stderr.decode("utf-8", "replace").strip() or "ffmpeg failed")
+    return np.frombuffer(proc.stdout, dtype="<f4").astype(np.float32, copy=False)
+
+
+def decode_audio(data: bytes, sr=22050, duration=None) -> np.ndarray:
+    """
+    Декодує аудіо з пам'яті (bytes) у моно float32 NumPy-буфер з частотою sr.
+    WAV/FLAC/OGG читаються libsndfile у процесі, решта — через ffmpeg по pipe.
+    Жодних тимчасових файлів.
+    """
+    if not data:
+        raise AudioDecodeError("Empty audio")
+
+    fmt = detect_format(data)
+    if fmt in NATIVE_FORMATS:
+        try:
+            y = _decode_native(data, sr, duration)
+        except RuntimeError:
+            # e.g. Opus in Ogg on an old libsndfile — let ffmpeg try
+            y = _decode_ffmpeg(data, sr, duration)
+    else:
+        y = _decode_ffmpeg(data, sr, duration)
+
+    if y.size == 0:
+        raise AudioDecodeError("Decoded audio is empty")
+    return y
+
+
+# ================== STREAMING DECODE (long recordings) ==================
+STREAM_READ_BYTES = 64 * 1024
+
+
+def _peek(stream, n=16):
+    head = stream.read(n)
+    stream.seek(0)
+    return head
+
+
+def _iter_native_blocks(f, sr, block_frames):
+    with f:
+        resampler = None
+        if f.samplerate != sr:
+            resampler = soxr.ResampleStream(f.samplerate, sr, 1, dtype="float32", quality="HQ")
+        for block in f.blocks(blocksize=block_frames, dtype="float32", always_2d=True):
+            y = _to_mono(block)
+            if resampler is not None:
+                y = resampler.resample_chunk(y)
+            if y.size:
+                yield np.ascontiguousarray(y, dtype=np.float32)
+        if resampler is not None:
+            tail = resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+            if tail.size:
+                yield tail.astype(np.float32, copy=False)
+
+
+def _iter_ffmpeg_blocks(stream, sr, block_frames):
+    cmd = [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+           "-f", "f32le", "-ac", "1", "-ar", str(sr), "pipe:1"]
+    try:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        raise AudioDecodeError(f"ffmpeg not found ({FFMPEG_BINARY})")
+
+    def feed():
+        try:
+            while True:
+                chunk = stream.read(STREAM_READ_BYTES)
+                if not chunk:
+                    break
+                proc.stdin.write(chunk)
+        except (BrokenPipeError, ValueError):
+            pass  # ffmpeg exited early; its stderr says why
+        finally:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+    feeder = threading.Thread(target=feed, name="ffmpeg-feed", daemon=True)
+    feeder.start()
+    try:
+        block_bytes = block_frames * 4
+        while True:
+            raw = proc.stdout.read(block_bytes)
+            if not raw:
+                break
+            raw = raw[:len(raw) - len(raw) % 4]
+            yield np.frombuffer(raw, dtype="<f4").astype(np.float32, copy=False)
+        feeder.join()
+        err = proc.stderr.read()
+        if proc.wait() != 0:
+            raise AudioDecodeError(err.decode("utf-8", "replace").strip() or "ffmpeg failed")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+def iter_audio_blocks(stream, sr=22050, block_seconds=10.0):
+    """
+    Декодує файлоподібний потік блоками (моно float32, частота sr), не
+    тримаючи в пам'яті весь запис: WAV/FLAC/OGG — libsndfile + потоковий
+    ресемплінг soxr, решта — ffmpeg через pipe.
+    """
+    block_frames = max(1, int(block_seconds * sr))
+    seekable = getattr(stream, "seekable", lambda: False)()
+    if seekable and detect_format(_peek(stream)) in NATIVE_FORMATS:
+        try:
+            f = sf.SoundFile(stream)
+        except RuntimeError:
+            stream.seek(0)  # not parseable in-process — let ffmpeg try
+        else:
+            yield from _iter_native_blocks(f, sr, block_frames)
+            return
+    yield from _iter_ffmpeg_blocks(stream, sr, block_frames)
+
+
+def iter_windows(blocks, window, hop):
+    """
+    Перекриті вікна (start_sample, samples) довжиною window з кроком hop.
+    Буфер не більший за window + один блок. Хвіст, що не покритий
+    повним вікном, повертається коротшим вікном.
+    """
+    if window <= 0 or hop <= 0:
+        raise ValueError(f"window and hop must be positive (got {window}, {hop} samples)")
+    buf = np.zeros(0, dtype=np.float32)
+    start = 0
+    emitted = False
+    for block in blocks:
+        buf = np.concatenate((buf, block))
+        while len(buf) >= window:
+            yield start, buf[:window].copy()
+            emitted = True
+            buf = buf[hop:]
+            start += hop
+
+    uncovered = len(buf) - (window - hop) if emitted else len(buf)
+    if uncovered > 0 and len(buf) > 0:
+        yield start, buf
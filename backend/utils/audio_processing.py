@@ -1,11 +1,33 @@
-import librosa
+import logging
+
 import numpy as np
 
-def extract_features(file_path, sr=22050, n_mfcc=40):
+from utils.audio_io import decode_audio
+from utils.features import get_engine
+
+
+def extract_features(y, sr=22050, n_mfcc=40):
+    """
+    Усереднені MFCC-ознаки одного кліпу у формі входу моделі (1, n_mfcc, 1).
+    Повертає None, якщо обчислити ознаки не вдалося.
+    """
+    try:
+        return extract_features_batch([y], sr=sr, n_mfcc=n_mfcc)
+    except Exception:
+        logging.exception("Feature extraction error:")
+        return None
+
+
+def extract_features_batch(clips, sr=22050, n_mfcc=40):
+    """Ознаки для кількох кліпів одним векторизованим проходом, (len(clips), n_mfcc, 1)."""
+    means = get_engine(sr=sr, n_mfcc=n_mfcc).mfcc_mean_batch(clips)
+    return np.expand_dims(means, axis=-1)
+
+
+def extract_features_from_file(file_path, sr=22050, n_mfcc=40, duration=None):
     """
-    Завантажує аудіо й повертає усереднені MFCC-ознаки.
+    Завантажує аудіо з диска й повертає усереднені MFCC-ознаки.
     """
-    audio, sr = librosa.load(file_path, sr=sr, mono=True)
-    mfcc = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=n_mfcc)
-    mfcc_mean = np.mean(mfcc.T, axis=0)
-    return np.expand_dims(mfcc_mean, axis=0)
+    with open(file_path, "rb") as f:
+        y = decode_audio(f.read(), sr=sr, duration=duration)
+    return extract_features(y, sr=sr, n_mfcc=n_mfcc)
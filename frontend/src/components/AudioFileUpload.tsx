@@ -8,6 +8,7 @@ import { ImageWithFallback } from './figma/ImageWithFallback';
 import ModelSelector from './ModelSelector';
 import { useTheme } from '../contexts/ThemeContext';
 import { useNotifications } from '../contexts/NotificationContext';
+import { authHeaders } from '../contexts/AuthContext';
 
 function convertResultToType(label: string): "Дрон" | "Літак" | "Вертоліт" {
   if (label === "drone") return "Дрон";
@@ -53,6 +54,24 @@ export default function AudioFileUpload({ onBack }: AudioFileUploadProps) {
 };
 
 
+// Великі файли аналізуються у фоні: сервер відповідає 202 + jobId,
+// результат забираємо long-poll запитами
+const ASYNC_THRESHOLD_BYTES = 10 * 1024 * 1024;
+
+const waitForAnalyzeJob = async (jobId: string) => {
+  while (true) {
+    const response = await fetch(`http://127.0.0.1:5000/analyze/jobs/${jobId}?wait=25`);
+    if (response.status === 202) continue;
+    if (!response.ok) throw new Error("Помилка при запиті до бекенду");
+
+    const job = await response.json();
+    if (job.status !== "done" || job.httpStatus !== 200) {
+      throw new Error(job.error || job.result?.error || "Помилка аналізу");
+    }
+    return job.result;
+  }
+};
+
 const handleAnalyze = async () => {
   if (!file) return;
   setAnalyzing(true);
@@ -61,37 +80,27 @@ const handleAnalyze = async () => {
   const formData = new FormData();
   formData.append("file", file);
   formData.append("model", selectedModel);
+  if (file.size > ASYNC_THRESHOLD_BYTES) formData.append("async", "1");
 
   try {
     const response = await fetch("http://127.0.0.1:5000/analyze", {
       method: "POST",
+      headers: authHeaders(),
       body: formData,
     });
     if (!response.ok) throw new Error("Помилка при запиті до бекенду");
 
-    const data = await response.json();
+    let data = await response.json();
+    if (response.status === 202) data = await waitForAnalyzeJob(data.jobId);
 
     setResult(data.result);
     setConfidence(data.confidence);
-    setProcessingTime(Date.now() - startTime);
+    // час, виміряний сервером (без мережі), якщо він є у відповіді
+    setProcessingTime(data.processingTimeMs ?? Date.now() - startTime);
     setUsedModel(data.model);
 
-    // ---------- НОВИЙ КОД: запис у базу ----------
-    const logResponse = await fetch("http://127.0.0.1:5000/api/log", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({
-        UserID: Number(localStorage.getItem("userId")), // або пропс із LoginScreen
-        AircraftTypeID: data.aircraftTypeID, // відповідно до mapping label→id
-        Confidence: data.confidence,
-        SourceType: "file",
-        ProcessingTimeMs: Date.now() - startTime
-      })
-    });
-
-    const logData = await logResponse.json();
-    console.log("Log збережено:", logData);
-    // --------------------------------------------
+    // лог розпізнавання сервер записує сам (за токеном), окремий /api/log не потрібен
+    console.log("Log збережено:", data.logged === true);
   } catch (error) {
     console.error("Помилка:", error);
     alert("Не вдалося виконати аналіз аудіо.");
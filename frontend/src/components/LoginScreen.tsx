@@ -56,6 +56,8 @@ export default function LoginScreen({ onLogin, setSessionStartTime }: LoginScree
       setSessionStartTime(Date.now());
       localStorage.setItem("userId", data.UserID.toString());
       localStorage.setItem("role", data.role);
+      // підписаний токен доступу: Authorization: Bearer у запитах до бекенду
+      localStorage.setItem("accessToken", data.token);
 
     } catch {
       setError("Помилка сервера");
@@ -106,6 +108,8 @@ export default function LoginScreen({ onLogin, setSessionStartTime }: LoginScree
       setSessionStartTime(Date.now());
       localStorage.setItem("userId", data.UserID.toString());
       localStorage.setItem("role", data.role);
+      // підписаний токен доступу: Authorization: Bearer у запитах до бекенду
+      localStorage.setItem("accessToken", data.token);
 
     } catch {
       setError("Помилка сервера");
@@ -5,6 +5,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '.
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from './ui/table';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from './ui/tabs';
 import { Badge } from './ui/badge';
+import { Button } from './ui/button';
 import { Upload, Radio, Search, Filter, ShieldCheck, ClipboardList, Gauge, Cpu, Mic, Plane, User, Bell } from 'lucide-react';
 /*import { useAuth } from '../contexts/AuthContext';*/
 import { useTheme } from '../contexts/ThemeContext';
@@ -44,15 +45,21 @@ export default function MainScreen({ onNavigate }: MainScreenProps) {
           .then(data => setAllowRealtime(data.allow_realtime === true));
   }, []);
 
-  // Завантаження логів з бекенду
-  useEffect(() => {
+  // Історія приходить сторінками (keyset-курсор); тип фільтрує сервер
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingLogs, setLoadingLogs] = useState(false);
+  const [typeCounts, setTypeCounts] = useState<{ total: number; counts: Record<string, number> }>({ total: 0, counts: {} });
+
+  const loadLogs = (cursor: string | null) => {
+    const params = new URLSearchParams({ user_id: String(Number(localStorage.getItem("userId"))), limit: "50" });
+    if (typeFilter !== 'all') params.set("type", typeFilter);
+    if (cursor) params.set("cursor", cursor);
 
-    fetch(`http://127.0.0.1:5000/api/logs?user_id=${Number(localStorage.getItem("userId"))}`)
+    setLoadingLogs(true);
+    fetch(`http://127.0.0.1:5000/api/logs?${params}`)
       .then(res => res.json())
       .then(data => {
-        console.log("Сирі логи з бекенду:", data);
-
-        const mapped = data.map((row: any) => ({
+        const mapped = data.items.map((row: any) => ({
           id: row.id,
           type: row.type,
           time: row.time,
@@ -61,12 +68,19 @@ export default function MainScreen({ onNavigate }: MainScreenProps) {
           source: row.source
         }));
 
-        console.log("Перетворені логи:", mapped);
-
-        setLogs(mapped);
+        setLogs(prev => (cursor ? [...prev, ...mapped] : mapped));
+        setNextCursor(data.nextCursor);
+        // лічильники повертає перша сторінка; для карток — без фільтра за типом
+        if (!cursor && typeFilter === 'all') setTypeCounts({ total: data.total, counts: data.counts });
       })
-      .catch(err => console.error("Помилка завантаження логів:", err));
-  }, []);
+      .catch(err => console.error("Помилка завантаження логів:", err))
+      .finally(() => setLoadingLogs(false));
+  };
+
+  // Завантаження логів з бекенду (з початку — при зміні фільтра)
+  useEffect(() => {
+    loadLogs(null);
+  }, [typeFilter]);
   
   // Mock logs (заповни з бекенду пізніше)
   /*const logs: Log[] = [
@@ -105,12 +119,12 @@ export default function MainScreen({ onNavigate }: MainScreenProps) {
     return matchesType && matchesSearch;
   });
 
-  // Статистика
+  // Статистика (по всій історії, а не лише завантажених сторінках)
   const stats = {
-    totalDetections: logs.length,
-    drones: logs.filter(l => l.type === 'Дрон').length,
-    planes: logs.filter(l => l.type === 'Літак').length,
-    helicopters: logs.filter(l => l.type === 'Вертоліт').length,
+    totalDetections: typeCounts.total,
+    drones: typeCounts.counts['Дрон'] ?? 0,
+    planes: typeCounts.counts['Літак'] ?? 0,
+    helicopters: typeCounts.counts['Вертоліт'] ?? 0,
   };
 
   const getTypeBadgeColor = (type: string) => {
@@ -269,6 +283,14 @@ export default function MainScreen({ onNavigate }: MainScreenProps) {
                 </Table>
                 </div>
               </div>
+
+              {nextCursor && (
+                <div className="flex justify-center mt-4">
+                  <Button variant="outline" onClick={() => loadLogs(nextCursor)} disabled={loadingLogs}>
+                    {loadingLogs ? 'Завантаження...' : 'Показати ще'}
+                  </Button>
+                </div>
+              )}
             </Card>
           </TabsContent>
 
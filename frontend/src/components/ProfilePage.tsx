@@ -5,7 +5,7 @@ import { Label } from './ui/label';
 import { Separator } from './ui/separator';
 import { Alert, AlertDescription } from './ui/alert';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from './ui/card';
-import { useAuth } from '../contexts/AuthContext';
+import { authHeaders, useAuth } from '../contexts/AuthContext';
 import { useTheme } from '../contexts/ThemeContext';
 import { Clock, Bell, Lock, Trash2, AlertTriangle, CheckCircle2, Save, ArrowLeft } from 'lucide-react';
 
@@ -74,9 +74,8 @@ export default function ProfilePage({ onBack, sessionStartTime }: ProfilePagePro
     try {
       const res = await fetch("http://127.0.0.1:5000/api/change_password", {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: authHeaders({ "Content-Type": "application/json" }),
         body: JSON.stringify({
-          user_id: user.UserID,
           old_password: oldPassword,
           new_password: newPassword,
         }),
@@ -117,8 +116,7 @@ export default function ProfilePage({ onBack, sessionStartTime }: ProfilePagePro
     try {
       const res = await fetch("http://127.0.0.1:5000/api/delete_account", {
         method: "DELETE",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ user_id: user.UserID }),
+        headers: authHeaders(),
       });
 
       if (!res.ok) {
@@ -7,6 +7,7 @@ import { Alert, AlertDescription } from './ui/alert';
 import { ArrowLeft, Play, Square, Radio, AlertTriangle, Volume2, Download } from 'lucide-react';
 import ModelSelector from './ModelSelector';
 import { useTheme } from '../contexts/ThemeContext';
+import { authHeaders } from '../contexts/AuthContext';
 
 interface RealTimeLog {
   id: number;
@@ -24,51 +25,62 @@ export default function RealTimeMonitoring({ onBack }: RealTimeMonitoringProps)
   const [isRecording, setIsRecording] = useState(false);
   const [logs, setLogs] = useState<RealTimeLog[]>([]);
   const [signalStrength, setSignalStrength] = useState(0);
-  const mediaRecorderRef = useRef<MediaRecorder | null>(null);
   const audioStreamRef = useRef<MediaStream | null>(null);
   const audioContextRef = useRef<AudioContext | null>(null);
   const analyserRef = useRef<AnalyserNode | null>(null);
+  const processorRef = useRef<ScriptProcessorNode | null>(null);
   const [selectedModel, setSelectedModel] = useState('custom');
   const logIdRef = useRef(1);
-  const sendingRef = useRef(false); // prevent overlapping sends
+  const sessionIdRef = useRef<number | null>(null);
+  // PCM captured since the last send; sends are chained, never dropped
+  const pendingPcmRef = useRef<Float32Array[]>([]);
+  const sendChainRef = useRef<Promise<void>>(Promise.resolve());
+  const sendTimerRef = useRef<number | null>(null);
 
-  // Start recording & streaming
+  const API = 'http://127.0.0.1:5000/api/stream/sessions';
+  const SEND_INTERVAL_MS = 250;
+
+  // Start recording & streaming raw PCM into a server-side session
   const startRecording = async () => {
     try {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
       audioStreamRef.current = stream;
-      const mediaRecorder = new MediaRecorder(stream);
-      mediaRecorderRef.current = mediaRecorder;
-
-      // ondataavailable triggers for each timeslice (we will use 3000 ms)
-      mediaRecorder.ondataavailable = async (event: BlobEvent) => {
-        if (event.data && event.data.size > 0) {
-          // avoid concurrent sends
-          if (sendingRef.current) {
-            // optionally queue or drop
-            return;
-          }
-          sendingRef.current = true;
-          await sendAudioToBackend(event.data);
-          sendingRef.current = false;
-        }
-      };
-
-      mediaRecorder.onerror = (ev) => {
-        console.error("MediaRecorder error:", ev);
-      };
 
-      // Prepare analyser for signal level visualization
-      const audioCtx = new AudioContext();
+      // 22050 Hz is what the models expect, so the server does not resample
+      const audioCtx = new AudioContext({ sampleRate: 22050 });
       audioContextRef.current = audioCtx;
+
+      const res = await fetch(API, {
+        method: 'POST',
+        headers: authHeaders({ 'Content-Type': 'application/json' }),
+        body: JSON.stringify({ model: selectedModel, sample_rate: audioCtx.sampleRate, hop_ms: 500 }),
+      });
+      if (!res.ok) {
+        console.error('Cannot start realtime session:', await res.text());
+        stopRecording();
+        alert('Не вдалося запустити сесію моніторингу.');
+        return;
+      }
+      sessionIdRef.current = (await res.json()).sessionId;
+
       const source = audioCtx.createMediaStreamSource(stream);
+
+      // Prepare analyser for signal level visualization
       const analyser = audioCtx.createAnalyser();
       analyser.fftSize = 2048;
       source.connect(analyser);
       analyserRef.current = analyser;
 
-      // Start collecting audio every 3s
-      mediaRecorder.start(3000); // timeslice: 3000 ms
+      // Capture raw PCM frames
+      const processor = audioCtx.createScriptProcessor(4096, 1, 1);
+      processor.onaudioprocess = (e: AudioProcessingEvent) => {
+        pendingPcmRef.current.push(new Float32Array(e.inputBuffer.getChannelData(0)));
+      };
+      source.connect(processor);
+      processor.connect(audioCtx.destination);
+      processorRef.current = processor;
+
+      sendTimerRef.current = window.setInterval(flushPcm, SEND_INTERVAL_MS);
       setIsRecording(true);
       updateSignalLoop();
 
@@ -78,36 +90,48 @@ export default function RealTimeMonitoring({ onBack }: RealTimeMonitoringProps)
     }
   };
 
-  // Send Blob to backend analyze_stream
-  const sendAudioToBackend = async (audioBlob: Blob) => {
-    const formData = new FormData();
-    // name 'audio' must match backend analyze_stream
-    formData.append('audio', audioBlob, 'realtime.webm');
+  // Queue everything captured so far behind the previous send
+  const flushPcm = () => {
+    const chunks = pendingPcmRef.current;
+    if (chunks.length === 0 || sessionIdRef.current === null) return;
+    pendingPcmRef.current = [];
+
+    const total = chunks.reduce((n, c) => n + c.length, 0);
+    const pcm = new Float32Array(total);
+    let offset = 0;
+    for (const c of chunks) {
+      pcm.set(c, offset);
+      offset += c.length;
+    }
+
+    const sessionId = sessionIdRef.current;
+    sendChainRef.current = sendChainRef.current.then(() => sendPcmToBackend(sessionId, pcm));
+  };
 
+  // Send PCM to the streaming session; the server answers with new predictions
+  const sendPcmToBackend = async (sessionId: number, pcm: Float32Array) => {
     try {
-      const res = await fetch('http://127.0.0.1:5000/analyze_stream', {
+      const res = await fetch(`${API}/${sessionId}/audio`, {
         method: 'POST',
-        body: formData,
+        headers: authHeaders({ 'Content-Type': 'application/octet-stream' }),
+        body: pcm.buffer as ArrayBuffer,
       });
 
       if (!res.ok) {
         console.error("Server response not OK:", res.status, res.statusText);
-        // Optionally read error json
-        try {
-          const err = await res.json();
-          console.error("Server error:", err);
-        } catch { /* ignore */ }
         return;
       }
 
       const data = await res.json();
-      const newLog: RealTimeLog = {
+      const newLogs: RealTimeLog[] = data.predictions.map((p: { result: string; confidence: number }) => ({
         id: logIdRef.current++,
-        type: data.result,
-        confidence: data.confidence,
+        type: p.result,
+        confidence: p.confidence,
         time: new Date().toLocaleTimeString('uk-UA'),
-      };
-      setLogs(prev => [newLog, ...prev]);
+      }));
+      if (newLogs.length > 0) {
+        setLogs(prev => [...newLogs.reverse(), ...prev]);
+      }
     } catch (err) {
       console.error("Send audio error:", err);
     }
@@ -133,12 +157,27 @@ export default function RealTimeMonitoring({ onBack }: RealTimeMonitoringProps)
   // Stop recording & cleanup
   const stopRecording = () => {
     setIsRecording(false);
-    // stop media recorder
-    if (mediaRecorderRef.current && mediaRecorderRef.current.state !== "inactive") {
-      try {
-        mediaRecorderRef.current.stop();
-      } catch (e) { /* ignore */ }
-      mediaRecorderRef.current = null;
+    if (sendTimerRef.current !== null) {
+      window.clearInterval(sendTimerRef.current);
+      sendTimerRef.current = null;
+    }
+    if (processorRef.current) {
+      processorRef.current.disconnect();
+      processorRef.current.onaudioprocess = null;
+      processorRef.current = null;
+    }
+    // send what is left, then close the session
+    flushPcm();
+    const sessionId = sessionIdRef.current;
+    sessionIdRef.current = null;
+    pendingPcmRef.current = [];
+    if (sessionId !== null) {
+      sendChainRef.current = sendChainRef.current.then(() =>
+        fetch(`${API}/${sessionId}`, {
+          method: 'DELETE',
+          headers: authHeaders(),
+        }).then(() => undefined).catch(() => undefined)
+      );
     }
     // stop audio tracks
     if (audioStreamRef.current) {
@@ -12,6 +12,12 @@ interface AuthContextType {
   logout: () => void;
 }
 
+// Authorization лише коли токен справді є — без "Bearer null" до входу
+export function authHeaders(headers: Record<string, string> = {}): Record<string, string> {
+  const token = localStorage.getItem("accessToken");
+  return token ? { ...headers, Authorization: `Bearer ${token}` } : headers;
+}
+
 const AuthContext = createContext<AuthContextType | undefined>(undefined);
 
 export function AuthProvider({ children }: { children: ReactNode }) {
@@ -23,6 +29,7 @@ export function AuthProvider({ children }: { children: ReactNode }) {
 
   const logout = () => {
     setUser(null);
+    localStorage.removeItem("accessToken");
   };
 
   return (